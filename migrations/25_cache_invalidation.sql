@@ -0,0 +1,112 @@
+-- depends: 24_forum_assist_mark_as_solved_views
+-- depends: 19_thread_showcase
+-- depends: 18_post_assist
+-- depends: 13_welcome
+-- depends: 11_auto_responder_improvement
+-- depends: 9_forum_cleanup
+-- depends: 2_create_configs
+
+-- Sends the changed table and key on the pph_cache_invalidation channel,
+-- so every running bot can drop the matching cache entry.
+-- The key column is passed as the first trigger argument.
+CREATE OR REPLACE FUNCTION pph_notify_cache_invalidation() RETURNS trigger AS $$
+DECLARE
+    old_key TEXT;
+    new_key TEXT;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        old_key := to_jsonb(OLD) ->> TG_ARGV[0];
+    END IF;
+
+    IF TG_OP <> 'DELETE' THEN
+        new_key := to_jsonb(NEW) ->> TG_ARGV[0];
+    END IF;
+
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM pg_notify(
+            'pph_cache_invalidation',
+            json_build_object('table', TG_TABLE_NAME, 'key', old_key)::text
+        );
+    END IF;
+
+    -- An update that moves a row to another key invalidates both.
+    IF TG_OP <> 'DELETE' AND new_key IS DISTINCT FROM old_key THEN
+        PERFORM pg_notify(
+            'pph_cache_invalidation',
+            json_build_object('table', TG_TABLE_NAME, 'key', new_key)::text
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_config_auto;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_config_auto
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('config_type');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_settings;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_settings
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('setting_key');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_auto_responses;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_auto_responses
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_auto_responder_channels;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_auto_responder_channels
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('response_id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_post_assist_config;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_post_assist_config
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_post_assist_reply;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_post_assist_reply
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('configuration_id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_post_assist_tag_message;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_post_assist_tag_message
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('configuration_id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_post_assist_tags;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_post_assist_tags
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('configuration_id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_post_assist_mark_as_solved_tags;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_post_assist_mark_as_solved_tags
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('forum_id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_forum_cleanup_forums;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_forum_cleanup_forums
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('forum_id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_forum_cleanup_conf;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_forum_cleanup_conf
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('conf_type');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_forum_cleanup_sched;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_forum_cleanup_sched
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_forum_showcase;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_forum_showcase
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('id');
+
+DROP TRIGGER IF EXISTS pph_cache_invalidation ON pph_forum_showcase_forum;
+CREATE TRIGGER pph_cache_invalidation
+    AFTER INSERT OR UPDATE OR DELETE ON pph_forum_showcase_forum
+    FOR EACH ROW EXECUTE FUNCTION pph_notify_cache_invalidation('showcase_id');
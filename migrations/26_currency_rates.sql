@@ -0,0 +1,10 @@
+--
+--depends: 6_currency_converter
+
+-- The last quote table fetched for each base currency,
+-- so a restart doesn't have to wait for the API.
+CREATE TABLE IF NOT EXISTS pph_currency_rates (
+    base VARCHAR(3) PRIMARY KEY,
+    quotes JSONB NOT NULL,
+    fetched_at TIMESTAMPTZ NOT NULL
+);
@@ -0,0 +1,11 @@
+--
+--depends: 7_define_word
+
+-- Formatted definitions of looked up words. A NULL definitions column
+-- is a cached "No Definitions Found", with the API's message if it had one.
+CREATE TABLE IF NOT EXISTS pph_define_cache (
+    word VARCHAR(100) PRIMARY KEY,
+    definitions JSONB,
+    message TEXT,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
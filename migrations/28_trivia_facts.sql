@@ -0,0 +1,16 @@
+--
+--depends: 0_initial_migrations
+
+-- Facts fetched ahead of time, so the daily post doesn't wait on the API.
+-- Sent facts are kept, so their hash keeps a fact from being posted twice.
+CREATE TABLE IF NOT EXISTS pph_trivia_facts (
+    id SERIAL PRIMARY KEY,
+    fact TEXT NOT NULL,
+    content_hash CHAR(64) NOT NULL UNIQUE,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS pph_trivia_facts_queued
+    ON pph_trivia_facts (id)
+    WHERE sent_at IS NULL;
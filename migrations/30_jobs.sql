@@ -0,0 +1,19 @@
+--
+--depends: 19_thread_showcase
+
+-- The next run of every scheduled job, shared by every running bot.
+-- A job is claimed by taking its lease, so only one process runs it.
+CREATE TABLE IF NOT EXISTS pph_jobs (
+    name VARCHAR(64) PRIMARY KEY,
+    next_run TIMESTAMPTZ,
+    last_run TIMESTAMPTZ,
+    lease_owner TEXT,
+    lease_expires_at TIMESTAMPTZ
+);
+
+-- The showcase kept its next run as a UTC timestamp without time zone.
+INSERT INTO pph_jobs (name, next_run)
+    SELECT 'forum_showcase', schedule AT TIME ZONE 'UTC'
+    FROM pph_forum_showcase
+    WHERE id = 1
+ON CONFLICT (name) DO NOTHING;
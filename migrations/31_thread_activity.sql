@@ -0,0 +1,13 @@
+--
+--depends: 9_forum_cleanup
+
+-- When each thread in a cleaned up forum last had a message, tracked from
+-- the gateway so the cleanup doesn't fetch every thread's history.
+CREATE TABLE IF NOT EXISTS pph_thread_activity (
+    thread_id BIGINT PRIMARY KEY,
+    forum_id BIGINT NOT NULL,
+    last_activity TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS pph_thread_activity_forum
+    ON pph_thread_activity (forum_id, last_activity);
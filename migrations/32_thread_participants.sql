@@ -0,0 +1,12 @@
+--
+--depends: 24_forum_assist_mark_as_solved_views
+
+-- Who took part in each post assist thread, for the Solved! selection.
+-- The primary key doubles as the index for reading a thread's participants.
+CREATE TABLE IF NOT EXISTS pph_thread_participants (
+    thread_id BIGINT NOT NULL,
+    user_id BIGINT NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 1,
+    last_seen TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (thread_id, user_id)
+);
@@ -0,0 +1,9 @@
+--
+--depends: 24_forum_assist_mark_as_solved_views
+
+-- The accepted solution of each thread, so replacing it doesn't scan the pins.
+CREATE TABLE IF NOT EXISTS pph_post_assist_solutions (
+    thread_id BIGINT PRIMARY KEY,
+    message_id BIGINT NOT NULL,
+    accepted_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
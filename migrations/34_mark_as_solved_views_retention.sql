@@ -0,0 +1,15 @@
+--
+--depends: 24_forum_assist_mark_as_solved_views 32_thread_participants 33_post_assist_solutions
+
+-- When a view was closed, so closed views can be purged after a while.
+ALTER TABLE pph_post_assist_mark_as_solved_views
+    ADD COLUMN IF NOT EXISTS closed_at TIMESTAMPTZ;
+
+UPDATE pph_post_assist_mark_as_solved_views
+SET closed_at = CURRENT_TIMESTAMP
+WHERE closed AND closed_at IS NULL;
+
+-- The cleanup job walks the open views, which are few next to the closed ones.
+CREATE INDEX IF NOT EXISTS pph_post_assist_mark_as_solved_views_open
+    ON pph_post_assist_mark_as_solved_views (thread_id)
+    WHERE closed = false;
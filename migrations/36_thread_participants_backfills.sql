@@ -0,0 +1,9 @@
+--
+--depends: 32_thread_participants
+
+-- The threads whose history was read into pph_thread_participants. Messages
+-- seen live don't make a thread from before the tracking complete.
+CREATE TABLE IF NOT EXISTS pph_thread_participants_backfills (
+    thread_id BIGINT PRIMARY KEY,
+    backfilled_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -31,6 +31,12 @@ class API(BaseModel):
     api_ninja: str
 
 
+class CurrencyConfig(BaseModel):
+    """Holds the currency converter configurations."""
+    base: str = "USD"
+    refresh_minutes: int = 60
+
+
 class LoggerConfig(BaseModel):
     log_channel: int
     log_level: str
@@ -43,6 +49,7 @@ class Config(BaseModel):
     logger: LoggerConfig
     api: API
     guild: GuildInfo
+    currency: CurrencyConfig = CurrencyConfig()
 
 
 def get_config(path: str) -> Config:
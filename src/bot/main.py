@@ -4,6 +4,11 @@ from yoyo.backends.base import DatabaseBackend
 
 from src.utils.logging.logger import BotLogger
 from src.bot.config import Database, Config, get_config
+from src.data.admin.config_auto import Config as Toggles
+from src.data.invalidation import InvalidationBus
+from src.data.jobs import JobsDB
+from src.utils.http import HttpClient
+from src.utils.scheduler import Scheduler
 from src.utils.logging.discord_handler import DiscordHandler
 
 from logging import Logger, StreamHandler
@@ -24,6 +29,10 @@ class ProgPhil(Bot):
     logger: Logger
     bot_logger: BotLogger
     pool: Pool
+    toggles: Toggles
+    invalidation: InvalidationBus
+    http_client: HttpClient
+    scheduler: Scheduler
 
     def __init__(
         self,
@@ -42,6 +51,12 @@ class ProgPhil(Bot):
         self.logger = self.bot_logger.get_logger()
         self.config = cfg
         self.pool = pool
+        self.toggles = Toggles(pool)
+        self.invalidation = InvalidationBus(pool, self.logger)
+        # `http` is taken by discord.py's own client
+        self.http_client = HttpClient(self.logger)
+        # Runs the periodic jobs of every cog
+        self.scheduler = Scheduler(JobsDB(pool), self.logger)
 
     async def on_ready(self) -> None:
         """Invoked when the bot finish setting up
@@ -61,9 +76,23 @@ class ProgPhil(Bot):
 
         self.logger = logger
 
+        # Jobs talk to Discord, so they only start once the cache is ready.
+        self.scheduler.start()
+
     async def setup_hook(self) -> None:
         """This method only gets called ONCE, load stuff here."""
 
+        # Start listening before filling any cache, so no change slips
+        # in between the initial load and the first notification.
+        await self.invalidation.start()
+
+        # Shared by every cog that calls an external API
+        await self.http_client.start()
+
+        # Every cog reads the feature toggles from this cache
+        self.invalidation.subscribe("pph_config_auto", self.toggles.refresh)
+        await self.toggles.load()
+
         # Load every cog inside cogs folder
         admin_cogs = get_dir_content("./src/cogs/admin")
         forum_cogs = get_dir_content("./src/cogs/forum")
@@ -92,6 +121,9 @@ class ProgPhil(Bot):
 
     async def close(self):
         await super().close()
+        await self.scheduler.close()
+        await self.invalidation.close()
+        await self.http_client.close()
         await self.pool.close()
 
     async def launch(self):
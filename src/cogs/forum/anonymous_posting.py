@@ -6,7 +6,6 @@ from discord.ui import View, Select
 from discord.ext.commands import Bot, GroupCog
 
 from src.data.forum.anonymous_posting import AnonymousPostingDB
-from src.data.admin.config_auto import Config
 from src.utils.decorators import is_staff
 from src.ui.modals.anonymous_posting import AnonymousPost, AnonymousReply
 from src.ui.views.forum_picker import ForumPicker
@@ -20,7 +19,7 @@ class AnonymousPosting(GroupCog, name="anon"):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.db = AnonymousPostingDB(self.bot.pool)
-        self.config = Config(self.bot.pool)
+        self.config = self.bot.toggles
 
     async def cog_load(self):
         record = await self.db.get_view()
@@ -63,7 +62,7 @@ class AnonymousPosting(GroupCog, name="anon"):
     async def post(self, interaction: Interaction):
         """Post anonymously on a channel."""
 
-        status = await self.config.get_config("anonymous_posting")
+        status = self.config.get_config("anonymous_posting")
 
         if not status["config_status"]:
             return await interaction.response.send_message(
@@ -129,7 +128,7 @@ class AnonymousPosting(GroupCog, name="anon"):
     async def reply(self, interaction: Interaction):
         """Reply to a post."""
 
-        status = await self.config.get_config("anonymous_posting")
+        status = self.config.get_config("anonymous_posting")
 
         if not status["config_status"]:
             return await interaction.response.send_message(
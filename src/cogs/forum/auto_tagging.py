@@ -1,4 +1,4 @@
-import asyncio
+from datetime import timedelta
 from logging import Logger
 
 from discord import (
@@ -9,6 +9,7 @@ from discord import (
     Interaction,
     Member,
     Message,
+    NotFound,
     Role,
     Thread,
 )
@@ -17,8 +18,8 @@ from discord.enums import AppCommandType
 from discord.ext.commands import Bot, Cog, GroupCog
 from discord.ui.select import Select
 from discord.ui.view import View
+from discord.utils import utcnow
 
-from src.data.admin.config_auto import Config
 from src.data.forum.post_assist import PostAssistDB
 from src.ui.views.mark_as_solution import MarkAsSolution
 from src.ui.views.post_assist import (
@@ -28,11 +29,24 @@ from src.ui.views.post_assist import (
     PostAssistState,
     format_data,
 )
-from src.ui.views.solver import PersistentSolverView
+from src.ui.views.solver import SolvedButton, solver_view
 from src.utils.decorators import is_staff
+from src.utils.scheduler import Job, every
 
 AUTHOR_PLACEHOLDER = "[[@author]]"
 
+# The tables that make up a configuration, their notifications carry its id.
+POST_ASSIST_TABLES = (
+    "pph_post_assist_config",
+    "pph_post_assist_reply",
+    "pph_post_assist_tag_message",
+    "pph_post_assist_tags",
+)
+# How many open Solved! views are checked against Discord at a time.
+RECONCILE_BATCH = 100
+# How long closed Solved! views are kept before they are purged.
+CLOSED_VIEW_RETENTION = timedelta(days=30)
+
 
 def get_tag_options(db: PostAssistDB, forum: ForumChannel) -> View | None:
     """Gets all tag options for the given forum."""
@@ -75,7 +89,10 @@ class ForumAssist(GroupCog, name="forum-assist"):
         self.bot = bot
         self.logger: Logger = self.bot.logger  # type: ignore
         self.db = PostAssistDB(self.bot.pool)  # type: ignore
-        self.config = Config(self.bot.pool)  # type: ignore
+        self.config = self.bot.toggles  # type: ignore
+        # The resolved configuration of each forum seen so far,
+        # None for forums without post assist.
+        self.forums: dict[int, dict | None] = {}
         ctx_menu = ContextMenu(
             name="Accept Solution",
             callback=self.accept_solution,
@@ -84,28 +101,154 @@ class ForumAssist(GroupCog, name="forum-assist"):
         self.bot.tree.add_command(ctx_menu)
         self.ctx_menu = ctx_menu
 
-    async def load(self):
-        await self.bot.wait_until_ready()
+    async def cog_load(self):
+        # One handler for the Solved! button of every thread, old and new.
+        self.bot.add_dynamic_items(SolvedButton)
 
-        staff_roles: list[int] = self.bot.config.guild.staff_roles
+        for table in POST_ASSIST_TABLES:
+            self.bot.invalidation.subscribe(table, self._invalidate_configuration)
+
+        self.bot.invalidation.subscribe(
+            "pph_post_assist_mark_as_solved_tags", self._invalidate_forum
+        )
 
-        for view in await self.db.get_persistent_mark_as_solved_views():
-            self.bot.add_view(
-                PersistentSolverView(
-                    view["thread_id"],
-                    view["author_id"],
-                    self.db,
-                    staff_roles,
-                    self.logger,
-                ),
-                message_id=view["message_id"],
+        await self.bot.scheduler.add(
+            Job(
+                "solver_views_cleanup",
+                self.reconcile_solver_views,
+                every(timedelta(days=1)),
+                jitter=600,
             )
+        )
 
-    async def cog_load(self):
-        asyncio.create_task(self.load())
+    async def reconcile_solver_views(self):
+        """Drops the Solved! views of archived threads and forgets deleted threads.
+
+        The open views are checked in batches, only the threads missing from
+        the cache are fetched. An archived thread can be reopened, so only
+        its view row goes, its button keeps working. Views closed a while
+        ago are purged after, their threads stay locked.
+        """
+
+        after = 0
+        archived_count = deleted_count = 0
+
+        while True:
+            views = await self.db.get_persistent_mark_as_solved_views(
+                after, RECONCILE_BATCH
+            )
+
+            if not views:
+                break
+
+            archived: list[int] = []
+            missing: list[int] = []
+
+            for view in views:
+                thread_id = view["thread_id"]
+                thread = self.bot.get_channel(thread_id)
+
+                if thread is None:
+                    try:
+                        thread = await self.bot.fetch_channel(thread_id)
+                    except NotFound:
+                        missing.append(thread_id)
+                        continue
+                    except (Forbidden, HTTPException) as e:
+                        self.logger.warning(
+                            f"[FORUM-ASSIST] Could not fetch thread {thread_id}: {e}"
+                        )
+                        continue
+
+                if isinstance(thread, Thread) and thread.archived:
+                    archived.append(thread_id)
+
+            if archived:
+                await self.db.delete_persistent_mark_as_solved_views(archived)
+
+            if missing:
+                await self.db.forget_threads(missing)
+
+            archived_count += len(archived)
+            deleted_count += len(missing)
+            after = views[-1]["thread_id"]
+
+        purged = await self.db.purge_closed_mark_as_solved_views(
+            utcnow() - CLOSED_VIEW_RETENTION
+        )
+        self.logger.info(
+            f"[FORUM-ASSIST] Dropped the Solved! views of {archived_count} archived "
+            f"and {deleted_count} deleted threads, purged {purged} closed ones"
+        )
+
+    async def _resolve_forum(self, forum_id: int) -> dict | None:
+        """Gets the resolved configuration of a forum, from the cache if possible.
+
+        :param forum_id: The forum id
+        """
+
+        if forum_id not in self.forums:
+            self.forums[forum_id] = await self.db.resolve_forum(forum_id)
+
+        return self.forums[forum_id]
+
+    async def _invalidate_forum(self, forum_id: str | int | None):
+        """Drops a forum from the cache.
+
+        :param forum_id: The forum id, or None to drop every forum.
+        """
+
+        if forum_id is None:
+            self.forums.clear()
+        else:
+            self.forums.pop(int(forum_id), None)
+
+    async def _invalidate_configuration(self, config_id: str | int | None):
+        """Drops the forum of a configuration from the cache.
+
+        :param config_id: The configuration id, or None to drop every forum.
+        """
+
+        if config_id is None:
+            self.forums.clear()
+            return
+
+        forum_ids = [
+            forum_id
+            for forum_id, config in self.forums.items()
+            if config is not None and config["id"] == int(config_id)
+        ]
+
+        if not forum_ids:
+            # A new configuration, any forum cached as unconfigured may be it.
+            forum_ids = [
+                forum_id for forum_id, config in self.forums.items() if config is None
+            ]
+
+        for forum_id in forum_ids:
+            self.forums.pop(forum_id, None)
+
+    @Cog.listener()
+    async def on_message(self, message: Message):
+        thread = message.channel
+
+        if message.author.bot or not isinstance(thread, Thread):
+            return
+
+        if not isinstance(thread.parent, ForumChannel):
+            return
+
+        if not await self._resolve_forum(thread.parent_id):
+            return
+
+        await self.db.record_participant(thread.id, message.author.id, message.created_at)
 
     @Cog.listener()
     async def on_thread_create(self, thread: Thread):
+        if await self._resolve_forum(thread.parent_id):
+            # Every message of a new thread is tracked, its history never needs reading.
+            await self.db.mark_participants_backfilled(thread.id)
+
         await self._send_mark_ask_solved_button(thread)
         await self._notify_subscribers(thread)
 
@@ -123,7 +266,7 @@ class ForumAssist(GroupCog, name="forum-assist"):
                 try:
                     return await thread.send(
                         "Mark this post as Solved!",
-                        view=PersistentSolverView(
+                        view=solver_view(
                             thread.id,
                             thread.owner_id,
                             self.db,
@@ -134,22 +277,16 @@ class ForumAssist(GroupCog, name="forum-assist"):
                 except Forbidden:
                     pass
 
-        _, is_enabled = await self.db.is_mark_as_solved_enabled_for_forum(
-            thread.parent_id
-        )
+        entry = await self._resolve_forum(thread.parent_id)
 
-        if not is_enabled:
+        if not entry or not entry["enable_mark_as_solved"]:
             return
 
-        global_config = await self.config.get_config("auto_tagging")
+        global_config = self.config.get_config("auto_tagging")
         if not global_config["config_status"]:
             return
 
-        entry = await self.db.config_by_forum(thread.parent.id)
-        if not entry:
-            return
-
-        if not await self.db.get_mark_as_solved_tag(thread.parent_id):
+        if not entry["solved_tag"]:
             return
 
         bot_message = await try_send()
@@ -163,19 +300,19 @@ class ForumAssist(GroupCog, name="forum-assist"):
         )
 
     async def _notify_subscribers(self, thread: Thread):
-        config = await self.config.get_config("auto_tagging")
+        config = self.config.get_config("auto_tagging")
 
         if not config["config_status"]:
             return
 
-        entry = await self.db.config_by_forum(thread.parent.id)
+        entry = await self._resolve_forum(thread.parent.id)
 
         if not entry:
             return
 
-        reply = await self.db.get_reply(entry["id"])
-        tags = await self.db.get_tags(entry["id"])
-        tag_message = await self.db.get_tag_message(entry["id"])
+        reply = entry["reply"]
+        tags = entry["tags"]
+        tag_message = entry["tag_message"]
 
         thread_msg = thread.get_partial_message(thread.id)
 
@@ -275,6 +412,7 @@ class ForumAssist(GroupCog, name="forum-assist"):
                         "Mark as solved button configured.", ephemeral=True
                     )
 
+            await self._invalidate_forum(forum)
             await interaction.followup.send("Success!", ephemeral=True)
             return
 
@@ -292,6 +430,7 @@ class ForumAssist(GroupCog, name="forum-assist"):
         if await self.db.get_config(config_id):
             message = f"Successfully removed entry with ID: {config_id}"
             await self.db.delete_configuration(config_id)
+            await self._invalidate_configuration(config_id)
         else:
             message = f"Configuration ID: {config_id} may not exist."
 
@@ -334,7 +473,7 @@ class ForumAssist(GroupCog, name="forum-assist"):
 
         # await interaction.response.defer(ephemeral=True)
         try:
-            config = await self.db.get_config(config_id)
+            config = await self.db.get_configuration(config_id)
             if not config:
                 self.bot.logger.info(f"Configuration ID: {config_id} may not exist.")
                 return await interaction.response.send_message(
@@ -345,9 +484,9 @@ class ForumAssist(GroupCog, name="forum-assist"):
             self.bot.logger.error(e)
 
         forum_id = config["forum_id"]
-        tag_message = await self.db.get_tag_message(config_id)
-        custom_message = await self.db.get_reply(config_id)
-        tags = await self.db.get_tags(config_id)
+        tag_message = config["tag_message"]
+        custom_message = config["reply"]
+        tags = config["tags"]
         existing_tags: list[Role] | list[Member] = []
 
         # Get current configuration values
@@ -414,14 +553,59 @@ class ForumAssist(GroupCog, name="forum-assist"):
                     "Mark as solved button disabled for this forum.", ephemeral=True
                 )
 
+            await self._invalidate_forum(forum_id)
             return
 
         await interaction.followup.send("Cancelled.", ephemeral=True)
 
+    @is_staff()
+    @command(
+        name="backfill-solutions",
+        description="Stores the accepted solutions of threads from before they were tracked.",
+    )
+    async def backfill_solutions(self, interaction: Interaction):
+        """Finds the accepted solution of every open thread from its pins, once."""
+
+        await interaction.response.defer(ephemeral=True)
+
+        found = 0
+
+        for config in await self.db.list_configurations():
+            if not config["enable_accept_solutions"]:
+                continue
+
+            forum = self.bot.get_channel(config["forum_id"])
+
+            if not isinstance(forum, ForumChannel):
+                continue
+
+            for thread in forum.threads:
+                if await self.db.get_solution(thread.id):
+                    continue
+
+                solution = await self._get_current_solution_from_pins(thread)
+
+                if solution:
+                    await self.db.set_solution(thread.id, solution.id)
+                    found += 1
+
+        await interaction.followup.send(
+            f"Stored the accepted solutions of {found} threads.", ephemeral=True
+        )
+
     async def cog_unload(self) -> None:
         self.bot.tree.remove_command(
             self.ctx_menu.name, type=self.ctx_menu.type
         )  # remove it on unload
+        self.bot.remove_dynamic_items(SolvedButton)
+        self.bot.scheduler.remove("solver_views_cleanup")
+
+        for table in POST_ASSIST_TABLES:
+            self.bot.invalidation.unsubscribe(table, self._invalidate_configuration)
+
+        self.bot.invalidation.unsubscribe(
+            "pph_post_assist_mark_as_solved_tags", self._invalidate_forum
+        )
 
     async def _get_current_solution_from_pins(self, thread: Thread) -> Message | None:
         """Check pinned messages to find the current accepted solution.
@@ -431,6 +615,8 @@ class ForumAssist(GroupCog, name="forum-assist"):
 
         Note: We need to fetch full message objects because pins() returns
         incomplete reaction data according to Discord API documentation.
+        This is slow, so it is only used by the backfill, accepted solutions
+        are stored since.
         """
         try:
             pinned_messages = await thread.pins()
@@ -552,35 +738,38 @@ class ForumAssist(GroupCog, name="forum-assist"):
         if not mark_as_solution_view.confirmed:
             return
 
-        current_solution_message = await self._get_current_solution_from_pins(thread)
+        current_solution_id = await self.db.get_solution(thread_id)
+
+        if current_solution_id and current_solution_id != message_id:
+            current_solution_message = thread.get_partial_message(current_solution_id)
 
-        if current_solution_message:
             try:
                 await current_solution_message.unpin()
             except (Forbidden, HTTPException) as e:
                 self.logger.warning(
-                    f"Failed to unpin previous solution {current_solution_message.id}: {e}"
+                    f"Failed to unpin previous solution {current_solution_id}: {e}"
                 )
 
             if self.bot.user:
                 try:
                     await current_solution_message.remove_reaction("✅", self.bot.user)
                     self.logger.info(
-                        f"Removed ✅ from previous solution: {current_solution_message.id}"
+                        f"Removed ✅ from previous solution: {current_solution_id}"
                     )
                 except (Forbidden, HTTPException) as e:
                     self.logger.warning(
-                        f"Failed to remove ✅ from previous solution {current_solution_message.id}: {e}"
+                        f"Failed to remove ✅ from previous solution {current_solution_id}: {e}"
                     )
 
         try:
             await message.add_reaction("✅")
             await message.pin()
+            await self.db.set_solution(thread_id, message_id)
             self.logger.info(f"Marked message {message.id} as solution")
         except (Forbidden, HTTPException) as e:
             self.logger.error(f"Failed to mark message {message.id} as solution: {e}")
 
-        mark_as_solved_button = PersistentSolverView(
+        mark_as_solved_button = solver_view(
             thread_id,
             thread_author_id,
             self.db,
@@ -1,23 +1,36 @@
 # pylint: disable = no-member
 
 import asyncio
+import time
+from datetime import datetime, timedelta
 
 from asyncpg import Record
-from discord import Embed, Interaction, ForumChannel, TextStyle
+from discord import (
+    Embed,
+    Interaction,
+    ForumChannel,
+    Message,
+    RawThreadDeleteEvent,
+    TextStyle,
+    Thread,
+)
 from discord.app_commands import Choice, command, choices
-from discord.ext import tasks
 from discord.ui import Modal, TextInput, View, Select
-from discord.utils import utcnow
-from discord.ext.commands import Bot, GroupCog
+from discord.utils import snowflake_time, utcnow
+from discord.ext.commands import Bot, Cog, GroupCog
 
-from src.data.admin.config_auto import Config
 from src.data.forum.forum_cleanup import ForumCleanupDB
 from src.utils.decorators import is_staff
+from src.utils.scheduler import Job, every
 from src.ui.views.forum_picker import ForumPicker
 
 
 DAY_HR = 24
 WEEK_HR = DAY_HR * 7
+# How many threads are archived at the same time.
+ARCHIVE_CONCURRENCY = 5
+# How often the activity seen from the gateway is saved.
+FLUSH_INTERVAL = timedelta(minutes=5)
 
 sched_mapping = {
     "day": DAY_HR,
@@ -29,64 +42,205 @@ class ForumCleanup(GroupCog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.db = ForumCleanupDB(self.bot.pool)
-        self.toggle_config = Config(self.bot.pool)
+        self.toggle_config = self.bot.toggles
         self.forums: list[ForumChannel] | None = None
         self.conf: list[Record] | None = None
-
-    async def _archive_threads(self, forum: ForumChannel, conf: list[Record]):
-        """Archives a thread.
+        self.interval: timedelta | None = None
+        self.forum_ids: set[int] = set()
+        # Activity seen since the last flush: thread id -> (forum id, last message)
+        self.activity: dict[int, tuple[int, datetime]] = {}
+
+    async def _stale_threads(
+        self,
+        forum: ForumChannel,
+        num_days: int,
+        activity: dict[int, datetime],
+    ) -> list[Thread]:
+        """Gets the threads of a forum that were inactive for too long.
 
         :param forum: The forum to check
-        :param conf: The configurations
+        :param num_days: The days of inactivity before a thread is stale
+        :param activity: When the threads last had a message, by thread id
         """
 
-        close_t, = conf
         now = utcnow()
-        c_message = await self.db.get_message("close")
+        stale = []
 
-        if not c_message:
-            c_message = "Archived due to inactivity."
-        else:
-            c_message = c_message[0]["c_message"]
+        for thread in forum.threads:
+            if thread.flags.pinned:
+                continue
 
-        embed = Embed(description=c_message)
+            last_activity = await self._last_activity(thread, activity.get(thread.id))
 
-        for thread in forum.threads:
-            message, = [m async for m in thread.history(limit=1)]
-            days_inactive = (now - message.created_at).days
+            if (now - last_activity).days >= num_days:
+                stale.append(thread)
+
+        return stale
 
-            if days_inactive >= close_t["num_days"] and not thread.flags.pinned:
+    async def _archive_threads(self, threads: list[Thread], embed: Embed) -> int:
+        """Sends the closing message to threads and archives them.
+
+        A few threads are archived at a time, discord.py waits out the rate
+        limits of each request on its own.
+
+        :param threads: The threads to archive
+        :param embed: The closing message
+        :return: How many threads were archived
+        """
+
+        semaphore = asyncio.Semaphore(ARCHIVE_CONCURRENCY)
+
+        async def archive(thread: Thread):
+            async with semaphore:
                 await thread.send(embed=embed)
                 await thread.edit(archived=True, reason="Inactivity")
 
-    async def _refresh_task(self):
-        if self.thread_check.is_running():
-            self.thread_check.restart()
+        results = await asyncio.gather(
+            *(archive(thread) for thread in threads),
+            return_exceptions=True
+        )
+
+        for thread, result in zip(threads, results):
+            if isinstance(result, Exception):
+                self.bot.logger.warning(f"[FORUM-CLEANUP] Could not archive {thread.id}: {result!r}")
+
+        return sum(not isinstance(result, Exception) for result in results)
+
+    async def _last_activity(self, thread: Thread, tracked: datetime | None) -> datetime:
+        """Gets when a thread last had a message.
+
+        :param thread: The thread
+        :param tracked: Its tracked last activity, if any
+        """
+
+        if thread.last_message_id is not None:
+            # Messages sent while the bot was down only show up here.
+            last_message = snowflake_time(thread.last_message_id)
+            last_activity = max(tracked, last_message) if tracked else last_message
+        elif tracked is not None:
+            return tracked
         else:
-            self.thread_check.start()
+            # Never seen, the history is only fetched this once.
+            messages = [m async for m in thread.history(limit=1)]
+            last_activity = messages[0].created_at if messages else snowflake_time(thread.id)
+
+        if last_activity != tracked:
+            self._track(thread, last_activity)
+
+        return last_activity
+
+    def _track(self, thread: Thread, last_activity: datetime):
+        """Remembers the last activity of a thread, until the next flush.
+
+        :param thread: The thread
+        :param last_activity: When it last had a message
+        """
+
+        if thread.parent_id not in self.forum_ids:
+            return
+
+        tracked = self.activity.get(thread.id)
+
+        if tracked is None or tracked[1] < last_activity:
+            self.activity[thread.id] = (thread.parent_id, last_activity)
+
+    async def flush_activity(self):
+        """Saves the activity seen since the last flush."""
+
+        if not self.activity:
+            return
+
+        activity, self.activity = self.activity, {}
+
+        try:
+            await self.db.record_activity(activity)
+        except Exception:
+            # Keep it for the next flush, newer activity wins.
+            for thread_id, (forum_id, last_activity) in activity.items():
+                tracked = self.activity.get(thread_id)
+
+                if tracked is None or tracked[1] < last_activity:
+                    self.activity[thread_id] = (forum_id, last_activity)
+
+            raise
+
+    @Cog.listener()
+    async def on_message(self, message: Message):
+        if isinstance(message.channel, Thread):
+            self._track(message.channel, message.created_at)
+
+    @Cog.listener()
+    async def on_thread_create(self, thread: Thread):
+        self._track(thread, snowflake_time(thread.id))
+
+    @Cog.listener()
+    async def on_thread_update(self, before: Thread, after: Thread):
+        if before.archived and not after.archived:
+            # Reopened, it gets the full time again.
+            self._track(after, utcnow())
+
+    @Cog.listener()
+    async def on_raw_thread_delete(self, payload: RawThreadDeleteEvent):
+        if payload.parent_id not in self.forum_ids:
+            return
+
+        self.activity.pop(payload.thread_id, None)
+        await self.db.forget_threads([payload.thread_id])
+
+    def _next_check(self, after: datetime) -> datetime | None:
+        """Gets when the threads are checked next.
+
+        :param after: The time to get the next check after
+        :return: The next check, or None if there is no schedule yet
+        """
+
+        if self.interval is None:
+            return None
+
+        return after + self.interval
 
     async def _refresh_requirements(self):
         await self.bot.wait_until_ready()
         forums = await self.db.get_forums()
         forum_ids = [f["forum_id"] for f in forums]
+        self.forum_ids = set(forum_ids)
         self.forums = list(map(self.bot.get_channel, forum_ids))
         self.conf = await self.db.get_conf()
 
+    async def _on_requirements_changed(self, _key: str | None):
+        await self._refresh_requirements()
+
     async def cog_load(self):
         asyncio.create_task(self._refresh_requirements())
+
+        for table in ("pph_forum_cleanup_forums", "pph_forum_cleanup_conf"):
+            self.bot.invalidation.subscribe(table, self._on_requirements_changed)
+
         sched = await self.db.get_schedule()
 
-        if not sched:
-            return
+        if sched:
+            sched, = sched
+            self.interval = timedelta(hours=sched_mapping[sched["duration_unit"]])
+
+        # Every process saves the activity it saw itself.
+        await self.bot.scheduler.add(
+            Job("forum_activity", self.flush_activity, every(FLUSH_INTERVAL), local=True)
+        )
+        # Spread out a little, so it doesn't land on the same minute as the other jobs.
+        await self.bot.scheduler.add(
+            Job("forum_cleanup", self.thread_check, self._next_check, jitter=300)
+        )
 
-        sched, = sched
+    async def cog_unload(self):
+        self.bot.scheduler.remove("forum_cleanup")
+        self.bot.scheduler.remove("forum_activity")
+        asyncio.create_task(self.flush_activity())
 
-        self.thread_check.change_interval(hours=sched_mapping[sched["duration_unit"]])
-        self.thread_check.start()
+        for table in ("pph_forum_cleanup_forums", "pph_forum_cleanup_conf"):
+            self.bot.invalidation.unsubscribe(table, self._on_requirements_changed)
 
-    @tasks.loop()
     async def thread_check(self):
-        config = await self.toggle_config.get_config("forum_cleanup")
+        config = self.toggle_config.get_config("forum_cleanup")
 
         if not config["config_status"]:
             return
@@ -97,8 +251,31 @@ class ForumCleanup(GroupCog):
         if not self.conf:
             return
 
+        started = time.perf_counter()
+        close_t, = self.conf
+        c_message = await self.db.get_message("close")
+
+        if not c_message:
+            c_message = "Archived due to inactivity."
+        else:
+            c_message = c_message[0]["c_message"]
+
+        # Saved first, so the stored activity is current.
+        await self.flush_activity()
+        activity = await self.db.get_activity(self.forum_ids)
+        stale = []
+
         for forum in self.forums:
-            await self._archive_threads(forum, self.conf)
+            if forum is None:
+                continue
+
+            stale.extend(await self._stale_threads(forum, close_t["num_days"], activity))
+
+        archived = await self._archive_threads(stale, Embed(description=c_message))
+        self.bot.logger.info(
+            f"[FORUM-CLEANUP] Archived {archived}/{len(stale)} threads "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
 
     @is_staff()
     @choices(
@@ -191,8 +368,8 @@ class ForumCleanup(GroupCog):
         hrs = sched_mapping[sched]
 
         await self.db.upsert_schedule(sched)
-        self.thread_check.change_interval(hours=hrs)
-        await self._refresh_task()
+        self.interval = timedelta(hours=hrs)
+        await self.bot.scheduler.reschedule("forum_cleanup")
         await interaction.response.send_message(
             "Success.",
             ephemeral=True
@@ -2,7 +2,6 @@ import asyncio
 import random
 from datetime import datetime, timedelta, timezone
 from logging import Logger
-from math import floor
 
 from dateutil.relativedelta import relativedelta
 from discord import (
@@ -13,10 +12,8 @@ from discord import (
 )
 from discord.app_commands import command
 from discord.ext.commands import Bot, GroupCog
-from discord.ext.tasks import loop
 from discord.ui import Button, Select, View
 
-from src.data.admin.config_auto import Config
 from src.data.forum.forum_showcase import (
     AddShowcaseForum,
     ForumShowcase,
@@ -31,6 +28,7 @@ from src.ui.views.forum_showcase import (
     ConfigureWeekday,
 )
 from src.utils.decorators import is_staff
+from src.utils.scheduler import Job
 
 # List of hours from 12:00 AM to 11:00 PM
 SCHEDULES = [
@@ -67,7 +65,7 @@ class ForumShowcaseCog(GroupCog, name="forum-showcase"):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.forum_showcase_db = ForumShowcaseDB(self.bot.pool, self.bot.logger)  # type: ignore
-        self.db_config = Config(self.bot.pool)  # type: ignore
+        self.db_config = self.bot.toggles  # type: ignore
         self.logger: Logger = bot.logger  # type: ignore
         self.forum_showcase_id = 1
         self.forum_showcase = {}  # type: ignore
@@ -75,51 +73,57 @@ class ForumShowcaseCog(GroupCog, name="forum-showcase"):
     async def cog_load(self) -> None:
         await asyncio.create_task(self.init_data())
 
-        schedule = self.forum_showcase.schedule
-        target_channel = self.forum_showcase.target_channel
+        await self.bot.scheduler.add(  # type: ignore
+            Job("forum_showcase", self.run_showcase, self._next_showcase)
+        )
 
-        if not schedule or not target_channel:
-            return
+        self.bot.invalidation.subscribe("pph_forum_showcase", self.refresh_data)  # type: ignore
+        self.bot.invalidation.subscribe("pph_forum_showcase_forum", self.refresh_data)  # type: ignore
+
+    def _next_showcase(self, after: datetime) -> datetime | None:
+        """Gets when the showcase runs next, None while it is disabled or not set up.
 
-        config = await self.db_config.get_config("forum_showcase")
+        :param after: The time to get the next run after.
+        """
+
+        if not self.forum_showcase:
+            return None
+
+        if not self.forum_showcase.schedule or not self.forum_showcase.target_channel:
+            return None
+
+        config = self.db_config.get_config("forum_showcase")
 
         if not config["config_status"]:
-            self.logger.info("[FORUM-SHOWCASE] Showcase is disabled")
-            return
+            return None
 
-        self.schedule_showcase.start()
+        return self.calculate_next_run(
+            self.forum_showcase.schedule,
+            self.forum_showcase.interval,
+            self.forum_showcase.weekday,
+            now=after,
+        )
 
-    @loop()
-    async def schedule_showcase(self):
-        config = await self.db_config.get_config("forum_showcase")
+    async def run_showcase(self):
+        config = self.db_config.get_config("forum_showcase")
 
         if not config["config_status"]:
-            self.logger.info("[FORUM-SHOWCASE] Showcase is inactive, stopping task")
+            self.logger.info("[FORUM-SHOWCASE] Showcase is inactive, skipping")
             return
 
-        now = datetime.now(timezone.utc)
-        scheduled_time = self.forum_showcase.schedule.replace(tzinfo=timezone.utc)
-        diff = floor((scheduled_time - now).total_seconds())
-
-        # We need to current time is the same as the scheduled time,
-        # because sometimes the this task runs halfway the schedule time
-        # due to oversleeping.
-        # If it happens, we need to reschedule the task
-        if diff < 0:
-            try:
-                await self.showcase_threads(self.forum_showcase)
-                self.logger.info("[FORUM-SHOWCASE] Showcase completed, rescheduling")
-            except Exception as e:
-                self.logger.error(f"[FORUM-SHOWCASE] Error in showcase_threads: {e}")
-        else:
-            pass
+        try:
+            await self.showcase_threads(self.forum_showcase)
+            self.logger.info("[FORUM-SHOWCASE] Showcase completed, rescheduling")
+        except Exception as e:
+            self.logger.error(f"[FORUM-SHOWCASE] Error in showcase_threads: {e}")
 
+        # The scheduler already knows the next run, this keeps the config's in sync.
         next_run = self.calculate_next_run(
             self.forum_showcase.schedule,
             self.forum_showcase.interval,
             self.forum_showcase.weekday,
         )
-        await self.schedule_next_run(next_run=next_run)
+        await self.update_schedule(next_run)
 
     async def update_schedule(self, next_schedule: datetime):
         now = datetime.now(timezone.utc)
@@ -138,29 +142,20 @@ class ForumShowcaseCog(GroupCog, name="forum-showcase"):
 
         self.forum_showcase.schedule = next_schedule
 
-    async def schedule_next_run(self, next_run: datetime, run_now=False):
+    async def schedule_next_run(self, next_run: datetime):
         if not self.forum_showcase:
             self.logger.error("[FORUM-SHOWCASE] No forum showcase configured")
             return
 
-        now = datetime.now(timezone.utc)
-        diff = (next_run - now).total_seconds()
-
         self.logger.info(f"[FORUM-SHOWCASE] New showcase schedule: {next_run}")
 
         await self.update_schedule(next_run)
-
-        if diff > 0 or run_now:
-            self.schedule_showcase.change_interval(seconds=max(1, diff))
-        else:
-            self.logger.info(
-                "[FORUM-SHOWCASE] Next run time is in the past. Waiting for next interval."
-            )
+        await self.bot.scheduler.reschedule("forum_showcase", next_run)  # type: ignore
 
     def calculate_next_run(
-        self, schedule: datetime, interval: str, day: str
+        self, schedule: datetime, interval: str, day: str, now: datetime | None = None
     ) -> datetime:
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         weekday_int = WEEKDAYS.index(day)
 
         next_run = schedule.replace(
@@ -233,12 +228,39 @@ class ForumShowcaseCog(GroupCog, name="forum-showcase"):
         else:
             self.logger.info("[FORUM-SHOWCASE] No threads found for the current month.")
 
+    async def cog_unload(self) -> None:
+        self.bot.scheduler.remove("forum_showcase")  # type: ignore
+        self.bot.invalidation.unsubscribe("pph_forum_showcase", self.refresh_data)  # type: ignore
+        self.bot.invalidation.unsubscribe("pph_forum_showcase_forum", self.refresh_data)  # type: ignore
+
     async def init_data(self):
         data = await self.forum_showcase_db.get_showcases()
         showcase = data[0]
 
         self.forum_showcase = showcase
 
+    async def refresh_data(self, showcase_id: str | None):
+        """Reloads the showcase after it was changed in the database.
+
+        The fields are copied onto the current showcase instead of replacing
+        it, since open configuration views hold on to the same object.
+
+        :param showcase_id: The id of the changed showcase, or None if unknown.
+        """
+
+        if not self.forum_showcase:
+            await self.init_data()
+            return
+
+        if showcase_id is not None and int(showcase_id) != self.forum_showcase.id:
+            return
+
+        for showcase in await self.forum_showcase_db.get_showcases():
+            if showcase.id == self.forum_showcase.id:
+                self.forum_showcase.__dict__.update(showcase.__dict__)
+                await self.bot.scheduler.reschedule("forum_showcase")  # type: ignore
+                return
+
     @is_staff()
     @command(name="add", description="Adds a forum to the showcase")
     async def add_forum(
@@ -493,9 +515,6 @@ class ForumShowcaseCog(GroupCog, name="forum-showcase"):
             )
             await self.schedule_next_run(next_run=next_run)
 
-            if not self.schedule_showcase.is_running():
-                self.schedule_showcase.start()
-
             await interaction.response.send_message(
                 "Forum showcase is now enabled. "
                 f"Next run scheduled for {format_datetime_in_local_timezone(next_run)}.",
@@ -503,8 +522,7 @@ class ForumShowcaseCog(GroupCog, name="forum-showcase"):
             )
             return
 
-        if self.schedule_showcase.is_running():
-            self.schedule_showcase.cancel()
+        await self.bot.scheduler.reschedule("forum_showcase")  # type: ignore
 
         self.logger.info("[FORUM-SHOWCASE] Forum showcase is now disabled")
         await interaction.response.send_message(
@@ -1,10 +1,31 @@
+import asyncio
 import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from unittest.async_case import IsolatedAsyncioTestCase
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from discord import ForumChannel, Thread
+from discord import ForumChannel, NotFound, Thread
 
 from src.cogs.forum.auto_tagging import ForumAssist
+from src.ui.views.solver import SolvedButton
+
+
+def _resolved(**overrides):
+    """A resolved forum configuration, as returned by resolve_forum."""
+
+    config = {
+        "id": 1,
+        "forum_id": 789,
+        "enable_accept_solutions": False,
+        "enable_mark_as_solved": True,
+        "reply": None,
+        "tag_message": None,
+        "tags": [],
+        "solved_tag": 111,
+    }
+    config.update(overrides)
+    return config
 
 
 class TestForumAssist(IsolatedAsyncioTestCase):
@@ -19,6 +40,7 @@ class TestForumAssist(IsolatedAsyncioTestCase):
         self.cog = ForumAssist(self.mock_bot)
         self.cog.db = AsyncMock()
         self.cog.config = AsyncMock()
+        self.cog.config.get_config = MagicMock()
 
     async def test_send_mark_as_solved_button_success(self):
         thread = MagicMock(spec=Thread)
@@ -32,10 +54,8 @@ class TestForumAssist(IsolatedAsyncioTestCase):
         sent_message.id = 999
         thread.send = AsyncMock(return_value=sent_message)
 
-        self.cog.db.is_mark_as_solved_enabled_for_forum.return_value = (1, True)
+        self.cog.db.resolve_forum.return_value = _resolved(solved_tag=111)
         self.cog.config.get_config.return_value = {"config_status": True}
-        self.cog.db.config_by_forum.return_value = {"id": 1}
-        self.cog.db.get_mark_as_solved_tag.return_value = 111
 
         await self.cog._send_mark_ask_solved_button(thread)
 
@@ -54,10 +74,8 @@ class TestForumAssist(IsolatedAsyncioTestCase):
         thread.parent.id = 789
         thread.send = AsyncMock()
 
-        self.cog.db.is_mark_as_solved_enabled_for_forum.return_value = (1, True)
+        self.cog.db.resolve_forum.return_value = _resolved(solved_tag=None)
         self.cog.config.get_config.return_value = {"config_status": True}
-        self.cog.db.config_by_forum.return_value = {"id": 1}
-        self.cog.db.get_mark_as_solved_tag.return_value = None
 
         await self.cog._send_mark_ask_solved_button(thread)
 
@@ -73,12 +91,98 @@ class TestForumAssist(IsolatedAsyncioTestCase):
         thread.parent.id = 789
         thread.send = AsyncMock()
 
-        self.cog.db.is_mark_as_solved_enabled_for_forum.return_value = (1, False)
+        self.cog.db.resolve_forum.return_value = _resolved(enable_mark_as_solved=False)
 
         await self.cog._send_mark_ask_solved_button(thread)
 
         thread.send.assert_not_awaited()
-        self.cog.config.get_config.assert_not_awaited()
+        self.cog.config.get_config.assert_not_called()
+
+    async def test_on_thread_create_resolves_forum_once(self):
+        thread = MagicMock(spec=Thread)
+        thread.id = 123
+        thread.owner_id = 456
+        thread.parent_id = 789
+        thread.parent = MagicMock(spec=ForumChannel)
+        thread.parent.id = 789
+        thread.send = AsyncMock()
+        thread.get_partial_message = MagicMock(return_value=AsyncMock())
+
+        self.cog.db.resolve_forum.return_value = _resolved(reply="Welcome!")
+        self.cog.config.get_config.return_value = {"config_status": True}
+
+        await self.cog.on_thread_create(thread)
+        await self.cog.on_thread_create(thread)
+
+        self.cog.db.resolve_forum.assert_awaited_once_with(789)
+        self.cog.db.get_reply.assert_not_awaited()
+        thread.send.assert_any_await("Welcome!")
+
+    async def test_on_thread_create_skips_the_participants_backfill(self):
+        thread = MagicMock(spec=Thread)
+        thread.id = 123
+        thread.parent_id = 789
+        self.cog._send_mark_ask_solved_button = AsyncMock()
+        self.cog._notify_subscribers = AsyncMock()
+
+        self.cog.db.resolve_forum.return_value = None
+        await self.cog.on_thread_create(thread)
+        self.cog.db.mark_participants_backfilled.assert_not_awaited()
+
+        self.cog.forums.clear()
+        self.cog.db.resolve_forum.return_value = _resolved()
+        await self.cog.on_thread_create(thread)
+        self.cog.db.mark_participants_backfilled.assert_awaited_once_with(123)
+
+    async def test_invalidate_configuration_drops_cached_forum(self):
+        self.cog.forums = {789: _resolved(id=1), 790: _resolved(id=2), 791: None}
+
+        await self.cog._invalidate_configuration("1")
+
+        self.assertEqual(set(self.cog.forums), {790, 791})
+
+        # An unknown configuration may belong to a forum cached as unconfigured
+        await self.cog._invalidate_configuration("3")
+
+        self.assertEqual(set(self.cog.forums), {790})
+
+    async def test_on_message_records_participant(self):
+        thread = MagicMock(spec=Thread)
+        thread.id = 123
+        thread.parent_id = 789
+        thread.parent = MagicMock(spec=ForumChannel)
+
+        message = MagicMock()
+        message.channel = thread
+        message.author.bot = False
+        message.author.id = 555
+
+        self.cog.db.resolve_forum.return_value = _resolved()
+
+        await self.cog.on_message(message)
+
+        self.cog.db.record_participant.assert_awaited_once_with(
+            123, 555, message.created_at
+        )
+
+    async def test_on_message_skips_unconfigured_forums_and_bots(self):
+        thread = MagicMock(spec=Thread)
+        thread.id = 123
+        thread.parent_id = 790
+        thread.parent = MagicMock(spec=ForumChannel)
+
+        message = MagicMock()
+        message.channel = thread
+        message.author.bot = False
+
+        self.cog.db.resolve_forum.return_value = None
+        await self.cog.on_message(message)
+
+        message.author.bot = True
+        self.cog.db.resolve_forum.return_value = _resolved()
+        await self.cog.on_message(message)
+
+        self.cog.db.record_participant.assert_not_awaited()
 
     async def test_accept_solution_rejects_non_owner(self):
         thread = MagicMock(spec=Thread)
@@ -164,5 +268,289 @@ class TestForumAssist(IsolatedAsyncioTestCase):
         )
 
 
+    async def test_accept_solution_replaces_stored_solution(self):
+        thread = MagicMock(spec=Thread)
+        thread.id = 123
+        thread.owner_id = 456
+        thread.parent = MagicMock(spec=ForumChannel)
+        thread.parent.id = 789
+        thread.archived = False
+        previous = AsyncMock()
+        thread.get_partial_message = MagicMock(return_value=previous)
+
+        interaction = AsyncMock()
+        interaction.channel = thread
+        interaction.user.id = 456
+
+        message = AsyncMock()
+        message.id = 124
+        message.author.bot = False
+
+        self.cog.db.is_mark_as_solution_enabled.return_value = (1, True)
+        self.cog.db.get_solution.return_value = 120
+
+        with patch("src.cogs.forum.auto_tagging.MarkAsSolution") as confirm, patch(
+            "src.cogs.forum.auto_tagging.solver_view"
+        ):
+            confirm.return_value.wait = AsyncMock()
+            confirm.return_value.confirmed = True
+
+            await self.cog.accept_solution(interaction, message)
+
+        thread.get_partial_message.assert_called_once_with(120)
+        previous.unpin.assert_awaited_once()
+        thread.pins.assert_not_called()
+        message.pin.assert_awaited_once()
+        self.cog.db.set_solution.assert_awaited_once_with(123, 124)
+
+
+    async def test_cog_load_registers_solved_button_once(self):
+        self.mock_bot.invalidation = MagicMock()
+        self.mock_bot.scheduler.add = AsyncMock()
+
+        await self.cog.cog_load()
+
+        self.mock_bot.add_dynamic_items.assert_called_once_with(SolvedButton)
+        self.mock_bot.add_view.assert_not_called()
+        self.mock_bot.scheduler.add.assert_awaited_once()
+
+    async def test_reconcile_solver_views(self):
+        open_thread = MagicMock(spec=Thread, archived=False)
+        archived_thread = MagicMock(spec=Thread, archived=True)
+        cached = {1: open_thread, 2: archived_thread}
+        fetched = {3: MagicMock(spec=Thread, archived=True)}
+
+        async def fetch_channel(thread_id):
+            if thread_id not in fetched:
+                raise NotFound(MagicMock(status=404), "Unknown Channel")
+
+            return fetched[thread_id]
+
+        self.mock_bot.get_channel = MagicMock(side_effect=cached.get)
+        self.mock_bot.fetch_channel = AsyncMock(side_effect=fetch_channel)
+        self.cog.db.get_persistent_mark_as_solved_views.side_effect = [
+            [{"thread_id": 1}, {"thread_id": 2}],
+            [{"thread_id": 3}, {"thread_id": 4}],
+            [],
+        ]
+        self.cog.db.purge_closed_mark_as_solved_views.return_value = 7
+
+        with patch("src.cogs.forum.auto_tagging.RECONCILE_BATCH", 2):
+            await self.cog.reconcile_solver_views()
+
+        # Batches follow each other by thread id
+        self.assertEqual(
+            [c.args for c in self.cog.db.get_persistent_mark_as_solved_views.await_args_list],
+            [(0, 2), (2, 2), (4, 2)],
+        )
+        # Only the threads missing from the cache are fetched
+        self.assertEqual(
+            [c.args for c in self.mock_bot.fetch_channel.await_args_list], [(3,), (4,)]
+        )
+        self.assertEqual(
+            [c.args for c in self.cog.db.delete_persistent_mark_as_solved_views.await_args_list],
+            [([2],), ([3],)],
+        )
+        self.cog.db.close_persistent_mark_as_solved_view.assert_not_awaited()
+        self.cog.db.forget_threads.assert_awaited_once_with([4])
+        self.cog.db.purge_closed_mark_as_solved_views.assert_awaited_once()
+
+
+class TestSolvedButton(IsolatedAsyncioTestCase):
+    async def test_custom_id_carries_thread_and_author(self):
+        button = SolvedButton(123, 456, AsyncMock(), [1], MagicMock())
+        match = SolvedButton.__discord_ui_compiled_template__.fullmatch(button.custom_id)
+
+        interaction = MagicMock()
+        decoded = await SolvedButton.from_custom_id(interaction, button.item, match)
+
+        self.assertEqual(button.custom_id, "solved:123:456")
+        self.assertEqual((decoded.thread_id, decoded.author_id), (123, 456))
+        self.assertEqual(decoded.staff_roles, interaction.client.config.guild.staff_roles)
+
+    async def test_legacy_custom_id_uses_the_thread(self):
+        match = SolvedButton.__discord_ui_compiled_template__.fullmatch("solved")
+
+        interaction = MagicMock()
+        interaction.channel = MagicMock(spec=Thread)
+        interaction.channel.id = 123
+        interaction.channel.owner_id = 456
+
+        decoded = await SolvedButton.from_custom_id(interaction, MagicMock(), match)
+
+        self.assertEqual((decoded.thread_id, decoded.author_id), (123, 456))
+
+    def _solving(self, outcomes: list[str]):
+        """A thread with no helpers, and a button that records how its view was closed."""
+
+        @asynccontextmanager
+        async def closing(thread_id):
+            try:
+                yield
+            except Exception:
+                outcomes.append("rolled back")
+                raise
+
+            outcomes.append("committed")
+
+        db = AsyncMock()
+        db.get_participants.return_value = []
+        db.get_mark_as_solved_tag.return_value = 111
+        db.is_mark_as_solved_view_closed.return_value = False
+        db.closing_mark_as_solved_view = closing
+
+        async def history(limit):
+            return
+            yield
+
+        thread = MagicMock(spec=Thread)
+        thread.id = 123
+        thread.name = "Help"
+        thread.locked = False
+        thread.parent = MagicMock(spec=ForumChannel)
+        thread.applied_tags = ["python"]
+        thread.history = history
+        thread.edit = AsyncMock()
+        thread.send = AsyncMock()
+
+        interaction = MagicMock()
+        interaction.response.defer = AsyncMock()
+        interaction.followup.send = AsyncMock()
+        interaction.guild.get_thread.return_value = thread
+
+        return SolvedButton(123, 456, db, [1], MagicMock()), thread, interaction
+
+    async def test_solved_edits_the_thread_once(self):
+        outcomes = []
+        button, thread, interaction = self._solving(outcomes)
+
+        await button.solved(interaction)
+
+        thread.edit.assert_awaited_once_with(
+            locked=True,
+            name="[SOLVED] Help",
+            applied_tags=["python", thread.parent.get_tag.return_value],
+            reason="Solved",
+        )
+        thread.add_tags.assert_not_called()
+        thread.send.assert_awaited_once()
+        self.assertEqual(outcomes, ["committed"])
+
+    async def test_solved_ignores_a_second_click(self):
+        outcomes = []
+        button, thread, interaction = self._solving(outcomes)
+
+        await button.solved(interaction)
+        # Solving locks the thread
+        thread.locked = True
+        await button.solved(interaction)
+
+        thread.edit.assert_awaited_once()
+        thread.send.assert_awaited_once()
+        interaction.followup.send.assert_awaited_once_with(
+            "This post has already been marked as solved.", ephemeral=True
+        )
+        self.assertEqual(outcomes, ["committed"])
+
+    async def test_solved_ignores_a_closed_view(self):
+        # Solved before, then unlocked by staff
+        button, thread, interaction = self._solving([])
+        button.db.is_mark_as_solved_view_closed.return_value = True
+
+        await button.solved(interaction)
+
+        button.db.is_mark_as_solved_view_closed.assert_awaited_once_with(123)
+        thread.edit.assert_not_awaited()
+        interaction.followup.send.assert_awaited_once_with(
+            "This post has already been marked as solved.", ephemeral=True
+        )
+
+    async def test_solved_ignores_concurrent_clicks(self):
+        outcomes = []
+        button, thread, interaction = self._solving(outcomes)
+        editing = asyncio.Event()
+        release = asyncio.Event()
+
+        async def edit(**changes):
+            editing.set()
+            await release.wait()
+
+        thread.edit.side_effect = edit
+
+        first = asyncio.create_task(button.solved(interaction))
+        await editing.wait()
+        await button.solved(interaction)
+        release.set()
+        await first
+
+        thread.edit.assert_awaited_once()
+        interaction.followup.send.assert_awaited_once()
+        self.assertEqual(outcomes, ["committed"])
+
+    async def test_solved_ignores_concurrent_clicks_while_checking_the_view(self):
+        outcomes = []
+        button, thread, interaction = self._solving(outcomes)
+
+        async def is_closed(thread_id):
+            await asyncio.sleep(0)
+            return False
+
+        button.db.is_mark_as_solved_view_closed.side_effect = is_closed
+
+        await asyncio.gather(button.solved(interaction), button.solved(interaction))
+
+        thread.edit.assert_awaited_once()
+        thread.send.assert_awaited_once()
+        interaction.followup.send.assert_awaited_once_with(
+            "This post has already been marked as solved.", ephemeral=True
+        )
+        self.assertEqual(outcomes, ["committed"])
+
+    async def test_solved_keeps_a_single_prefix(self):
+        button, thread, interaction = self._solving([])
+        thread.name = "[SOLVED] Help"
+
+        await button.solved(interaction)
+
+        self.assertEqual(thread.edit.await_args.kwargs["name"], "[SOLVED] Help")
+
+    async def test_participants_backfill_threads_seen_live(self):
+        # A message since the tracking started made the index non-empty
+        db = AsyncMock()
+        db.participants_backfilled.return_value = False
+        db.get_participants.return_value = [7, 8]
+        old_helper = MagicMock(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        old_helper.author.id = 8
+        old_helper.author.bot = False
+
+        async def history(limit):
+            yield old_helper
+
+        thread = MagicMock(spec=Thread)
+        thread.id = 123
+        thread.history = MagicMock(side_effect=history)
+        button = SolvedButton(123, 456, db, [1], MagicMock())
+
+        self.assertEqual(await button._participants(thread), [7, 8])
+        db.add_participants.assert_awaited_once_with(
+            123, {8: (1, old_helper.created_at)}
+        )
+
+        db.participants_backfilled.return_value = True
+        await button._participants(thread)
+
+        thread.history.assert_called_once()
+
+    async def test_solved_rolls_back_when_discord_fails(self):
+        outcomes = []
+        button, thread, interaction = self._solving(outcomes)
+        thread.send.side_effect = RuntimeError("Missing Permissions")
+
+        with self.assertRaises(RuntimeError):
+            await button.solved(interaction)
+
+        self.assertEqual(outcomes, ["rolled back"])
+
+
 if __name__ == "__main__":
     unittest.main()
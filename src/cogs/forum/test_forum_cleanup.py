@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from discord import Thread
+from discord.utils import time_snowflake
+
+from src.cogs.forum.forum_cleanup import ARCHIVE_CONCURRENCY, ForumCleanup
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def make_thread(thread_id: int, parent_id: int = 10, last_message: datetime | None = None):
+    thread = MagicMock(spec=Thread)
+    thread.id = thread_id
+    thread.parent_id = parent_id
+    thread.flags.pinned = False
+    thread.last_message_id = time_snowflake(last_message) if last_message else None
+    thread.send = AsyncMock()
+    thread.edit = AsyncMock()
+
+    return thread
+
+
+class TestForumCleanup(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cog = ForumCleanup(MagicMock())
+        self.cog.db = AsyncMock()
+        self.cog.db.get_message.return_value = []
+        self.cog.forum_ids = {10}
+        self.cog.conf = [{"num_days": 7}]
+
+    async def test_tracks_latest_message(self):
+        thread = make_thread(1)
+        other_forum = make_thread(2, parent_id=20)
+
+        for channel, created_at in (
+            (thread, NOW),
+            (thread, NOW - timedelta(days=1)),
+            (other_forum, NOW),
+        ):
+            await self.cog.on_message(MagicMock(channel=channel, created_at=created_at))
+
+        self.assertEqual(self.cog.activity, {1: (10, NOW)})
+
+    async def test_flush_activity(self):
+        self.cog.activity = {1: (10, NOW)}
+
+        await self.cog.flush_activity()
+
+        self.cog.db.record_activity.assert_awaited_once_with({1: (10, NOW)})
+        self.assertEqual(self.cog.activity, {})
+
+    async def test_flush_activity_keeps_unsaved_activity(self):
+        self.cog.activity = {1: (10, NOW)}
+        self.cog.db.record_activity.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            await self.cog.flush_activity()
+
+        self.assertEqual(self.cog.activity, {1: (10, NOW)})
+
+    async def test_archives_by_tracked_activity(self):
+        stale = make_thread(1, last_message=NOW - timedelta(days=8))
+        active = make_thread(2, last_message=NOW - timedelta(days=8))
+        forum = MagicMock(threads=[stale, active])
+        activity = {1: NOW - timedelta(days=8), 2: NOW - timedelta(days=1)}
+
+        with patch("src.cogs.forum.forum_cleanup.utcnow", return_value=NOW):
+            threads = await self.cog._stale_threads(forum, 7, activity)
+
+        self.assertEqual(threads, [stale])
+        stale.history.assert_not_called()
+
+    async def test_fetches_history_of_unseen_threads_once(self):
+        thread = make_thread(1)
+        message = MagicMock(created_at=NOW - timedelta(days=2))
+
+        async def history(limit):
+            yield message
+
+        thread.history = MagicMock(side_effect=history)
+        forum = MagicMock(threads=[thread])
+
+        with patch("src.cogs.forum.forum_cleanup.utcnow", return_value=NOW):
+            threads = await self.cog._stale_threads(forum, 7, {})
+
+        thread.history.assert_called_once_with(limit=1)
+        self.assertEqual(threads, [])
+        self.assertEqual(self.cog.activity, {1: (10, NOW - timedelta(days=2))})
+
+    async def test_thread_check_archives_concurrently(self):
+        threads = [make_thread(i, last_message=NOW - timedelta(days=30)) for i in range(12)]
+        threads[3].edit.side_effect = RuntimeError("Missing Permissions")
+        self.cog.forums = [MagicMock(threads=threads[:6]), None, MagicMock(threads=threads[6:])]
+        self.cog.db.get_activity.return_value = {}
+        self.cog.db.get_message.return_value = [{"c_message": "Closed."}]
+        self.cog.toggle_config.get_config.return_value = {"config_status": True}
+
+        running = 0
+        peak = 0
+
+        async def send(embed):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+
+        for thread in threads:
+            thread.send.side_effect = send
+
+        with patch("src.cogs.forum.forum_cleanup.utcnow", return_value=NOW):
+            await self.cog.thread_check()
+
+        # The closing message is read once per run
+        self.cog.db.get_message.assert_awaited_once_with("close")
+        self.assertEqual(peak, ARCHIVE_CONCURRENCY)
+        self.assertEqual(sum(thread.edit.await_count for thread in threads), 12)
+        self.cog.bot.logger.info.assert_called_once()
+        self.assertIn("Archived 11/12 threads", self.cog.bot.logger.info.call_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,3 @@
-import re
 from math import ceil
 
 from discord import Interaction, Embed, Message
@@ -9,78 +8,55 @@ from src.data.auto_responder import AutoRespondDB
 from src.ui.modals.auto_responder import AutoResponder
 from src.ui.views.auto_responder import AutoResponderPagination
 from src.utils.decorators import is_staff
+from src.utils.trigger_index import TriggerIndex
 
 
 class Responder(GroupCog):
     def __init__(self, bot: Bot) -> None:
         self.bot = bot
+        self.index = TriggerIndex()
 
     async def cog_load(self) -> None:
         self.db = AutoRespondDB(self.bot.pool)
+        self.index.load(await self.db.get_responses())
 
-    def __match_string_contains(self, trigger: str, message: str) -> bool:
-        length = len(trigger)
-        length_message = len(message)
-
-        for i in range(length_message - 1):
-            if i > 0 and message[i-1] != " ":
-                continue
-
-            if i + length < length_message and message[i + length] != " ":
-                continue
+        for response in self.index.invalid:
+            self.bot.logger.warning(
+                f"Auto response #{response['id']} has an invalid regex and will be ignored."
+            )
 
-            if message[i:i + length] == trigger:
-                return True
+        self.bot.invalidation.subscribe("pph_auto_responses", self._refresh_response)
+        self.bot.invalidation.subscribe("pph_auto_responder_channels", self._refresh_response)
 
-        return False
+    async def cog_unload(self) -> None:
+        self.bot.invalidation.unsubscribe("pph_auto_responses", self._refresh_response)
+        self.bot.invalidation.unsubscribe("pph_auto_responder_channels", self._refresh_response)
 
-    def __match(self, message: str, trigger: str, matching_type: str) -> bool:
-        """Checks if the message matches the trigger.
+    async def _refresh_response(self, response_id: str | None) -> None:
+        """Reloads a response that was changed in the database.
 
-        :param message: The message to check.
-        :param trigger: The trigger to check.
-        :param matching_type: The matching type.
-        :return: True if the message matches the trigger, False otherwise.
+        :param response_id: The id of the response, or None to reload every response.
         """
 
-        if matching_type == "strict":
-            return message == trigger
-
-        if matching_type == "strict_contains":
-            return self.__match_string_contains(trigger, message)
-
-        if matching_type == "lenient":
-            return trigger.lower() in message.lower()
+        if response_id is None:
+            self.index.load(await self.db.get_responses())
+            return
 
-        if matching_type == "regex":
-            pattern = re.compile(r'{}'.format(trigger))
-            return pattern.match(message) is not None
+        response = await self.db.get_response(int(response_id))
 
-        return False
+        if response is None:
+            self.index.remove(int(response_id))
+        else:
+            self.index.add(response)
 
     @Cog.listener()
     async def on_message(self, message: Message):
         if message.author.bot:
             return
 
-        auto_resps = await self.db.get_responses()
-
-        # Loops over all responses
-        # If a certain trigger gets matched within the message,
+        # Loops over the responses whose trigger matched the message,
         # Send a response based on the response type.
-        for response in auto_resps:
-            if not self.__match(
-                message.content,
-                response["message"],
-                response["matching_type"]
-            ):
-                continue
-
-            channels = await self.db.get_response_channels(response["id"])
-
-            if response["specified"] and message.channel.id not in channels:
-                continue
-
+        for response in self.index.match(message.content, message.channel.id):
             if response["response_type"].strip() == "reply":
                 await message.reply(response["response"])
                 continue
@@ -120,7 +96,13 @@ class Responder(GroupCog):
         if isinstance(matching_type, str):
             matching_type = Choice(name=matching_type, value=matching_type)
 
-        modal = AutoResponder(self.db, response_type.value, matching_type.value, self.bot)
+        modal = AutoResponder(
+            self.db,
+            self.index,
+            response_type.value,
+            matching_type.value,
+            self.bot
+        )
         await interaction.response.send_modal(modal)
         await modal.wait()
 
@@ -184,6 +166,7 @@ class Responder(GroupCog):
         is_deleted = await self.db.delete_response(response_id)
 
         if is_deleted:
+            self.index.remove(response_id)
             message = "Deleted Successfully."
         else:
             message = f"There was a problem deleting #{response_id}. It may not exist."
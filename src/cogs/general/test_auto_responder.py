@@ -1,8 +1,15 @@
 import unittest
 from unittest.async_case import IsolatedAsyncioTestCase
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
 
 from src.cogs.general.auto_responder import Responder
+from src.ui.modals.auto_responder import AutoResponder
+from src.utils.aho_corasick import AhoCorasick
+from src.utils.trigger_index import TriggerIndex
+
+
+# Responses that are not restricted to any channel.
+GLOBAL = {"specified": False, "channels": frozenset()}
 
 
 class TestAutoResponder(IsolatedAsyncioTestCase):
@@ -21,18 +28,18 @@ class TestAutoResponder(IsolatedAsyncioTestCase):
         mock_message.channel.id = 123456
         mock_message.reply = AsyncMock()
 
-        # Mock database responses
-        self.mock_db.get_responses.return_value = [
+        # Load the responses into the trigger index
+        self.cog.index.load([
             {
                 "id": 1,
                 "message": "hello",
                 "response": "Hello there!",
                 "matching_type": "strict",
                 "response_type": "reply",
-                "specified": False
+                "specified": False,
+                "channels": frozenset()
             }
-        ]
-        self.mock_db.get_response_channels.return_value = []
+        ])
 
         await self.cog.on_message(mock_message)
 
@@ -46,17 +53,17 @@ class TestAutoResponder(IsolatedAsyncioTestCase):
         mock_message.channel.id = 123456
         mock_message.channel.send = AsyncMock()
 
-        self.mock_db.get_responses.return_value = [
+        self.cog.index.load([
             {
                 "id": 1,
                 "message": "hello",
                 "response": "Hi there!",
                 "matching_type": "lenient",
                 "response_type": "regular",
-                "specified": False
+                "specified": False,
+                "channels": frozenset()
             }
-        ]
-        self.mock_db.get_response_channels.return_value = []
+        ])
 
         await self.cog.on_message(mock_message)
 
@@ -80,18 +87,18 @@ class TestAutoResponder(IsolatedAsyncioTestCase):
         mock_message.channel.send = AsyncMock()
 
         # Response is specified for certain channels only
-        self.mock_db.get_responses.return_value = [
+        self.cog.index.load([
             {
                 "id": 1,
                 "message": "test",
                 "response": "Test response",
                 "matching_type": "strict",
                 "response_type": "regular",
-                "specified": True
+                "specified": True,
+                # Message channel is not in allowed channels
+                "channels": frozenset({789012})
             }
-        ]
-        # Message channel is not in allowed channels
-        self.mock_db.get_response_channels.return_value = [789012]
+        ])
 
         await self.cog.on_message(mock_message)
 
@@ -105,60 +112,261 @@ class TestAutoResponder(IsolatedAsyncioTestCase):
         mock_message.content = "no match"
         mock_message.channel.send = AsyncMock()
 
-        self.mock_db.get_responses.return_value = [
+        self.cog.index.load([
             {
                 "id": 1,
                 "message": "hello",
                 "response": "Hi!",
                 "matching_type": "strict",
                 "response_type": "regular",
-                "specified": False
+                "specified": False,
+                "channels": frozenset()
             }
-        ]
+        ])
 
         await self.cog.on_message(mock_message)
 
         mock_message.channel.send.assert_not_awaited()
 
+    async def test_on_message_does_not_query_responses(self):
+        """Test that matching is served from the in-memory index"""
+        mock_message = MagicMock()
+        mock_message.author.bot = False
+        mock_message.content = "hello"
+        mock_message.channel.send = AsyncMock()
+
+        self.cog.index.load([
+            {
+                "id": 1,
+                "message": "hello",
+                "response": "Hi!",
+                "matching_type": "strict",
+                "response_type": "regular",
+                "specified": False,
+                "channels": frozenset()
+            }
+        ])
+
+        await self.cog.on_message(mock_message)
+
+        self.mock_db.get_responses.assert_not_awaited()
+        mock_message.channel.send.assert_awaited_once_with("Hi!")
+
+    async def test_cog_load_builds_index(self):
+        """Test that the responses are loaded once on cog load"""
+        self.mock_bot.pool = MagicMock()
+
+        with patch("src.cogs.general.auto_responder.AutoRespondDB") as mock_db_cls:
+            mock_db_cls.return_value.get_responses = AsyncMock(return_value=[
+                {"id": 2, "message": "b", "matching_type": "strict", **GLOBAL},
+                {"id": 1, "message": "a", "matching_type": "strict", **GLOBAL},
+            ])
+
+            await self.cog.cog_load()
+
+        self.assertEqual([r["id"] for r in self.cog.index], [1, 2])
+        self.mock_bot.invalidation.subscribe.assert_any_call(
+            "pph_auto_responses", self.cog._refresh_response
+        )
+
+    async def test_refresh_response_patches_index(self):
+        """Test that a change notification reloads only the changed response"""
+        self.cog.index.load([{"id": 1, "message": "hello", "matching_type": "strict", **GLOBAL}])
+        self.mock_db.get_response.return_value = {
+            "id": 1, "message": "bye", "matching_type": "strict", **GLOBAL
+        }
+
+        await self.cog._refresh_response("1")
+
+        self.mock_db.get_response.assert_awaited_once_with(1)
+        self.mock_db.get_responses.assert_not_awaited()
+        self.assertFalse(self.cog.index.match("hello", 123456))
+        self.assertTrue(self.cog.index.match("bye", 123456))
+
+        self.mock_db.get_response.return_value = None
+        await self.cog._refresh_response("1")
+
+        self.assertEqual(len(self.cog.index), 0)
+
+    def _match(self, message, trigger, matching_type):
+        index = TriggerIndex()
+        index.load([{"id": 1, "message": trigger, "matching_type": matching_type, **GLOBAL}])
+        return bool(index.match(message, 123456))
+
     def test_match_strict(self):
         """Test strict matching logic"""
         # Test exact match
-        result = self.cog._Responder__match("hello", "hello", "strict")
-        self.assertTrue(result)
+        self.assertTrue(self._match("hello", "hello", "strict"))
 
         # Test non-match
-        result = self.cog._Responder__match("hello world", "hello", "strict")
-        self.assertFalse(result)
+        self.assertFalse(self._match("hello world", "hello", "strict"))
 
     def test_match_lenient(self):
         """Test lenient matching logic"""
         # Test case-insensitive substring match
-        result = self.cog._Responder__match("Hello World", "hello", "lenient")
-        self.assertTrue(result)
+        self.assertTrue(self._match("Hello World", "hello", "lenient"))
 
         # Test non-match
-        result = self.cog._Responder__match("goodbye", "hello", "lenient")
-        self.assertFalse(result)
+        self.assertFalse(self._match("goodbye", "hello", "lenient"))
 
     def test_match_strict_contains(self):
         """Test strict contains matching logic"""
         # Test word boundary match
-        result = self.cog._Responder__match("hello world", "hello", "strict_contains")
-        self.assertTrue(result)
+        self.assertTrue(self._match("hello world", "hello", "strict_contains"))
+        self.assertTrue(self._match("well hello there", "hello", "strict_contains"))
+        self.assertTrue(self._match("say hello", "hello", "strict_contains"))
 
         # Test non-word boundary (should not match)
-        result = self.cog._Responder__match("helloworld", "hello", "strict_contains")
-        self.assertFalse(result)
+        self.assertFalse(self._match("helloworld", "hello", "strict_contains"))
+        self.assertFalse(self._match("othello", "hello", "strict_contains"))
+
+        # Strict contains is case sensitive
+        self.assertFalse(self._match("Hello world", "hello", "strict_contains"))
+
+    def test_match_strict_contains_later_occurrence(self):
+        """Test that a bounded occurrence is found after an unbounded one"""
+        self.assertTrue(self._match("helloworld hello", "hello", "strict_contains"))
 
     def test_match_regex(self):
         """Test regex matching logic"""
         # Test simple regex match
-        result = self.cog._Responder__match("hello123", r"hello\d+", "regex")
-        self.assertTrue(result)
+        self.assertTrue(self._match("hello123", r"hello\d+", "regex"))
 
         # Test non-match
-        result = self.cog._Responder__match("hello", r"hello\d+", "regex")
-        self.assertFalse(result)
+        self.assertFalse(self._match("hello", r"hello\d+", "regex"))
+
+    def test_match_regex_combined(self):
+        """Test that every matching regex fires, not just the first"""
+        index = TriggerIndex()
+        index.load([
+            {"id": 1, "message": r"foo\d", "matching_type": "regex", **GLOBAL},
+            {"id": 2, "message": r"hello\s+\w+", "matching_type": "regex", **GLOBAL},
+            {"id": 3, "message": r"hel+o", "matching_type": "regex", **GLOBAL},
+            {"id": 4, "message": r"(he)llo \1", "matching_type": "regex", **GLOBAL},
+            {"id": 5, "message": r"(?i)HELLO", "matching_type": "regex", **GLOBAL},
+        ])
+
+        result = index.match("hello world", 123456)
+
+        self.assertEqual([r["id"] for r in result], [2, 3, 5])
+        self.assertEqual([r["id"] for r in index.match("hello he", 123456)], [2, 3, 4, 5])
+        self.assertEqual(index.match("nothing", 123456), [])
+
+    def test_match_regex_invalid_pattern(self):
+        """Test that invalid stored patterns are skipped instead of raising"""
+        index = TriggerIndex()
+        index.load([
+            {"id": 1, "message": r"hello(", "matching_type": "regex", **GLOBAL},
+            {"id": 2, "message": r"hello", "matching_type": "regex", **GLOBAL},
+        ])
+
+        self.assertEqual([r["id"] for r in index.invalid], [1])
+        self.assertEqual([r["id"] for r in index.match("hello", 123456)], [2])
+
+    async def test_modal_rejects_invalid_regex(self):
+        """Test that an invalid regex is rejected when it is added"""
+        modal = AutoResponder(self.mock_db, self.cog.index, "reply", "regex", self.mock_bot)
+        modal.message._value = "hello("
+        mock_interaction = AsyncMock()
+
+        await modal.on_submit(mock_interaction)
+
+        call_args = mock_interaction.response.send_message.call_args
+        self.assertIn("Invalid regex pattern", call_args.args[0])
+        self.assertTrue(call_args.kwargs["ephemeral"])
+
+    def test_match_channel_restrictions(self):
+        """Test that restricted responses only match in their channels"""
+        index = TriggerIndex()
+        index.load([
+            {"id": 1, "message": "hello", "matching_type": "lenient", **GLOBAL},
+            {
+                "id": 2,
+                "message": "hello",
+                "matching_type": "strict",
+                "specified": True,
+                "channels": frozenset({1, 2})
+            },
+            {
+                "id": 3,
+                "message": "hel+o",
+                "matching_type": "regex",
+                "specified": True,
+                "channels": frozenset({3})
+            },
+        ])
+
+        self.assertEqual([r["id"] for r in index.match("hello", 1)], [1, 2])
+        self.assertEqual([r["id"] for r in index.match("hello", 3)], [1, 3])
+        self.assertEqual([r["id"] for r in index.match("hello", 4)], [1])
+
+    def test_index_shards_by_channel(self):
+        """Test that add and remove only touch the affected channel shards"""
+        index = TriggerIndex()
+        index.load([{"id": 1, "message": "hello", "matching_type": "lenient", **GLOBAL}])
+
+        index.add({
+            "id": 2,
+            "message": "hello",
+            "matching_type": "lenient",
+            "specified": True,
+            "channels": frozenset({5})
+        })
+
+        self.assertEqual(set(index._shards), {None, 5})
+        self.assertEqual([r["id"] for r in index.match("hello", 5)], [1, 2])
+
+        # Moving the response to another channel drops the old shard.
+        index.add({
+            "id": 2,
+            "message": "hello",
+            "matching_type": "lenient",
+            "specified": True,
+            "channels": frozenset({6})
+        })
+
+        self.assertEqual(set(index._shards), {None, 6})
+        self.assertEqual([r["id"] for r in index.match("hello", 5)], [1])
+
+        index.remove(1)
+
+        self.assertEqual(set(index._shards), {6})
+        self.assertEqual(index.match("hello", 5), [])
+        self.assertEqual([r["id"] for r in index.match("hello", 6)], [2])
+
+    def test_match_many_triggers_in_order(self):
+        """Test that all matching responses are found in creation order"""
+        index = TriggerIndex()
+        index.load([
+            {"id": 3, "message": "world", "matching_type": "lenient", **GLOBAL},
+            {"id": 1, "message": "hello", "matching_type": "strict_contains", **GLOBAL},
+            {"id": 2, "message": "lo wo", "matching_type": "lenient", **GLOBAL},
+            {"id": 4, "message": "bye", "matching_type": "lenient", **GLOBAL},
+            {"id": 5, "message": "hello world", "matching_type": "strict", **GLOBAL},
+        ])
+
+        result = index.match("hello world", 123456)
+
+        self.assertEqual([r["id"] for r in result], [1, 2, 3, 5])
+
+    def test_match_shared_trigger(self):
+        """Test that responses sharing a trigger all match"""
+        index = TriggerIndex()
+        index.load([
+            {"id": 1, "message": "hello", "matching_type": "lenient", **GLOBAL},
+            {"id": 2, "message": "hello", "matching_type": "strict_contains", **GLOBAL},
+        ])
+
+        self.assertEqual([r["id"] for r in index.match("HELLO there", 123456)], [1])
+        self.assertEqual([r["id"] for r in index.match("hello there", 123456)], [1, 2])
+
+    def test_aho_corasick_overlapping_patterns(self):
+        """Test that overlapping patterns are all reported"""
+        automaton = AhoCorasick(["he", "she", "hers", "his"])
+
+        result = list(automaton.iter("ushers"))
+
+        self.assertEqual(sorted(result), [(3, "he"), (3, "she"), (5, "hers")])
 
     async def test_view_responses_with_data(self):
         """Test viewing responses when data exists"""
@@ -210,6 +418,18 @@ class TestAutoResponder(IsolatedAsyncioTestCase):
             ephemeral=True
         )
 
+    async def test_delete_response_updates_index(self):
+        """Test that a deleted response is dropped from the index"""
+        mock_interaction = AsyncMock()
+
+        self.cog.index.load([{"id": 1, "message": "hello", "matching_type": "strict", **GLOBAL}])
+        self.mock_db.records_count.return_value = 1
+        self.mock_db.delete_response.return_value = True
+
+        await self.cog.delete_responses.callback(self.cog, interaction=mock_interaction, response_id=1)
+
+        self.assertEqual(len(self.cog.index), 0)
+
     async def test_delete_response_not_found(self):
         """Test deleting non-existent response"""
         mock_interaction = AsyncMock()
@@ -1,14 +1,16 @@
 import unittest
 from unittest.async_case import IsolatedAsyncioTestCase
 from unittest.mock import MagicMock, AsyncMock, patch
-from datetime import datetime, time
+from datetime import datetime, timezone
 
-from src.cogs.general.trivia import Trivia
+import discord
+
+from src.cogs.general.trivia import BUFFER_SIZE, Trivia
+from src.utils.http import HttpResponse
 
 
 class TestTrivia(IsolatedAsyncioTestCase):
-    @patch("src.cogs.general.trivia.requests.get")
-    async def test_trivia_loop_success(self, mock_get):
+    async def test_trivia_loop_success(self):
         """Test successful trivia loop execution"""
         mock_bot = MagicMock()
         mock_bot.config.api.api_ninja = "test_api_key"
@@ -24,41 +26,33 @@ class TestTrivia(IsolatedAsyncioTestCase):
 
         # Mock config and database
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
         mock_config.get_config.return_value = {"config_status": True}
         
         mock_db = AsyncMock()
-        
+        mock_db.pop_fact.return_value = None  # Empty buffer, falls back to the API
+
         cog = Trivia(mock_bot)
         cog.config = mock_config
         cog.db = mock_db
         cog.sched = {"channel_id": "123456", "schedule": "12:00"}
-        cog.sent_today = False
-        cog.sent_date = None
 
         # Mock successful API response
-        mock_response = MagicMock()
-        mock_response.ok = True
-        mock_response.json.return_value = [{"fact": "Test trivia fact"}]
-        mock_get.return_value = mock_response
+        mock_get = cog.http_client.get = AsyncMock()
+        mock_get.return_value = HttpResponse(200, [{"fact": "Test trivia fact"}], {})
 
-        # Mock datetime to ensure trivia should be sent
-        with patch("src.cogs.general.trivia.datetime") as mock_datetime:
-            mock_datetime.today.return_value.date.return_value = datetime(2023, 1, 1).date()
-            mock_datetime.utcnow.return_value.time.return_value = time(13, 0)  # After 12:00
-            
-            await cog.trivia_loop()
+        await cog.post_trivia()
 
-        mock_get.assert_called_once_with(
+        mock_get.assert_awaited_once_with(
             "https://api.api-ninjas.com/v1/facts",
             headers={"X-Api-Key": "test_api_key"}
         )
         mock_trivia_channel.send.assert_awaited_once()
         
-        # Check that sent_today is now True
-        self.assertTrue(cog.sent_today)
+        # Check that the send was recorded
+        mock_db.add_facts.assert_awaited_once_with(["Test trivia fact"], sent=True)
 
-    @patch("src.cogs.general.trivia.requests.get")
-    async def test_trivia_loop_api_error(self, mock_get):
+    async def test_trivia_loop_api_error(self):
         """Test trivia loop when API returns error"""
         mock_bot = MagicMock()
         mock_bot.config.api.api_ninja = "test_api_key"
@@ -72,42 +66,116 @@ class TestTrivia(IsolatedAsyncioTestCase):
         mock_bot.config.guild.log_channel = 789012
 
         mock_config = AsyncMock()
+
+        mock_config.get_config = MagicMock()
         mock_config.get_config.return_value = {"config_status": True}
         
         cog = Trivia(mock_bot)
         cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.pop_fact.return_value = None
         cog.sched = {"channel_id": "123456", "schedule": "12:00"}
-        cog.sent_today = False
 
         # Mock API error response
-        mock_response = MagicMock()
-        mock_response.ok = False
-        mock_response.status_code = 500
-        mock_get.return_value = mock_response
+        cog.http_client.get = AsyncMock(return_value=HttpResponse(500, "", {}))
 
-        with patch("src.cogs.general.trivia.datetime") as mock_datetime:
-            mock_datetime.today.return_value.date.return_value = datetime(2023, 1, 1).date()
-            mock_datetime.utcnow.return_value.time.return_value = time(13, 0)
-            
-            await cog.trivia_loop()
+        await cog.post_trivia()
 
         mock_log_channel.send.assert_awaited_once_with("Trivia API Error: 500")
         mock_trivia_channel.send.assert_not_awaited()
 
+    async def test_trivia_loop_sends_buffered_fact(self):
+        """Test that a queued fact is sent without calling the API"""
+        mock_bot = MagicMock()
+        mock_trivia_channel = AsyncMock()
+        mock_bot.get_channel.return_value = mock_trivia_channel
+
+        mock_config = MagicMock()
+        mock_config.get_config.return_value = {"config_status": True}
+
+        cog = Trivia(mock_bot)
+        cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.pop_fact.return_value = (1, "Buffered fact")
+        cog.http_client.get = AsyncMock()
+        cog.sched = {"channel_id": "123456", "schedule": "00:00"}
+
+        await cog.post_trivia()
+
+        cog.http_client.get.assert_not_awaited()
+        embed = mock_trivia_channel.send.call_args.kwargs["embed"]
+        self.assertEqual(embed.description, "Buffered fact")
+
+    async def test_trivia_requeues_fact_on_send_failure(self):
+        """Test that a fact goes back in the queue if it could not be sent"""
+        mock_bot = MagicMock()
+        mock_trivia_channel = AsyncMock()
+        mock_trivia_channel.send.side_effect = discord.HTTPException(MagicMock(status=500), "error")
+        mock_bot.get_channel.return_value = mock_trivia_channel
+
+        cog = Trivia(mock_bot)
+        cog.config = MagicMock()
+        cog.config.get_config.return_value = {"config_status": True}
+        cog.db = AsyncMock()
+        cog.db.pop_fact.return_value = (1, "Buffered fact")
+        cog.sched = {"channel_id": "123456", "schedule": "00:00"}
+
+        with self.assertRaises(discord.HTTPException):
+            await cog.post_trivia()
+
+        cog.db.requeue_fact.assert_awaited_once_with(1)
+
+    async def test_prefetch_fills_empty_buffer(self):
+        """Test that an empty buffer is refilled outside the quiet hours too"""
+        mock_bot = MagicMock()
+        cog = Trivia(mock_bot)
+        cog.db = AsyncMock()
+        cog.db.queued_facts.return_value = 0
+        cog.db.add_facts.return_value = BUFFER_SIZE
+        cog.http_client.get = AsyncMock(return_value=HttpResponse(200, [{"fact": "A fact"}], {}))
+
+        with patch("src.cogs.general.trivia.datetime") as mock_datetime:
+            mock_datetime.now.return_value = datetime(2023, 1, 1, 4, 0)  # 12:00 UTC+8
+
+            await cog.prefetch_facts()
+
+        self.assertEqual(cog.http_client.get.await_count, BUFFER_SIZE)
+        cog.db.add_facts.assert_awaited_once_with(["A fact"] * BUFFER_SIZE)
+
+    async def test_prefetch_waits_for_quiet_hours(self):
+        """Test that a partly filled buffer is only topped up in the quiet hours"""
+        mock_bot = MagicMock()
+        cog = Trivia(mock_bot)
+        cog.db = AsyncMock()
+        cog.db.queued_facts.return_value = 2
+        cog.http_client.get = AsyncMock(return_value=HttpResponse(200, [{"fact": "A fact"}], {}))
+
+        with patch("src.cogs.general.trivia.datetime") as mock_datetime:
+            mock_datetime.now.return_value = datetime(2023, 1, 1, 4, 0)  # 12:00 UTC+8
+            await cog.prefetch_facts()
+
+            cog.http_client.get.assert_not_awaited()
+
+            mock_datetime.now.return_value = datetime(2023, 1, 1, 19, 0)  # 03:00 UTC+8
+            await cog.prefetch_facts()
+
+        self.assertEqual(cog.http_client.get.await_count, BUFFER_SIZE - 2)
+
     async def test_trivia_loop_disabled(self):
         """Test trivia loop when feature is disabled"""
         mock_bot = MagicMock()
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
         mock_config.get_config.return_value = {"config_status": False}
         
         cog = Trivia(mock_bot)
         cog.config = mock_config
         cog.sched = {"channel_id": "123456", "schedule": "12:00"}
 
-        with patch("src.cogs.general.trivia.requests.get") as mock_get:
-            await cog.trivia_loop()
+        cog.http_client.get = AsyncMock()
+        await cog.post_trivia()
 
-        mock_get.assert_not_called()
+        cog.http_client.get.assert_not_awaited()
 
     async def test_trivia_loop_no_schedule(self):
         """Test trivia loop when no schedule is configured"""
@@ -115,16 +183,17 @@ class TestTrivia(IsolatedAsyncioTestCase):
         cog = Trivia(mock_bot)
         cog.sched = None
 
-        with patch("src.cogs.general.trivia.requests.get") as mock_get:
-            await cog.trivia_loop()
+        cog.http_client.get = AsyncMock()
+        await cog.post_trivia()
 
-        mock_get.assert_not_called()
+        cog.http_client.get.assert_not_awaited()
 
     async def test_toggle_command(self):
         """Test toggle command"""
         mock_bot = MagicMock()
         mock_interaction = AsyncMock()
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
         mock_config.get_config.return_value = {"config_status": True}
         mock_config.toggle_config.return_value = True
 
@@ -139,26 +208,36 @@ class TestTrivia(IsolatedAsyncioTestCase):
             ephemeral=True
         )
 
-    def test_get_schedule(self):
-        """Test _get_schedule method"""
-        mock_bot = MagicMock()
-        cog = Trivia(mock_bot)
-        
-        # Test with no schedule
-        cog.sched = None
-        result = cog._get_schedule()
-        self.assertEqual(result, time(0, 0))
-        
-        # Test with schedule
+    def test_next_run(self):
+        """Test that the next run is the next schedule, in UTC"""
+        cog = Trivia(MagicMock())
         cog.sched = {"schedule": "14:30"}
-        with patch("src.cogs.general.trivia.datetime") as mock_datetime:
-            mock_datetime.strptime.return_value.time.return_value = time(14, 30)
-            mock_datetime.combine.return_value = datetime(2023, 1, 1, 14, 30)
-            mock_datetime.today.return_value = datetime(2023, 1, 1)
-            
-            result = cog._get_schedule()
-            # Should return time adjusted for UTC conversion (14:30 - 8 hours = 6:30)
-            self.assertEqual(result, time(6, 30))
+
+        # 08:00 UTC+8, the slot is later today: 14:30 - 8 hours = 06:30 UTC
+        now = datetime(2023, 1, 1, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(cog._next_run(now), datetime(2023, 1, 1, 6, 30, tzinfo=timezone.utc))
+
+        # 17:00 UTC+8, it's tomorrow's
+        now = datetime(2023, 1, 1, 9, 0, tzinfo=timezone.utc)
+        self.assertEqual(cog._next_run(now), datetime(2023, 1, 2, 6, 30, tzinfo=timezone.utc))
+
+        # Not set up
+        cog.sched = None
+        self.assertIsNone(cog._next_run(now))
+
+    async def test_schedule_command_reschedules(self):
+        """Test that changing the schedule moves the scheduled job"""
+        cog = Trivia(MagicMock())
+        cog.db = AsyncMock()
+        cog.db.get_sched.return_value = {"channel_id": 123456, "schedule": "09:00"}
+        cog.sched = {"channel_id": 123456, "schedule": "12:00"}
+        cog.bot.scheduler.reschedule = AsyncMock()
+        mock_interaction = AsyncMock()
+
+        await cog.schedule.callback(cog, interaction=mock_interaction, schedule="09:00")
+
+        cog.db.update.assert_awaited_once_with(channel_id=123456, schedule="09:00")
+        cog.bot.scheduler.reschedule.assert_awaited_once_with("trivia")
 
 
 if __name__ == "__main__":
@@ -1,121 +1,162 @@
 # pylint: disable = no-member
 
-from datetime import datetime, time, timedelta
+from datetime import datetime, timedelta, timezone
 from textwrap import dedent
 from typing import Union
 
-import requests
 import discord
 from discord import Embed
-from discord.ext import tasks
 from discord.ext.commands import Bot, GroupCog
 from discord.app_commands import command, describe
 
-from src.data.admin.config_auto import Config
 from src.data.trivia import TriviaDB
 from src.utils.decorators import is_staff
+from src.utils.http import HttpError
+from src.utils.scheduler import Job, daily, every
 from src.utils.utils import validate_time
 
+# How many facts to keep queued ahead of the daily post.
+BUFFER_SIZE = 7
+# The hours (UTC+8, like the schedule) the buffer gets topped up in.
+QUIET_HOURS = range(2, 6)
+# The schedule is set in Philippine time.
+UTC8 = timezone(timedelta(hours=8))
+
 
 class Trivia(GroupCog):
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.sent_today = False
-        self.sent_date = None
         self.db = TriviaDB(self.bot.pool)
-        self.config = Config(self.bot.pool)
+        self.config = self.bot.toggles
+        self.http_client = self.bot.http_client
         self.sched: Union[dict, None] = None
 
     async def cog_load(self) -> None:
         self.sched = await self.db.get_sched()
-        self.trivia_loop.change_interval(time=self._get_schedule())
-        self.trivia_loop.start()
+        await self.bot.scheduler.add(Job("trivia", self.post_trivia, self._next_run))
+        await self.bot.scheduler.add(
+            Job("trivia_prefetch", self.prefetch_facts, every(timedelta(hours=1)))
+        )
+
+    async def cog_unload(self) -> None:
+        self.bot.scheduler.remove("trivia")
+        self.bot.scheduler.remove("trivia_prefetch")
 
-    def _get_schedule(self) -> time:
+    async def _fetch_fact(self) -> str:
         """
-        Gets the schedule of the trivia
+        Fetches a fact from the API.
 
-        :return: Time
+        :return: The fact
+        :raises HttpError: If the API could not be reached or answered with an error
         """
 
-        if self.sched is None:  # If the config is None, return 00:00
-            return time(0, 0)
+        response = await self.http_client.get(
+            "https://api.api-ninjas.com/v1/facts",
+            headers={
+                "X-Api-Key": self.bot.config.api.api_ninja
+            }
+        )
+
+        if not response.ok:
+            raise HttpError(str(response.status))
+
+        return response.data[0]["fact"]
+
+    async def prefetch_facts(self) -> None:
+        """
+        Tops up the fact buffer in the background, during the quiet hours.
+        """
+
+        queued = await self.db.queued_facts()
+
+        if queued >= BUFFER_SIZE:
+            return
+
+        # An empty buffer is refilled right away, otherwise it waits for the quiet hours.
+        hour = (datetime.now(timezone.utc) + timedelta(hours=8)).hour
+
+        if queued and hour not in QUIET_HOURS:
+            return
+
+        facts = []
+
+        for _ in range(BUFFER_SIZE - queued):
+            try:
+                facts.append(await self._fetch_fact())
+            except HttpError as e:
+                self.bot.logger.warning(f"Trivia prefetch stopped: {e}")
+                break
+
+        if facts:
+            added = await self.db.add_facts(facts)
+            self.bot.logger.info(f"Trivia prefetched {added} new facts ({len(facts) - added} duplicates)")
+
+    def _next_run(self, after: datetime) -> datetime | None:
+        """
+        Gets when the next trivia is due, the scheduler catches up a missed one.
 
-        utc8 = datetime.strptime(
-            self.sched["schedule"],
-            "%H:%M").time()  # Converts the schedule to a time object
+        :param after: The time to get the next trivia after
+        :return: The due time in UTC, or None if the trivia is not set up
+        """
 
-        sched_today = datetime.combine(
-            datetime.today(),
-            utc8)  # Combines the schedule with the current day
+        if self.sched is None:
+            return None
 
-        schedule = sched_today - timedelta(hours=8)  # Converts the schedule to UTC+0
+        schedule = datetime.strptime(self.sched["schedule"], "%H:%M").time()
 
-        return schedule.time()
+        return daily(schedule, UTC8)(after)
 
-    @tasks.loop()
-    async def trivia_loop(self) -> None:
+    async def post_trivia(self) -> None:
         """
-        The trivia loop that sends the trivia every day
+        Sends the trivia of the day
         """
 
         if self.sched is None:
             # If the config is None, return
             return
 
-        config = await self.config.get_config("trivia")
+        config = self.config.get_config("trivia")
 
         if not config["config_status"]:
             # If the trivia is toggled off
             return
 
-        if datetime.today().date() != self.sent_date:
-            # If the current date is not equal to the sent_date, set sent_today to False
-            self.sent_today = False
-
-        if not datetime.utcnow().time() >= self._get_schedule():
-            # If the current time is not greater than the schedule, return
-            return
-
-        if self.sent_today:
-            # If the trivia has been sent today, return
-            return
-
         trivia_channel = self.bot.get_channel(
             int(self.sched["channel_id"])
         )  # Gets the trivia channel
 
         log_channel = self.bot.get_channel(self.bot.config.guild.log_channel)
 
-        response = requests.get(
-            "https://api.api-ninjas.com/v1/facts",
-            headers={
-                "X-Api-Key": self.bot.config.api.api_ninja
-            }
-        )
+        queued = await self.db.pop_fact()
 
-        if not response.ok:  # If the status code is not 200, return
-            await log_channel.send(f"Trivia API Error: {response.status_code}")
-            return
+        if queued is not None:
+            fact_id, fact = queued
+        else:
+            # The buffer ran dry, ask the API now.
+            try:
+                fact = await self._fetch_fact()
+            except HttpError as e:
+                await log_channel.send(f"Trivia API Error: {e}")
+                return
 
-        response_json = response.json()
+            fact_id = None
+            await self.db.add_facts([fact], sent=True)
 
         embed = Embed(
             title="Prof. Progphil Trivia of the Day",
-            description=response_json[0]["fact"],
+            description=fact,
             color=discord.Color.blurple()
         ).set_image(
             url="https://cdn.discordapp.com/attachments/972510204505763951/1076388478088122368/image-12.png"
         )
 
-        await trivia_channel.send(embed=embed)
-
-        self.sent_today = True
-        self.sent_date = datetime.today().date()
+        try:
+            await trivia_channel.send(embed=embed)
+        except discord.HTTPException:
+            if fact_id is not None:
+                await self.db.requeue_fact(fact_id)
 
-    @trivia_loop.before_loop
-    async def before_trivia_loop(self) -> None:
-        await self.bot.wait_until_ready()
+            raise
 
     @is_staff()
     @command(name="toggle", description="Toggle the trivia")
@@ -130,7 +171,7 @@ class Trivia(GroupCog):
         }
         config = "trivia"
 
-        if not await self.config.get_config(config):
+        if not self.config.get_config(config):
             await self.config.add_config(config)
 
         toggle = await self.config.toggle_config(config)
@@ -170,8 +211,7 @@ class Trivia(GroupCog):
         )  # Updates the config
 
         self.sched = await self.db.get_sched()  # Updates the config
-        self.trivia_loop.change_interval(time=self._get_schedule())
-        self.trivia_loop.restart()  # Restart the loop for the changes to be saved.
+        await self.bot.scheduler.reschedule("trivia")  # Sleep until the new time instead
 
         await interaction.response.send_message(
             f"Trivia session scheduled at {schedule}",
@@ -271,6 +311,7 @@ class Trivia(GroupCog):
         )  # Inserts the config
 
         self.sched = await self.db.get_sched()  # Updates the config
+        await self.bot.scheduler.reschedule("trivia")
 
         await interaction.response.send_message(
             "Trivia setup",
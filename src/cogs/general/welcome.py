@@ -16,6 +16,12 @@ class Welcomer(GroupCog):
         self.settings = Settings(self.bot.pool)
         self.db = WelcomeDB(self.bot.pool)
 
+    async def cog_load(self):
+        self.bot.invalidation.subscribe("pph_settings", self.settings.refresh)
+
+    async def cog_unload(self):
+        self.bot.invalidation.unsubscribe("pph_settings", self.settings.refresh)
+
     def __parse(self, message: str, member: Member):
         """
         Formats the message from the database
@@ -1,31 +1,88 @@
 import os
+from datetime import datetime, timedelta, timezone
 from logging import Logger
 
 import discord
-import requests
 from discord import Embed
-from discord.app_commands import command
+from discord.app_commands import Choice, command, describe
 from discord.ext.commands import Bot, Context, GroupCog
 from discord.ext.commands import command as prefixed_command
 
-from src.data.admin.config_auto import Config
+from src.data.currency_converter import CurrencyDB
 from src.ui.views.currency_converter import CurrencyConverterPagination
+from src.utils.currencies import CurrencySymbols
 from src.utils.decorators import is_staff
+from src.utils.exchange_rates import ExchangeRates
+from src.utils.http import HttpError
+from src.utils.scheduler import Job, every
 
 
 class Converter(GroupCog):
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.config = Config(self.bot.pool)  # type: ignore
+        self.config = self.bot.toggles  # type: ignore
         self.logger: Logger = self.bot.logger  # type: ignore
+        self.http_client = self.bot.http_client  # type: ignore
+        self.db = CurrencyDB(self.bot.pool)  # type: ignore
+        self.currency_config = self.bot.config.currency  # type: ignore
+        self.rates = ExchangeRates(self.currency_config.base)
+        self.symbols = CurrencySymbols()
+
+    @property
+    def refresh_interval(self) -> timedelta:
+        """How long a quote table is used before it gets refetched."""
+
+        return timedelta(minutes=self.currency_config.refresh_minutes)
 
     async def cog_load(self):
-        req = requests.get(
+        response = await self.http_client.get(
             "https://api.apilayer.com/currency_data/list",
             headers={"apiKey": os.environ["currency_api_key"]},
         )
-        symbols = req.json()["currencies"] or []
-        self.symbols = [(symbol, symbols[symbol]) for symbol in symbols]
+        self.symbols = CurrencySymbols(response.data["currencies"] or {})
+
+        # Warm start from the last stored table, the scheduler resumes
+        # refetching it where it left off.
+        snapshot = await self.db.get_snapshot(self.rates.base)
+
+        if snapshot is not None:
+            quotes, fetched_at = snapshot
+            self.rates.update(quotes, fetched_at)
+
+        await self.bot.scheduler.add(
+            Job("currency_rates", self.refresh_rates, every(self.refresh_interval))
+        )
+
+        if self.rates.is_stale(self.refresh_interval):
+            await self.bot.scheduler.reschedule(
+                "currency_rates", datetime.now(timezone.utc)
+            )
+
+    async def cog_unload(self):
+        self.bot.scheduler.remove("currency_rates")
+
+    async def refresh_rates(self):
+        """Fetches the quote table of the base currency."""
+
+        try:
+            response = await self.http_client.get(
+                "https://api.apilayer.com/currency_data/live",
+                params={"source": self.rates.base},
+                headers={"apiKey": os.environ["currency_api_key"]},
+            )
+        except HttpError as e:
+            self.logger.error(f"Error fetching exchange rates: {e}")
+            return
+
+        data = response.data
+
+        if not response.ok or not isinstance(data, dict) or not data.get("success"):
+            self.logger.error(f"Error fetching exchange rates: {data}")
+            return
+
+        fetched_at = datetime.now(timezone.utc)
+        self.rates.update(data["quotes"], fetched_at)
+        await self.db.save_snapshot(self.rates.base, data["quotes"], fetched_at)
 
     def is_valid(self, amount: str):
         return amount.isdigit() or amount.count(".") == 1
@@ -49,35 +106,68 @@ class Converter(GroupCog):
         :param from_currency: The Currency to Convert From
         :param to_currency: The Currency to Convert To
         """
-        if not self.is_valid(amount) or len(amount) > 10:
-            await ctx.send("Please enter a valid amount.")
-            return
+        await ctx.send(await self._exchange(amount, from_currency, to_currency))
 
-        config = await self.config.get_config("currency_converter")
+    @command(name="exchange", description="Convert an amount from one currency to another.")
+    @describe(
+        amount="The amount to convert",
+        from_currency="The currency to convert from",
+        to_currency="The currency to convert to",
+    )
+    async def exchange_slash(
+        self,
+        interaction: discord.Interaction,
+        amount: str,
+        from_currency: str,
+        to_currency: str,
+    ) -> None:
+        """Convert Currency, with autocomplete for the currencies."""
 
-        if not config["config_status"]:
-            await ctx.send("Sorry, this command is currently disabled.")
-            return
+        # The API fallback may take longer than an interaction allows
+        await interaction.response.defer(thinking=True)
+        await interaction.followup.send(
+            await self._exchange(amount, from_currency, to_currency)
+        )
 
-        if not self._is_supported(from_currency):
-            await ctx.send(f"Sorry, {from_currency.upper()} is not supported.")
-            return
+    @exchange_slash.autocomplete("from_currency")
+    @exchange_slash.autocomplete("to_currency")
+    async def currency_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[Choice[str]]:
+        return [
+            Choice(name=f"{code} - {name}"[:100], value=code)
+            for code, name in self.symbols.complete(current.strip())
+        ]
 
-        if not self._is_supported(to_currency):
-            await ctx.send(f"Sorry, {to_currency.upper()} is not supported.")
-            return
+    async def _exchange(self, amount: str, from_currency: str, to_currency: str) -> str:
+        """
+        Converts the amount and builds the reply, shared by both exchange commands.
 
-        url = f"https://api.apilayer.com/currency_data/convert?from={from_currency}&to={to_currency}&amount={amount}"
-        response = requests.get(url, headers={"apiKey": os.environ["currency_api_key"]})
+        :param amount: The Amount to Convert
+        :param from_currency: The Currency to Convert From
+        :param to_currency: The Currency to Convert To
+        :return: The message to send back
+        """
+        if not self.is_valid(amount) or len(amount) > 10:
+            return "Please enter a valid amount."
 
-        data = response.json()
+        config = self.config.get_config("currency_converter")
 
-        if response.status_code != 200 or not data["success"]:
-            await ctx.send("Sorry, I could not convert that currency.")
-            self.logger.error(f"Error converting currency: {data}")
-            return
+        if not config["config_status"]:
+            return "Sorry, this command is currently disabled."
+
+        for currency in (from_currency, to_currency):
+            if not self._is_supported(currency):
+                return self._unsupported(currency)
 
-        converted_amount = data["result"]
+        converted_amount = self.rates.convert(float(amount), from_currency, to_currency)
+
+        if converted_amount is None:
+            # No table yet (or the pair is missing from it), ask the API.
+            converted_amount = await self._convert_live(amount, from_currency, to_currency)
+
+            if converted_amount is None:
+                return "Sorry, I could not convert that currency."
 
         decimal_places = 2
 
@@ -87,9 +177,53 @@ class Converter(GroupCog):
         formatted_to = (
             f"{round(converted_amount,decimal_places):,} {to_currency.upper()}"
         )
-        await ctx.send(
-            f"The exchange rate for {formatted_from} is around {formatted_to}."
-        )
+        return f"The exchange rate for {formatted_from} is around {formatted_to}."
+
+    def _unsupported(self, currency: str) -> str:
+        """
+        Builds the reply for an unsupported currency, with suggestions.
+
+        :param currency: The currency that is not supported
+        """
+        message = f"Sorry, {currency.upper()} is not supported."
+        suggestions = self.symbols.suggest(currency)
+
+        if suggestions:
+            message += f" Did you mean {', '.join(suggestions)}?"
+
+        return message
+
+    async def _convert_live(
+        self,
+        amount: str,
+        from_currency: str,
+        to_currency: str,
+    ) -> float | None:
+        """Converts through the API.
+
+        :param amount: The Amount to Convert
+        :param from_currency: The Currency to Convert From
+        :param to_currency: The Currency to Convert To
+        :return: The converted amount, or None if the conversion failed.
+        """
+
+        try:
+            response = await self.http_client.get(
+                "https://api.apilayer.com/currency_data/convert",
+                params={"from": from_currency, "to": to_currency, "amount": amount},
+                headers={"apiKey": os.environ["currency_api_key"]},
+            )
+        except HttpError as e:
+            self.logger.error(f"Error converting currency: {e}")
+            return
+
+        data = response.data
+
+        if response.status != 200 or not isinstance(data, dict) or not data.get("success"):
+            self.logger.error(f"Error converting currency: {data}")
+            return
+
+        return data["result"]
 
     @prefixed_command(usage="<currency>", help="Get a list of supported currencies.")
     async def currencies(
@@ -101,24 +235,20 @@ class Converter(GroupCog):
 
         :param ctx: The Context of the Command
         """
-        config = await self.config.get_config("currency_converter")
+        config = self.config.get_config("currency_converter")
 
         if not config["config_status"]:
             await ctx.send("Sorry, this command is currently disabled.")
             self.logger.info("Currency Converter is disabled.")
             return
 
+        pages = self.symbols.pages()
+
         embed = Embed()
         embed.title = "Here are the available currencies:"
-        embed.description = "\n".join(
-            [
-                f"{symbol[0].upper()} - {symbol[1]}"
-                for count, symbol in enumerate(self.symbols, start=1)
-                if count <= 10
-            ]
-        )
+        embed.description = pages[0]
 
-        view = CurrencyConverterPagination(ctx.author, self.symbols, self.logger)
+        view = CurrencyConverterPagination(ctx.author, pages, self.logger)
         await ctx.send(embed=embed, view=view)
 
     @is_staff()
@@ -140,7 +270,7 @@ class Converter(GroupCog):
         :param currency: The currency to check
         :return:
         """
-        return currency.upper() in [symbol[0] for symbol in self.symbols]
+        return currency in self.symbols
 
 
 async def setup(bot: Bot) -> None:
@@ -1,6 +1,6 @@
+from datetime import datetime, timedelta, timezone
 from typing import List, Tuple
 
-import requests
 import discord
 from discord import Embed
 from discord.ext.commands import (
@@ -10,16 +10,31 @@ from discord.ext.commands import (
 )
 from discord.app_commands import command
 
-from src.data.admin.config_auto import Config
+from src.data.define_word import DefineDB
 from src.ui.views.define_word import DefineWordPagination
+from src.utils.cache import TTLCache
 from src.utils.decorators import is_staff
+from src.utils.http import HttpError
 from discord.ext.commands import Bot
 
+# How long definitions are kept, words without one are retried sooner.
+DEFINITION_TTL = timedelta(days=30)
+MISSING_TTL = timedelta(days=1)
+# The most words kept in memory, the rest are only in the database.
+CACHE_SIZE = 512
+# The longest word the database cache stores.
+MAX_WORD_LENGTH = 100
+
 
 class Define(GroupCog):
     def __init__(self, bot: Bot):
         self.bot = bot
-        self.config = Config(self.bot.pool)
+        self.config = self.bot.toggles
+        self.http_client = self.bot.http_client
+        self.db = DefineDB(self.bot.pool)
+        self.cache: TTLCache[str, dict] = TTLCache(
+            maxsize=CACHE_SIZE, ttl=DEFINITION_TTL.total_seconds()
+        )
 
     @prefixed_command(
         usage="<word>",
@@ -37,16 +52,15 @@ class Define(GroupCog):
         :param ctx: The Context of the Command
         """
 
-        config = await self.config.get_config("define_word")
+        config = self.config.get_config("define_word")
 
         if not config["config_status"]:
             await ctx.send("Sorry, this command is currently disabled.")
             return
 
-        url = "https://api.dictionaryapi.dev/api/v2/entries/en/" + word
-        response = requests.get(url)
+        entry = await self._lookup(word.lower())
 
-        if not response.ok:
+        if entry is None or (entry["definitions"] is None and not entry["message"]):
             message = f"Could not find definition for {word.lower()}"
             respond_message = Embed(
                 description=message,
@@ -55,19 +69,16 @@ class Define(GroupCog):
 
             return await ctx.send(embed=respond_message)
 
-        data = response.json()
-
-        if "title" in data and data["title"] == "No Definitions Found":
-            message = data['message']
+        if entry["definitions"] is None:
             respond_message = Embed(
                 title=word,
-                description=message,
+                description=entry["message"],
                 color=discord.Color.blurple()
             )
             await ctx.send(embed=respond_message)
             return
 
-        data = self._format_data(data)
+        data = entry["definitions"]
         part_of_speech, definition = data[0]
 
         embed = Embed()
@@ -78,6 +89,87 @@ class Define(GroupCog):
 
         await ctx.send(embed=embed, view=view)
 
+    async def _lookup(self, word: str) -> dict | None:
+        """
+        Gets the definitions of a word, from memory, the database or the API.
+
+        :param word: The lowercased word
+        :return: The "definitions", or None if the word has none, and the
+            API's "message" for it. None if the API could not be reached.
+        """
+
+        entry = self.cache.get(word)
+
+        if entry is not None:
+            return entry
+
+        if len(word) <= MAX_WORD_LENGTH:
+            entry = await self.db.get_definition(word, DEFINITION_TTL, MISSING_TTL)
+
+            if entry is not None:
+                self._remember(word, entry)
+                return entry
+
+        entry = await self._fetch(word)
+
+        if entry is None:
+            # Not cached, the API may be back on the next try.
+            return None
+
+        entry["fetched_at"] = datetime.now(timezone.utc)
+        self._remember(word, entry)
+
+        if len(word) <= MAX_WORD_LENGTH:
+            await self.db.save_definition(
+                word, entry["definitions"], entry["message"], entry["fetched_at"]
+            )
+
+        return entry
+
+    def _remember(self, word: str, entry: dict) -> None:
+        """
+        Keeps an entry in memory for what is left of its lifetime.
+
+        :param word: The lowercased word
+        :param entry: The entry, with its "fetched_at"
+        """
+
+        ttl = DEFINITION_TTL if entry["definitions"] is not None else MISSING_TTL
+        age = datetime.now(timezone.utc) - entry["fetched_at"]
+        remaining = (ttl - age).total_seconds()
+
+        if remaining > 0:
+            self.cache.set(word, entry, ttl=remaining)
+
+    async def _fetch(self, word: str) -> dict | None:
+        """
+        Fetches and formats the definitions of a word from the API.
+
+        :param word: The lowercased word
+        :return: The entry, or None if the API could not be reached.
+        """
+
+        url = "https://api.dictionaryapi.dev/api/v2/entries/en/" + word
+
+        try:
+            response = await self.http_client.get(url)
+        except HttpError:
+            return None
+
+        if response.status == 404:
+            # "No Definitions Found", worth caching too.
+            return {"definitions": None, "message": None}
+
+        if not response.ok:
+            return None
+
+        data = response.data
+
+        if "title" in data and data["title"] == "No Definitions Found":
+            return {"definitions": None, "message": data["message"]}
+
+        return {"definitions": self._format_data(data) or None, "message": None}
+
     @is_staff()
     @command(name="toggle", description="Toggle the define word command.")
     async def toggle_config(self, interaction: discord.Interaction):
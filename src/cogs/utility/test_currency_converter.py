@@ -1,14 +1,19 @@
 import unittest
+from datetime import datetime, timedelta, timezone
 from unittest.async_case import IsolatedAsyncioTestCase
-from unittest.mock import MagicMock, AsyncMock, Mock, patch
+from unittest.mock import MagicMock, AsyncMock, Mock
 
 from asyncpg.connection import os
+from src.bot.config import CurrencyConfig
 from src.cogs.utility.currency_converter import Converter
+from src.utils.currencies import CurrencySymbols
+from src.utils.exchange_rates import ExchangeRates
+from src.utils.http import HttpResponse
 
 class TestCurrencyConverter(IsolatedAsyncioTestCase):
-    @patch("src.cogs.utility.currency_converter.requests.get")
-    async def test_currency_converter(self, mock_get):
+    async def test_currency_converter(self):
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
 
         os.environ["currency_api_key"] = "test_key"
 
@@ -16,7 +21,7 @@ class TestCurrencyConverter(IsolatedAsyncioTestCase):
         mock_ctx = AsyncMock()
         cog = Converter(mock_bot)
         cog.config = mock_config
-        cog.symbols = [
+        cog.symbols = CurrencySymbols([
             ("AED", "United Arab Emirates Dirham"),
             ("AFN", "Afghan Afghani"),
             ("ALL", "Albanian Lek"),
@@ -24,7 +29,7 @@ class TestCurrencyConverter(IsolatedAsyncioTestCase):
             ("USD", "United States Dollar"),
             ("EUR", "Euro"),
         ("GBP", "British Pound Sterling"),
-        ]
+        ])
 
         mock_member = MagicMock()
         mock_member.id = 1234567890
@@ -32,19 +37,117 @@ class TestCurrencyConverter(IsolatedAsyncioTestCase):
         mock_member.name = "Test User"
         mock_ctx.author = mock_member
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True, "result": 89.0}
-        mock_get.return_value = mock_response
+        mock_get = cog.http_client.get = AsyncMock()
+        mock_get.return_value = HttpResponse(200, {"success": True, "result": 89.0}, {})
 
-        expected_url = "https://api.apilayer.com/currency_data/convert?from=USD&to=EUR&amount=100"
+        expected_url = "https://api.apilayer.com/currency_data/convert"
 
-        await cog.config.get_config("currency_converter")
+        mock_config.get_config.return_value = {"config_status": True}
         await cog.exchange.callback(cog, ctx=mock_ctx, amount="100", from_currency="USD", to_currency="EUR")
 
-        mock_get.assert_called_once_with(expected_url, headers={"apiKey": "test_key"})
+        mock_get.assert_awaited_once_with(
+            expected_url,
+            params={"from": "USD", "to": "EUR", "amount": "100"},
+            headers={"apiKey": "test_key"},
+        )
         mock_ctx.send.assert_awaited_with("The exchange rate for 100.0 USD is around 89.0 EUR.")
 
+    async def test_currency_converter_uses_rate_table(self):
+        mock_config = MagicMock()
+        mock_config.get_config.return_value = {"config_status": True}
+
+        mock_ctx = AsyncMock()
+        cog = Converter(MagicMock())
+        cog.config = mock_config
+        cog.symbols = CurrencySymbols({"USD": "United States Dollar", "EUR": "Euro", "PHP": "Philippine Peso"})
+        cog.rates = ExchangeRates("USD")
+        cog.rates.update({"USDEUR": 0.5, "USDPHP": 50.0})
+        cog.http_client.get = AsyncMock()
+
+        await cog.exchange.callback(cog, ctx=mock_ctx, amount="10", from_currency="eur", to_currency="php")
+
+        cog.http_client.get.assert_not_awaited()
+        mock_ctx.send.assert_awaited_with("The exchange rate for 10.0 EUR is around 1,000.0 PHP.")
+
+    async def test_currency_converter_suggests_codes(self):
+        mock_config = MagicMock()
+        mock_config.get_config.return_value = {"config_status": True}
+
+        mock_ctx = AsyncMock()
+        cog = Converter(MagicMock())
+        cog.config = mock_config
+        cog.symbols = CurrencySymbols({"USD": "United States Dollar", "EUR": "Euro"})
+
+        await cog.exchange.callback(cog, ctx=mock_ctx, amount="10", from_currency="uds", to_currency="eur")
+
+        mock_ctx.send.assert_awaited_once_with("Sorry, UDS is not supported. Did you mean USD?")
+
+    async def test_currency_autocomplete(self):
+        cog = Converter(MagicMock())
+        cog.symbols = CurrencySymbols({
+            "PHP": "Philippine Peso",
+            "PEN": "Peruvian Nuevo Sol",
+            "EUR": "Euro",
+        })
+
+        choices = await cog.currency_autocomplete(MagicMock(), "p")
+        self.assertEqual([choice.value for choice in choices], ["PEN", "PHP"])
+
+        # Names are searched too
+        choices = await cog.currency_autocomplete(MagicMock(), "eu")
+        self.assertEqual([choice.value for choice in choices], ["EUR"])
+
+        choices = await cog.currency_autocomplete(MagicMock(), "phil")
+        self.assertEqual([choice.name for choice in choices], ["PHP - Philippine Peso"])
+
+    async def test_refresh_rates_stores_snapshot(self):
+        os.environ["currency_api_key"] = "test_key"
+
+        cog = Converter(MagicMock())
+        cog.currency_config = CurrencyConfig()
+        cog.rates = ExchangeRates("USD")
+        cog.db = AsyncMock()
+        cog.http_client.get = AsyncMock(return_value=HttpResponse(
+            200, {"success": True, "quotes": {"USDEUR": 0.5}}, {}
+        ))
+
+        await cog.refresh_rates()
+
+        cog.db.save_snapshot.assert_awaited_once()
+        self.assertEqual(cog.rates.convert(1, "EUR", "USD"), 2.0)
+
+        # Every tick refetches, the loop period is the refresh interval
+        cog.http_client.get.return_value = HttpResponse(
+            200, {"success": True, "quotes": {"USDEUR": 0.25}}, {}
+        )
+        await cog.refresh_rates()
+
+        self.assertEqual(cog.http_client.get.await_count, 2)
+        self.assertEqual(cog.rates.convert(1, "EUR", "USD"), 4.0)
+
+    async def test_cog_load_refreshes_a_stale_table_right_away(self):
+        os.environ["currency_api_key"] = "test_key"
+
+        for fetched_at, rescheduled in (
+            (datetime.now(timezone.utc) - timedelta(minutes=10), False),
+            (datetime.now(timezone.utc) - timedelta(days=1), True),
+        ):
+            cog = Converter(MagicMock())
+            cog.currency_config = CurrencyConfig()
+            cog.rates = ExchangeRates("USD")
+            cog.db = AsyncMock()
+            cog.db.get_snapshot.return_value = ({"USDEUR": 0.5}, fetched_at)
+            cog.http_client.get = AsyncMock(return_value=HttpResponse(
+                200, {"currencies": {"USD": "United States Dollar"}}, {}
+            ))
+            cog.bot.scheduler.add = AsyncMock()
+            cog.bot.scheduler.reschedule = AsyncMock()
+
+            await cog.cog_load()
+
+            cog.bot.scheduler.add.assert_awaited_once()
+            self.assertEqual(cog.bot.scheduler.reschedule.await_count, int(rescheduled))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,21 +1,25 @@
 import unittest
+from datetime import datetime, timezone
 from unittest.async_case import IsolatedAsyncioTestCase
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import MagicMock, AsyncMock
 
 from src.cogs.utility.define_word import Define
+from src.utils.http import HttpError, HttpResponse
 
 
 class TestDefineWord(IsolatedAsyncioTestCase):
-    @patch("src.cogs.utility.define_word.requests.get")
-    async def test_define_word_success(self, mock_get):
+    async def test_define_word_success(self):
         """Test successful word definition lookup"""
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
         mock_config.get_config.return_value = {"config_status": True}
 
         mock_bot = MagicMock()
         mock_ctx = AsyncMock()
         cog = Define(mock_bot)
         cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.get_definition.return_value = None
 
         mock_member = MagicMock()
         mock_member.id = 1234567890
@@ -23,9 +27,8 @@ class TestDefineWord(IsolatedAsyncioTestCase):
         mock_ctx.author = mock_member
 
         # Mock successful API response
-        mock_response = MagicMock()
-        mock_response.ok = True
-        mock_response.json.return_value = [
+        mock_get = cog.http_client.get = AsyncMock()
+        mock_get.return_value = HttpResponse(200, [
             {
                 "meanings": [
                     {
@@ -36,39 +39,38 @@ class TestDefineWord(IsolatedAsyncioTestCase):
                     }
                 ]
             }
-        ]
-        mock_get.return_value = mock_response
+        ], {})
 
         expected_url = "https://api.dictionaryapi.dev/api/v2/entries/en/hello"
 
         await cog.define.callback(cog, ctx=mock_ctx, word="hello")
 
-        mock_get.assert_called_once_with(expected_url)
+        mock_get.assert_awaited_once_with(expected_url)
         mock_ctx.send.assert_awaited_once()
         
         # Check that an embed was sent
         call_args = mock_ctx.send.call_args
         self.assertIn('embed', call_args.kwargs)
 
-    @patch("src.cogs.utility.define_word.requests.get")
-    async def test_define_word_not_found(self, mock_get):
+    async def test_define_word_not_found(self):
         """Test word not found scenario"""
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
         mock_config.get_config.return_value = {"config_status": True}
 
         mock_bot = MagicMock()
         mock_ctx = AsyncMock()
         cog = Define(mock_bot)
         cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.get_definition.return_value = None
 
         mock_member = MagicMock()
         mock_member.id = 1234567890
         mock_ctx.author = mock_member
 
         # Mock API response for word not found
-        mock_response = MagicMock()
-        mock_response.ok = False
-        mock_get.return_value = mock_response
+        cog.http_client.get = AsyncMock(return_value=HttpResponse(404, {}, {}))
 
         await cog.define.callback(cog, ctx=mock_ctx, word="nonexistentword")
 
@@ -78,32 +80,108 @@ class TestDefineWord(IsolatedAsyncioTestCase):
         call_args = mock_ctx.send.call_args
         self.assertIn('embed', call_args.kwargs)
 
-    @patch("src.cogs.utility.define_word.requests.get")
-    async def test_define_word_disabled(self, mock_get):
+    async def test_define_word_disabled(self):
         """Test when the define word feature is disabled"""
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
         mock_config.get_config.return_value = {"config_status": False}
 
         mock_bot = MagicMock()
         mock_ctx = AsyncMock()
         cog = Define(mock_bot)
         cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.get_definition.return_value = None
+
+        cog.http_client.get = AsyncMock()
 
         await cog.define.callback(cog, ctx=mock_ctx, word="hello")
 
         # Should not make API call when disabled
-        mock_get.assert_not_called()
+        cog.http_client.get.assert_not_awaited()
         mock_ctx.send.assert_awaited_once_with("Sorry, this command is currently disabled.")
 
+    async def test_define_word_unreachable(self):
+        """Test that a failing API is reported like a missing word"""
+        mock_config = MagicMock()
+        mock_config.get_config.return_value = {"config_status": True}
+
+        mock_ctx = AsyncMock()
+        cog = Define(MagicMock())
+        cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.get_definition.return_value = None
+        cog.http_client.get = AsyncMock(side_effect=HttpError("timeout"))
+
+        await cog.define.callback(cog, ctx=mock_ctx, word="hello")
+
+        mock_ctx.send.assert_awaited_once()
+        self.assertIn("embed", mock_ctx.send.call_args.kwargs)
+        # Failures are not cached
+        cog.db.save_definition.assert_not_awaited()
+        self.assertEqual(len(cog.cache), 0)
+
+    async def test_define_word_cached(self):
+        """Test that repeat lookups, found or not, skip the API"""
+        mock_config = MagicMock()
+        mock_config.get_config.return_value = {"config_status": True}
+
+        cog = Define(MagicMock())
+        cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.get_definition.return_value = None
+        cog.http_client.get = AsyncMock(side_effect=[
+            HttpResponse(200, [{"meanings": [{
+                "partOfSpeech": "noun",
+                "definitions": [{"definition": "An ordered collection"}],
+            }]}], {}),
+            HttpResponse(404, {"title": "No Definitions Found"}, {}),
+        ])
+
+        for word in ("Array", "array", "qwrty", "qwrty"):
+            await cog.define.callback(cog, ctx=AsyncMock(), word=word)
+
+        self.assertEqual(cog.http_client.get.await_count, 2)
+        self.assertEqual(cog.db.save_definition.await_count, 2)
+        self.assertEqual(
+            cog.cache.get("array")["definitions"], [("noun", "An ordered collection")]
+        )
+        self.assertIsNone(cog.cache.get("qwrty")["definitions"])
+
+    async def test_define_word_from_database(self):
+        """Test that a word cached in the database is served without the API"""
+        mock_config = MagicMock()
+        mock_config.get_config.return_value = {"config_status": True}
+
+        mock_ctx = AsyncMock()
+        cog = Define(MagicMock())
+        cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.get_definition.return_value = {
+            "definitions": [("noun", "A reference to a memory address")],
+            "message": None,
+            "fetched_at": datetime.now(timezone.utc),
+        }
+        cog.http_client.get = AsyncMock()
+
+        await cog.define.callback(cog, ctx=mock_ctx, word="pointer")
+
+        cog.http_client.get.assert_not_awaited()
+        self.assertIn("pointer", cog.cache)
+        self.assertIn("view", mock_ctx.send.call_args.kwargs)
+
     async def test_toggle_config(self):
         """Test toggling the define word configuration"""
         mock_config = AsyncMock()
+        mock_config.get_config = MagicMock()
         mock_config.toggle_config.return_value = True
 
         mock_bot = MagicMock()
         mock_interaction = AsyncMock()
         cog = Define(mock_bot)
         cog.config = mock_config
+        cog.db = AsyncMock()
+        cog.db.get_definition.return_value = None
 
         await cog.toggle_config.callback(cog, interaction=mock_interaction)
 
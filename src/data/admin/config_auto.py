@@ -4,26 +4,62 @@ from asyncpg import Pool
 
 
 class Config:
-    """The database for configuration."""
+    """The database for configuration.
+
+    The whole table is small, so it is loaded once with :meth:`load` and
+    kept in memory. Reads are plain dict lookups, and the cache is updated
+    in place whenever a configuration is toggled or added.
+
+    The bot holds a single instance as ``bot.toggles``, shared by every cog,
+    and refreshes it through :meth:`refresh` when the table changes elsewhere.
+    """
 
     def __init__(self, pool: Pool):
         self._pool = pool
+        self._configs: dict[str, dict] = {}
 
-    async def get_config(self, key: str) -> Any:
-        """Gets a configuration based on the key.
+    async def load(self) -> None:
+        """Loads every configuration into the cache."""
 
-        :param key: The configuration to look for.
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            configs = await conn.fetch("""
+                SELECT * FROM pph_config_auto;
+            """)
+
+        self._configs = {config["config_type"]: dict(config) for config in configs}
+
+    async def refresh(self, key: str | None) -> None:
+        """Reloads a single configuration from the database.
+
+        :param key: The configuration to reload, or None to reload everything.
         """
 
+        if key is None:
+            await self.load()
+            return
+
         async with self._pool.acquire() as conn:
             conn: Pool
 
-            config, = await conn.fetch("""
-                SELECT * FROM pph_config_auto
-                WHERE config_type = $1
+            config = await conn.fetchrow("""
+                SELECT * FROM pph_config_auto WHERE config_type = $1;
             """, key)
 
-        return config
+        if config is None:
+            self._configs.pop(key, None)
+        else:
+            self._configs[key] = dict(config)
+
+    def get_config(self, key: str) -> Any:
+        """Gets a configuration based on the key.
+
+        :param key: The configuration to look for.
+        :return: The configuration, or None if it does not exist.
+        """
+
+        return self._configs.get(key)
 
     async def toggle_config(self, key: str) -> bool:
         """Toggles a configuration based on the key.
@@ -33,32 +69,32 @@ class Config:
         async with self._pool.acquire() as conn:
             conn: Pool
 
-            config, = await conn.fetch("""
-                SELECT * FROM pph_config_auto
+            # Toggle the status
+            # `NOT` just kind of reverses the bool
+            config = await conn.fetchrow("""
+                UPDATE pph_config_auto SET config_status = NOT config_status
                 WHERE config_type = $1
+                RETURNING *;
             """, key)
 
-            config = dict(config)["config_status"]
-            # Toggle the status
-            # `not` keyword just kind of reverses the bool instance
-            await conn.execute("""
-                UPDATE pph_config_auto SET config_status = $1 WHERE config_type = $2;
-            """, not config, key)
+        self._configs[key] = dict(config)
 
-        return not config
+        return config["config_status"]
 
     async def add_config(self, key: str) -> Any:
         """Adds a configuration to the database.
 
         :param key: The configuration key.
-        :param value: The configuration value.
         """
 
         async with self._pool.acquire() as conn:
             conn: Pool
 
-            await conn.execute("""
+            config = await conn.fetchrow("""
                 INSERT INTO pph_config_auto (config_type) VALUES ($1)
+                RETURNING *;
             """, key)
 
+        self._configs[key] = dict(config)
+
         return
@@ -2,8 +2,26 @@ from asyncpg import Pool
 
 
 class Settings:
+    """The database for the key-value settings.
+
+    Settings are cached once read, and :meth:`refresh` drops a cached
+    setting when it gets changed elsewhere.
+    """
+
     def __init__(self, pool: Pool):
         self._pool = pool
+        self._settings: dict[str, int] = {}
+
+    async def refresh(self, key: str | None) -> None:
+        """Drops a setting from the cache, it is read again on the next get.
+
+        :param key: The setting to drop, or None to drop every setting.
+        """
+
+        if key is None:
+            self._settings.clear()
+        else:
+            self._settings.pop(key, None)
 
     async def set_setting(self, key: str, value: str | int):
         async with self._pool.acquire() as conn:
@@ -15,7 +33,12 @@ class Settings:
                 DO UPDATE SET setting_value = $2;
             """, key, value)
 
+        self._settings[key] = int(value)
+
     async def get_setting(self, key: str):
+        if key in self._settings:
+            return self._settings[key]
+
         async with self._pool.acquire() as conn:
             conn: Pool
 
@@ -24,9 +47,7 @@ class Settings:
                 WHERE setting_key = $1;
             """, key)
 
-            if not setting:
-                return 0
-
-            setting, = setting
+        # Missing settings are cached too, an insert elsewhere invalidates them.
+        self._settings[key] = setting[0]["setting_value"] if setting else 0
 
-            return setting["setting_value"]
+        return self._settings[key]
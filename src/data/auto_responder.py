@@ -1,6 +1,28 @@
 from typing import List
 
-from asyncpg import Pool
+from asyncpg import Pool, Record
+
+# Every response, with the channels it is restricted to aggregated into one array.
+_RESPONSES_WITH_CHANNELS = """
+    SELECT r.*,
+        COALESCE(
+            array_agg(c.channel_id) FILTER (WHERE c.channel_id IS NOT NULL),
+            '{}'
+        ) AS channels
+    FROM pph_auto_responses r
+    LEFT JOIN pph_auto_responder_channels c ON c.response_id = r.id
+"""
+
+
+def _parse_response(record: Record) -> dict:
+    """Turns a response record into a dict, with the channels as a frozenset."""
+
+    response = dict(record)
+
+    if "channels" in response:
+        response["channels"] = frozenset(int(channel) for channel in response["channels"])
+
+    return response
 
 
 class AutoRespondDB:
@@ -94,6 +116,9 @@ class AutoRespondDB:
     async def get_responses(self, offset: int = None) -> List[dict[str, str]]:
         """Gets all message and their responses from the database.
 
+        Without an offset, every response is returned together with the
+        channels it is restricted to, as a frozenset under "channels".
+
         :returns: dictionary with message as keys and responses as values.
         """
 
@@ -109,32 +134,35 @@ class AutoRespondDB:
                     SELECT * FROM pph_auto_responses LIMIT $1 OFFSET $2;
                 """, limit, offset)
             else:
-                data = await conn.fetch("""
-                    SELECT * FROM pph_auto_responses;
+                data = await conn.fetch(f"""
+                    {_RESPONSES_WITH_CHANNELS}
+                    GROUP BY r.id;
                 """)
 
             # Loop over all the results and parse into dict.
             # The append the dict to the list
             for responses in data:
-                results.append(dict(responses))
+                results.append(_parse_response(responses))
 
         return results
 
-    async def get_response_channels(self, response_id: int) -> List[int]:
-        """Gets all channel responses from the database.
+    async def get_response(self, response_id: int) -> dict | None:
+        """Gets a single response, with its channels, from the database.
 
-        :param response_id: The response id to get the channels from.
-        :returns: A list of channel ids
+        :param response_id: The response id
+        :returns: The response, or None if it does not exist.
         """
 
         async with self._pool.acquire() as conn:
             conn: Pool
 
-            data = await conn.fetch("""
-                SELECT * FROM pph_auto_responder_channels WHERE response_id = $1;
+            data = await conn.fetchrow(f"""
+                {_RESPONSES_WITH_CHANNELS}
+                WHERE r.id = $1
+                GROUP BY r.id;
             """, response_id)
 
-            return [int(channel["channel_id"]) for channel in data]
+        return _parse_response(data) if data is not None else None
 
     async def records_count(self) -> int:
         """Gets the number of responses stored in the database"""
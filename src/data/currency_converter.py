@@ -0,0 +1,49 @@
+import json
+from datetime import datetime
+
+from asyncpg import Pool
+
+
+class CurrencyDB:
+    """The database handler for the currency converter's rate snapshots."""
+
+    def __init__(self, pool: Pool) -> None:
+        self._pool = pool
+
+    async def get_snapshot(self, base: str) -> tuple[dict[str, float], datetime] | None:
+        """Gets the last stored quote table of a base currency.
+
+        :param base: The base currency
+        :return: The quotes and when they were fetched, or None if there is none.
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            snapshot = await conn.fetchrow("""
+                SELECT quotes, fetched_at FROM pph_currency_rates
+                WHERE base = $1;
+            """, base)
+
+        if snapshot is None:
+            return None
+
+        return json.loads(snapshot["quotes"]), snapshot["fetched_at"]
+
+    async def save_snapshot(self, base: str, quotes: dict[str, float], fetched_at: datetime) -> None:
+        """Stores the quote table of a base currency, replacing the previous one.
+
+        :param base: The base currency
+        :param quotes: The quotes, keyed by base + currency
+        :param fetched_at: When the quotes were fetched
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute("""
+                INSERT INTO pph_currency_rates (base, quotes, fetched_at)
+                VALUES ($1, $2::jsonb, $3)
+                ON CONFLICT (base)
+                DO UPDATE SET quotes = EXCLUDED.quotes, fetched_at = EXCLUDED.fetched_at;
+            """, base, json.dumps(quotes), fetched_at)
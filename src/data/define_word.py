@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timedelta
+
+from asyncpg import Pool
+
+
+class DefineDB:
+    """The database handler for the define word cache."""
+
+    def __init__(self, pool: Pool) -> None:
+        self._pool = pool
+
+    async def get_definition(
+        self,
+        word: str,
+        max_age: timedelta,
+        missing_max_age: timedelta,
+    ) -> dict | None:
+        """Gets the cached definitions of a word, if they are fresh enough.
+
+        :param word: The lowercased word
+        :param max_age: How old found definitions may be
+        :param missing_max_age: How old a cached "not found" may be
+        :return: The "definitions" as (part of speech, definition) pairs, or
+            None for a word without definitions, its "message" and when it
+            was "fetched_at". None if the word is not cached.
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            entry = await conn.fetchrow("""
+                SELECT definitions, message, fetched_at FROM pph_define_cache
+                WHERE word = $1
+                AND fetched_at > CURRENT_TIMESTAMP - (
+                    CASE WHEN definitions IS NULL THEN $3::interval ELSE $2::interval END
+                );
+            """, word, max_age, missing_max_age)
+
+        if entry is None:
+            return None
+
+        definitions = entry["definitions"]
+
+        return {
+            "definitions": (
+                [tuple(pair) for pair in json.loads(definitions)]
+                if definitions is not None else None
+            ),
+            "message": entry["message"],
+            "fetched_at": entry["fetched_at"],
+        }
+
+    async def save_definition(
+        self,
+        word: str,
+        definitions: list[tuple[str, str]] | None,
+        message: str | None,
+        fetched_at: datetime,
+    ) -> None:
+        """Caches the definitions of a word, replacing the previous ones.
+
+        :param word: The lowercased word
+        :param definitions: The (part of speech, definition) pairs,
+            or None if the word has no definitions
+        :param message: The API's message for a word without definitions
+        :param fetched_at: When the definitions were fetched
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute("""
+                INSERT INTO pph_define_cache (word, definitions, message, fetched_at)
+                VALUES ($1, $2::jsonb, $3, $4)
+                ON CONFLICT (word)
+                DO UPDATE SET
+                    definitions = EXCLUDED.definitions,
+                    message = EXCLUDED.message,
+                    fetched_at = EXCLUDED.fetched_at;
+            """,
+                word,
+                json.dumps(definitions) if definitions is not None else None,
+                message,
+                fetched_at,
+            )
@@ -1,4 +1,5 @@
-from typing import Literal
+from datetime import datetime
+from typing import Iterable, Literal
 
 from asyncpg import Pool
 
@@ -155,3 +156,55 @@ class ForumCleanupDB:
             """, trigger)
 
             return message
+
+    async def record_activity(self, activity: dict[int, tuple[int, datetime]]):
+        """Saves when threads last had a message.
+
+        :param activity: The forum id and last activity, by thread id.
+        """
+
+        forum_ids = [forum_id for forum_id, _ in activity.values()]
+        last_activities = [last_activity for _, last_activity in activity.values()]
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute("""
+                INSERT INTO pph_thread_activity (thread_id, forum_id, last_activity)
+                    SELECT * FROM unnest($1::bigint[], $2::bigint[], $3::timestamptz[])
+                ON CONFLICT (thread_id) DO UPDATE
+                    SET last_activity = GREATEST(
+                        pph_thread_activity.last_activity, EXCLUDED.last_activity
+                    );
+            """, list(activity), forum_ids, last_activities)
+
+    async def get_activity(self, forum_ids: Iterable[int]) -> dict[int, datetime]:
+        """Gets when the threads of forums last had a message.
+
+        :param forum_ids: The forum ids.
+        :return: The last activity, by thread id.
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            activity = await conn.fetch("""
+                SELECT thread_id, last_activity FROM pph_thread_activity
+                WHERE forum_id = ANY($1::bigint[]);
+            """, list(forum_ids))
+
+        return {row["thread_id"]: row["last_activity"] for row in activity}
+
+    async def forget_threads(self, thread_ids: Iterable[int]):
+        """Stops tracking threads, e.g. after they were deleted.
+
+        :param thread_ids: The thread ids.
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute("""
+                DELETE FROM pph_thread_activity
+                WHERE thread_id = ANY($1::bigint[]);
+            """, list(thread_ids))
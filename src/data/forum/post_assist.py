@@ -1,4 +1,49 @@
-from asyncpg import Pool
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator
+
+from asyncpg import Pool, Record
+
+# A configuration with its reply, tag message, tags and solved tag, in one row.
+_RESOLVED_CONFIGURATIONS = """
+    SELECT
+        c.id,
+        c.forum_id,
+        COALESCE(c.enable_accept_solutions, FALSE) AS enable_accept_solutions,
+        COALESCE(c.enable_mark_as_solved, FALSE) AS enable_mark_as_solved,
+        r.custom_message AS reply,
+        m.custom_message AS tag_message,
+        t.tags,
+        s.tag_id AS solved_tag
+    FROM pph_post_assist_config c
+    LEFT JOIN pph_post_assist_reply r ON r.configuration_id = c.id
+    LEFT JOIN pph_post_assist_tag_message m ON m.configuration_id = c.id
+    LEFT JOIN pph_post_assist_mark_as_solved_tags s ON s.forum_id = c.forum_id
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(
+            json_agg(
+                json_build_object(
+                    'entity_id', tag.entity_id,
+                    'entity_type', tag.entity_type
+                ) ORDER BY tag.id
+            ),
+            '[]'
+        ) AS tags
+        FROM pph_post_assist_tags tag
+        WHERE tag.configuration_id = c.id
+    ) t
+"""
+
+
+def _parse_configuration(record: Record) -> dict:
+    """Turns a resolved configuration record into a dict, with the tags parsed."""
+
+    configuration = dict(record)
+    configuration["tags"] = json.loads(configuration["tags"])
+
+    return configuration
 
 
 class PostAssistDB:
@@ -43,6 +88,29 @@ class PostAssistDB:
 
         return config if config is not None else None
 
+    async def resolve_forum(self, forum_id: int) -> dict | None:
+        """Gets everything post assist needs for a forum in one query.
+
+        :param forum_id: The forum id
+        :return: The configuration with its "reply", "tag_message", "tags"
+            and "solved_tag", or None if the forum is not configured.
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            config = await conn.fetchrow(
+                f"""
+                {_RESOLVED_CONFIGURATIONS}
+                WHERE c.forum_id = $1
+                ORDER BY c.id
+                LIMIT 1;
+            """,
+                forum_id,
+            )
+
+        return _parse_configuration(config) if config is not None else None
+
     async def get_reply(self, config_id: int):
         """Get a configuration from the database.
 
@@ -109,28 +177,61 @@ class PostAssistDB:
 
         return config["custom_message"] if config is not None else None
 
+    async def get_configuration(self, config_id: int) -> dict | None:
+        """Gets a configuration with its reply, tag message, tags and solved tag.
+
+        :param config_id: The id of the configuration
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            config = await conn.fetchrow(
+                f"""
+                {_RESOLVED_CONFIGURATIONS}
+                WHERE c.id = $1;
+            """,
+                config_id,
+            )
+
+        return _parse_configuration(config) if config is not None else None
+
     async def list_configurations(self):
-        """Lists all configurations from the database."""
+        """Lists all configurations from the database, fully assembled."""
 
         async with self._pool.acquire() as conn:
             conn: Pool
 
-            configs = await conn.fetch("""
-                SELECT * FROM pph_post_assist_config;
+            configs = await conn.fetch(f"""
+                {_RESOLVED_CONFIGURATIONS}
+                ORDER BY c.id;
             """)
 
-            configurations = []
+        return [_parse_configuration(config) for config in configs]
+
+    @staticmethod
+    async def _insert_tags(conn: Pool, config_id: int, entities: list[tuple[int, str]]):
+        """Inserts all the tags of a configuration in one statement.
 
-            for config in configs:
-                new = {}
-                new["id"] = config["id"]
-                new["forum_id"] = config["forum_id"]
-                new["tags"] = await self.get_tags(config["id"])
-                new["tag_message"] = await self.get_tag_message(config["id"])
-                new["reply"] = await self.get_reply(config["id"])
-                configurations.append(new)
+        :param conn: The connection to use, so it runs in the caller's transaction
+        :param config_id: The configuration id
+        :param entities: The entities to add, as (entity_id, entity_type)
+        """
 
-        return configurations
+        await conn.execute(
+            """
+            INSERT INTO pph_post_assist_tags(
+                configuration_id,
+                entity_id,
+                entity_type
+            )
+            SELECT $1, entity.entity_id, entity.entity_type
+            FROM unnest($2::bigint[], $3::text[]) AS entity(entity_id, entity_type);
+        """,
+            config_id,
+            [entity_id for entity_id, _ in entities],
+            [entity_type for _, entity_type in entities],
+        )
 
     async def add_configuration(
         self,
@@ -140,7 +241,7 @@ class PostAssistDB:
         reply: str,
         enable_accept_solutions: bool,
         enable_mark_as_solved: bool = False,
-    ):
+    ) -> int:
         """Adds a configuration to the database.
 
         :param forum_id: The forum id to add to
@@ -149,67 +250,52 @@ class PostAssistDB:
         :param reply: The reply message
         :param enable_accept_solutions: Whether to enable accept solutions
         :param enable_mark_as_solved: Whether to enable mark as solved button
+        :return: The id of the new configuration
         """
 
         async with self._pool.acquire() as conn:
             conn: Pool
 
-            await conn.execute(
-                """
-                INSERT INTO pph_post_assist_config(
+            async with conn.transaction():
+                config_id = await conn.fetchval(
+                    """
+                    INSERT INTO pph_post_assist_config(
+                        forum_id,
+                        enable_accept_solutions,
+                        enable_mark_as_solved
+                    ) VALUES ($1, $2, $3)
+                    RETURNING id;
+                """,
                     forum_id,
                     enable_accept_solutions,
-                    enable_mark_as_solved
-                ) VALUES ($1, $2, $3)
-            """,
-                forum_id,
-                enable_accept_solutions,
-                enable_mark_as_solved,
-            )
+                    enable_mark_as_solved,
+                )
 
-            config = await conn.fetchrow(
-                """
-                SELECT * FROM pph_post_assist_config
-                WHERE forum_id = $1;
-            """,
-                forum_id,
-            )
+                await self._insert_tags(conn, config_id, entities)
 
-            for entity_id, entity_type in entities:
                 await conn.execute(
                     """
-                    INSERT INTO pph_post_assist_tags(
+                    INSERT INTO pph_post_assist_tag_message(
                         configuration_id,
-                        entity_id,
-                        entity_type
-                    ) VALUES ($1, $2, $3)
+                        custom_message
+                    ) VALUES ($1, $2)
                 """,
-                    config["id"],
-                    entity_id,
-                    entity_type,
+                    config_id,
+                    entity_tag_message,
                 )
 
-            await conn.execute(
-                """
-                INSERT INTO pph_post_assist_tag_message(
-                    configuration_id,
-                    custom_message
-                ) VALUES ($1, $2)
-            """,
-                config["id"],
-                entity_tag_message,
-            )
+                await conn.execute(
+                    """
+                    INSERT INTO pph_post_assist_reply(
+                        configuration_id,
+                        custom_message
+                    ) VALUES ($1, $2)
+                """,
+                    config_id,
+                    reply,
+                )
 
-            await conn.execute(
-                """
-                INSERT INTO pph_post_assist_reply(
-                    configuration_id,
-                    custom_message
-                ) VALUES ($1, $2)
-            """,
-                config["id"],
-                reply,
-            )
+        return config_id
 
     async def update_configuration(
         self,
@@ -234,65 +320,53 @@ class PostAssistDB:
         async with self._pool.acquire() as conn:
             conn: Pool
 
-            config = await self.get_config(id)
+            async with conn.transaction():
+                config_id = await conn.fetchval(
+                    """
+                    UPDATE pph_post_assist_config SET
+                        forum_id = $1,
+                        enable_accept_solutions = COALESCE($3, enable_accept_solutions),
+                        enable_mark_as_solved = COALESCE($4, enable_mark_as_solved)
+                    WHERE id = $2
+                    RETURNING id;
+                    """,
+                    forum_id,
+                    id,
+                    enable_accept_solutions,
+                    enable_mark_as_solved,
+                )
 
-            if not config:
-                return
+                if config_id is None:
+                    return
 
-            await conn.execute(
-                """
-                UPDATE pph_post_assist_config SET
-                    forum_id = $1,
-                    enable_accept_solutions = COALESCE($3, enable_accept_solutions),
-                    enable_mark_as_solved = COALESCE($4, enable_mark_as_solved)
-                WHERE id = $2;
+                await conn.execute(
+                    """
+                    DELETE FROM pph_post_assist_tags WHERE configuration_id = $1;
                 """,
-                forum_id,
-                id,
-                enable_accept_solutions,
-                enable_mark_as_solved,
-            )
+                    config_id,
+                )
 
-            await conn.execute(
-                """
-                DELETE FROM pph_post_assist_tags WHERE configuration_id = $1;
-            """,
-                id,
-            )
+                await self._insert_tags(conn, config_id, entities)
 
-            for entity_id, entity_type in entities:
                 await conn.execute(
                     """
-                    INSERT INTO pph_post_assist_tags(
-                        configuration_id,
-                        entity_id,
-                        entity_type
-                    ) VALUES ($1, $2, $3)
+                    UPDATE pph_post_assist_tag_message SET
+                        custom_message = $1
+                    WHERE configuration_id = $2;
                 """,
-                    config["id"],
-                    entity_id,
-                    entity_type,
+                    entity_tag_message,
+                    config_id,
                 )
 
-            await conn.execute(
-                """
-                UPDATE pph_post_assist_tag_message SET
-                    custom_message = $1
-                WHERE configuration_id = $2;
-            """,
-                entity_tag_message,
-                config["id"],
-            )
-
-            await conn.execute(
-                """
-                UPDATE pph_post_assist_reply SET
-                    custom_message = $1
-                WHERE configuration_id = $2;
-            """,
-                reply,
-                config["id"],
-            )
+                await conn.execute(
+                    """
+                    UPDATE pph_post_assist_reply SET
+                        custom_message = $1
+                    WHERE configuration_id = $2;
+                """,
+                    reply,
+                    config_id,
+                )
 
     async def delete_configuration(self, id: int):
         """Deletes a configuration from the database.
@@ -407,8 +481,15 @@ class PostAssistDB:
                 forum_id,
             )
 
-    async def get_persistent_mark_as_solved_views(self):
-        """Gets all active persistent mark-as-solved button views."""
+    async def get_persistent_mark_as_solved_views(
+        self, after_thread_id: int = 0, limit: int | None = None
+    ):
+        """Gets the active persistent mark-as-solved button views.
+
+        :param after_thread_id: Only the views of threads after this one,
+            to go through them in batches
+        :param limit: The maximum number of views, None for all of them
+        """
 
         async with self._pool.acquire() as conn:
             conn: Pool
@@ -417,12 +498,36 @@ class PostAssistDB:
                 """
                 SELECT *
                 FROM pph_post_assist_mark_as_solved_views
-                WHERE closed = false;
-                """
+                WHERE closed = false AND thread_id > $1
+                ORDER BY thread_id
+                LIMIT $2;
+                """,
+                after_thread_id,
+                limit,
             )
 
         return views
 
+    async def is_mark_as_solved_view_closed(self, thread_id: int) -> bool:
+        """Checks if the mark-as-solved view of a thread was closed, i.e. it was solved.
+
+        :param thread_id: The thread ID
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            closed = await conn.fetchval(
+                """
+                SELECT closed
+                FROM pph_post_assist_mark_as_solved_views
+                WHERE thread_id = $1;
+                """,
+                thread_id,
+            )
+
+        return bool(closed)
+
     async def close_persistent_mark_as_solved_view(self, thread_id: int) -> None:
         """Mark a persistent mark-as-solved view as closed."""
 
@@ -432,12 +537,111 @@ class PostAssistDB:
             await conn.execute(
                 """
                 UPDATE pph_post_assist_mark_as_solved_views
-                SET closed = true
-                WHERE thread_id = $1;
+                SET closed = true, closed_at = CURRENT_TIMESTAMP
+                WHERE thread_id = $1 AND closed = false;
                 """,
                 thread_id,
             )
 
+    @asynccontextmanager
+    async def closing_mark_as_solved_view(self, thread_id: int) -> AsyncIterator[None]:
+        """Closes a persistent mark-as-solved view, unless the block raises.
+
+        The view is closed in a transaction while the block runs, e.g. while
+        the thread is edited on Discord, and is only committed once the block
+        succeeds.
+
+        :param thread_id: The thread ID
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            async with conn.transaction():
+                closing = asyncio.ensure_future(
+                    conn.execute(
+                        """
+                        UPDATE pph_post_assist_mark_as_solved_views
+                        SET closed = true, closed_at = CURRENT_TIMESTAMP
+                        WHERE thread_id = $1 AND closed = false;
+                        """,
+                        thread_id,
+                    )
+                )
+
+                try:
+                    yield
+                except BaseException:
+                    # The transaction can only end once the update is done, and
+                    # it rolls back anyway, so the update's own error is dropped.
+                    await asyncio.gather(closing, return_exceptions=True)
+                    raise
+
+                await closing
+
+    async def delete_persistent_mark_as_solved_views(self, thread_ids: list[int]) -> None:
+        """Deletes the persistent mark-as-solved views of several threads.
+
+        :param thread_ids: The thread IDs
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute(
+                """
+                DELETE FROM pph_post_assist_mark_as_solved_views
+                WHERE thread_id = ANY($1::bigint[]);
+                """,
+                thread_ids,
+            )
+
+    async def forget_threads(self, thread_ids: list[int]) -> None:
+        """Deletes everything stored about threads that no longer exist.
+
+        :param thread_ids: The thread IDs
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            async with conn.transaction():
+                for table in (
+                    "pph_post_assist_mark_as_solved_views",
+                    "pph_thread_participants",
+                    "pph_thread_participants_backfills",
+                    "pph_post_assist_solutions",
+                ):
+                    await conn.execute(
+                        f"""
+                        DELETE FROM {table}
+                        WHERE thread_id = ANY($1::bigint[]);
+                        """,
+                        thread_ids,
+                    )
+
+    async def purge_closed_mark_as_solved_views(self, closed_before: datetime) -> int:
+        """Deletes the mark-as-solved views that were closed a while ago.
+
+        :param closed_before: Deletes the views closed before this
+        :return: The number of deleted views
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            return await conn.fetchval(
+                """
+                WITH deleted AS (
+                    DELETE FROM pph_post_assist_mark_as_solved_views
+                    WHERE closed AND closed_at < $1
+                    RETURNING 1
+                )
+                SELECT count(*) FROM deleted;
+                """,
+                closed_before,
+            )
+
     async def add_persistent_mark_as_solved_view(
         self, thread_id: int, message_id: int, author_id: int
     ) -> None:
@@ -458,9 +662,200 @@ class PostAssistDB:
                 DO UPDATE SET
                     message_id = EXCLUDED.message_id,
                     author_id = EXCLUDED.author_id,
-                    closed = false;
+                    closed = false,
+                    closed_at = NULL;
                 """,
                 thread_id,
                 message_id,
                 author_id,
             )
+
+    async def record_participant(
+        self, thread_id: int, user_id: int, seen_at: datetime
+    ) -> None:
+        """Counts a message towards a thread participant.
+
+        :param thread_id: The thread ID
+        :param user_id: The author of the message
+        :param seen_at: When the message was sent
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute(
+                """
+                INSERT INTO pph_thread_participants (thread_id, user_id, last_seen)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (thread_id, user_id)
+                DO UPDATE SET
+                    message_count = pph_thread_participants.message_count + 1,
+                    last_seen = GREATEST(pph_thread_participants.last_seen, EXCLUDED.last_seen);
+                """,
+                thread_id,
+                user_id,
+                seen_at,
+            )
+
+    async def participants_backfilled(self, thread_id: int) -> bool:
+        """Checks if the participants of a thread were read from its history.
+
+        :param thread_id: The thread ID
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            return await conn.fetchval(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM pph_thread_participants_backfills
+                    WHERE thread_id = $1
+                );
+                """,
+                thread_id,
+            )
+
+    async def mark_participants_backfilled(self, thread_id: int) -> None:
+        """Records that a thread needs no backfill, e.g. it was created
+        since the participants are tracked, so all of them were seen live.
+
+        :param thread_id: The thread ID
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute(
+                """
+                INSERT INTO pph_thread_participants_backfills (thread_id)
+                VALUES ($1)
+                ON CONFLICT (thread_id) DO NOTHING;
+                """,
+                thread_id,
+            )
+
+    async def add_participants(
+        self, thread_id: int, participants: dict[int, tuple[int, datetime]]
+    ) -> None:
+        """Stores the participants read from a thread's history, once.
+
+        The history has every message, so its counts replace the ones
+        recorded live since the tracking started.
+
+        :param thread_id: The thread ID
+        :param participants: The message count and last message, by user ID
+        """
+
+        counts = [count for count, _ in participants.values()]
+        last_seen = [seen_at for _, seen_at in participants.values()]
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    INSERT INTO pph_thread_participants (
+                        thread_id,
+                        user_id,
+                        message_count,
+                        last_seen
+                    )
+                    SELECT $1, * FROM unnest($2::bigint[], $3::int[], $4::timestamptz[])
+                    ON CONFLICT (thread_id, user_id)
+                    DO UPDATE SET
+                        message_count = GREATEST(
+                            pph_thread_participants.message_count,
+                            EXCLUDED.message_count
+                        ),
+                        last_seen = GREATEST(
+                            pph_thread_participants.last_seen,
+                            EXCLUDED.last_seen
+                        );
+                    """,
+                    thread_id,
+                    list(participants),
+                    counts,
+                    last_seen,
+                )
+
+                await conn.execute(
+                    """
+                    INSERT INTO pph_thread_participants_backfills (thread_id)
+                    VALUES ($1)
+                    ON CONFLICT (thread_id) DO NOTHING;
+                    """,
+                    thread_id,
+                )
+
+    async def get_participants(
+        self, thread_id: int, exclude_user_id: int, limit: int = 25
+    ) -> list[int]:
+        """Gets who contributed the most to a thread.
+
+        :param thread_id: The thread ID
+        :param exclude_user_id: A user to leave out, e.g. the thread author
+        :param limit: The maximum number of users, 25 is the most a select fits
+        :return: The user IDs, most messages first
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            participants = await conn.fetch(
+                """
+                SELECT user_id
+                FROM pph_thread_participants
+                WHERE thread_id = $1 AND user_id <> $2
+                ORDER BY message_count DESC, last_seen DESC
+                LIMIT $3;
+                """,
+                thread_id,
+                exclude_user_id,
+                limit,
+            )
+
+        return [participant["user_id"] for participant in participants]
+
+    async def get_solution(self, thread_id: int) -> int | None:
+        """Gets the accepted solution of a thread.
+
+        :param thread_id: The thread ID
+        :return: The message ID of the solution, or None if there is none
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            return await conn.fetchval(
+                """
+                SELECT message_id
+                FROM pph_post_assist_solutions
+                WHERE thread_id = $1;
+                """,
+                thread_id,
+            )
+
+    async def set_solution(self, thread_id: int, message_id: int) -> None:
+        """Stores the accepted solution of a thread, replacing the previous one.
+
+        :param thread_id: The thread ID
+        :param message_id: The message ID of the solution
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute(
+                """
+                INSERT INTO pph_post_assist_solutions (thread_id, message_id)
+                VALUES ($1, $2)
+                ON CONFLICT (thread_id)
+                DO UPDATE SET
+                    message_id = EXCLUDED.message_id,
+                    accepted_at = CURRENT_TIMESTAMP;
+                """,
+                thread_id,
+                message_id,
+            )
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from logging import Logger
+from typing import Awaitable, Callable
+
+from asyncpg import Connection, Pool
+
+# The channel the pph_notify_cache_invalidation trigger notifies on.
+CHANNEL = "pph_cache_invalidation"
+
+# Called with the key of the changed row, as text.
+# A key of None means the whole cache has to be refreshed.
+Subscriber = Callable[[str | None], Awaitable[None]]
+
+
+class InvalidationBus:
+    """Dispatches the database's cache invalidation notifications.
+
+    Every configuration table has a trigger that sends the table name and
+    the key of the changed row on :data:`CHANNEL`. The bus keeps one
+    connection listening on it, and calls the subscribers of that table
+    with the key, so caches can be kept without a TTL and still pick up
+    changes made by another process or by hand.
+
+    If the listening connection drops, the bus reconnects and tells every
+    subscriber to refresh everything, since notifications may have been
+    missed in between.
+
+    Usage:
+    ```
+        bus = InvalidationBus(pool, logger)
+        bus.subscribe("pph_config_auto", toggles.refresh)
+        await bus.start()
+    ```
+    """
+
+    def __init__(self, pool: Pool, logger: Logger) -> None:
+        self._pool = pool
+        self._logger = logger
+        self._conn: Connection | None = None
+        self._subscribers: dict[str, list[Subscriber]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+
+    def subscribe(self, table: str, subscriber: Subscriber) -> None:
+        """Calls the subscriber whenever a row of the table changes.
+
+        :param table: The table to watch.
+        :param subscriber: The coroutine function to call with the key.
+        """
+
+        self._subscribers.setdefault(table, []).append(subscriber)
+
+    def unsubscribe(self, table: str, subscriber: Subscriber) -> None:
+        """Stops calling a subscriber, e.g. when its cog gets unloaded.
+
+        :param table: The watched table.
+        :param subscriber: The subscriber to remove.
+        """
+
+        subscribers = self._subscribers.get(table, [])
+
+        if subscriber in subscribers:
+            subscribers.remove(subscriber)
+
+    async def start(self) -> None:
+        """Starts listening for notifications."""
+
+        self._closed = False
+        self._conn = await self._pool.acquire()
+        self._conn.add_termination_listener(self._on_termination)
+        await self._conn.add_listener(CHANNEL, self._on_notification)
+
+    async def close(self) -> None:
+        """Stops listening and gives the connection back to the pool."""
+
+        self._closed = True
+
+        for task in self._tasks:
+            task.cancel()
+
+        if self._conn is None:
+            return
+
+        conn, self._conn = self._conn, None
+
+        if not conn.is_closed():
+            conn.remove_termination_listener(self._on_termination)
+            await conn.remove_listener(CHANNEL, self._on_notification)
+
+        await self._pool.release(conn)
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        """Runs a coroutine in the background, keeping a reference to it."""
+
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_notification(self, conn: Connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError:
+            self._logger.error(f"[INVALIDATION] Malformed payload: {payload}")
+            return
+
+        self.dispatch(data.get("table"), data.get("key"))
+
+    def dispatch(self, table: str, key: str | None) -> None:
+        """Calls the subscribers of a table in the background.
+
+        :param table: The changed table.
+        :param key: The key of the changed row, or None to refresh everything.
+        """
+
+        for subscriber in self._subscribers.get(table, ()):
+            self._spawn(self._call(subscriber, table, key))
+
+    async def _call(self, subscriber: Subscriber, table: str, key: str | None) -> None:
+        try:
+            await subscriber(key)
+        except Exception as e:
+            self._logger.error(f"[INVALIDATION] Failed to refresh {table} ({key}): {e}")
+
+    def _on_termination(self, conn: Connection) -> None:
+        if self._closed:
+            return
+
+        self._logger.warning("[INVALIDATION] Listener connection lost, reconnecting")
+        self._spawn(self._reconnect(conn))
+
+    async def _reconnect(self, conn: Connection) -> None:
+        """Replaces the lost connection, then refreshes every cache."""
+
+        await self._pool.release(conn)
+        self._conn = None
+        delay = 1
+
+        while not self._closed:
+            try:
+                await self.start()
+                break
+            except Exception as e:
+                self._logger.error(f"[INVALIDATION] Reconnect failed, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+        if self._closed:
+            return
+
+        for table in self._subscribers:
+            self.dispatch(table, None)
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from asyncpg import Pool
+
+
+class JobsDB:
+    """The database handler for the scheduled jobs.
+
+    Every process that runs the bot shares the table, a run is only
+    started by the process that claims it, see :meth:`claim`.
+    """
+
+    def __init__(self, pool: Pool) -> None:
+        self._pool = pool
+
+    async def load(self, name: str) -> datetime | None:
+        """Gets the next run of a job.
+
+        :param name: The name of the job
+        :return: The next run, or None if the job is new or paused
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            return await conn.fetchval("""
+                SELECT next_run FROM pph_jobs WHERE name = $1;
+            """, name)
+
+    async def save(self, name: str, next_run: datetime | None) -> None:
+        """Sets the next run of a job.
+
+        :param name: The name of the job
+        :param next_run: The next run, None pauses the job
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute("""
+                INSERT INTO pph_jobs (name, next_run) VALUES ($1, $2)
+                ON CONFLICT (name) DO UPDATE SET next_run = $2;
+            """, name, next_run)
+
+    async def claim(
+        self,
+        name: str,
+        owner: str,
+        due: datetime,
+        next_run: datetime | None,
+        lease: timedelta,
+    ) -> bool:
+        """Claims a due run of a job, and moves the job to its next run.
+
+        The claim fails if another process already claimed this run (the
+        next run was moved past it), or still holds the lease of a run.
+
+        :param name: The name of the job
+        :param owner: Who is claiming it
+        :param due: The run being claimed
+        :param next_run: The run after it
+        :param lease: How long the claim holds if it is never released
+        :return: Whether the run was claimed
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            claimed = await conn.fetchval("""
+                WITH job AS (
+                    SELECT name FROM pph_jobs
+                    WHERE name = $1
+                    AND (next_run IS NULL OR next_run <= $3)
+                    AND (lease_expires_at IS NULL OR lease_expires_at < CURRENT_TIMESTAMP)
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE pph_jobs SET
+                    next_run = $4,
+                    last_run = CURRENT_TIMESTAMP,
+                    lease_owner = $2,
+                    lease_expires_at = CURRENT_TIMESTAMP + $5::interval
+                FROM job
+                WHERE pph_jobs.name = job.name
+                RETURNING pph_jobs.name;
+            """, name, owner, due, next_run, lease)
+
+        return claimed is not None
+
+    async def release(self, name: str, owner: str) -> None:
+        """Releases the lease of a finished run.
+
+        :param name: The name of the job
+        :param owner: Who claimed it
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute("""
+                UPDATE pph_jobs SET lease_owner = NULL, lease_expires_at = NULL
+                WHERE name = $1 AND lease_owner = $2;
+            """, name, owner)
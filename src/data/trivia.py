@@ -1,6 +1,15 @@
+import hashlib
+
 from asyncpg import Pool
 
 
+def _content_hash(fact: str) -> str:
+    """Hashes a fact, ignoring case and whitespace differences."""
+
+    normalized = " ".join(fact.lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
 class TriviaDB:
     def __init__(self, pool: Pool) -> None:
         self._pool = pool
@@ -50,3 +59,77 @@ class TriviaDB:
                 INSERT INTO pph_trivia(channel_id, schedule)
                     VALUES ($1, $2);
             """, channel_id, schedule)
+
+    async def queued_facts(self) -> int:
+        """
+        Counts the facts waiting to be sent.
+
+        :return: Int
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            return await conn.fetchval("""
+                SELECT COUNT(*) FROM pph_trivia_facts WHERE sent_at IS NULL;
+            """)
+
+    async def add_facts(self, facts: list[str], sent: bool = False) -> int:
+        """
+        Queues facts, skipping the ones that were already queued or sent.
+
+        :param facts: The facts to add
+        :param sent: Whether the facts were already sent
+        :return: How many facts were new
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            added = await conn.fetch("""
+                INSERT INTO pph_trivia_facts(fact, content_hash, sent_at)
+                    SELECT fact, content_hash, CASE WHEN $3 THEN CURRENT_TIMESTAMP END
+                    FROM unnest($1::text[], $2::text[]) AS facts(fact, content_hash)
+                ON CONFLICT (content_hash) DO NOTHING
+                RETURNING id;
+            """, facts, [_content_hash(fact) for fact in facts], sent)
+
+        return len(added)
+
+    async def pop_fact(self) -> tuple[int, str] | None:
+        """
+        Takes the oldest queued fact and marks it as sent.
+
+        :return: The fact's id and text, or None if the queue is empty
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            fact = await conn.fetchrow("""
+                UPDATE pph_trivia_facts SET sent_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT id FROM pph_trivia_facts
+                    WHERE sent_at IS NULL
+                    ORDER BY id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, fact;
+            """)
+
+        return (fact["id"], fact["fact"]) if fact is not None else None
+
+    async def requeue_fact(self, fact_id: int) -> None:
+        """
+        Puts a fact that could not be sent back in the queue.
+
+        :param fact_id: The fact's id
+        """
+
+        async with self._pool.acquire() as conn:
+            conn: Pool
+
+            await conn.execute("""
+                UPDATE pph_trivia_facts SET sent_at = NULL WHERE id = $1;
+            """, fact_id)
@@ -1,9 +1,12 @@
+import re
+
 from discord import Interaction, TextStyle
 from discord.ext.commands import Bot
 from discord.ui import Modal, TextInput
 
 from ...data.auto_responder import AutoRespondDB
 from ...ui.views.auto_responder import AutoResponderSelect
+from ...utils.trigger_index import TriggerIndex
 
 
 class AutoResponder(Modal, title="Auto Responder"):
@@ -19,8 +22,16 @@ class AutoResponder(Modal, title="Auto Responder"):
         style=TextStyle.paragraph
     )
 
-    def __init__(self, db: AutoRespondDB, response_type: str, matching_type: str, bot: Bot):
+    def __init__(
+            self,
+            db: AutoRespondDB,
+            index: TriggerIndex,
+            response_type: str,
+            matching_type: str,
+            bot: Bot
+    ):
         self.db = db
+        self.index = index
         self.bot = bot
         self.response_type = response_type
         self.matching_type = matching_type
@@ -32,8 +43,20 @@ class AutoResponder(Modal, title="Auto Responder"):
         super().__init__()
 
     async def on_submit(self, interaction: Interaction) -> None:
+        if self.matching_type == 'regex':
+            try:
+                # Validate what actually gets stored, see AutoResponderSelect.
+                re.compile(self.message.value.strip().lower())
+            except re.error as error:
+                await interaction.response.send_message(
+                    f"Invalid regex pattern: {error}",
+                    ephemeral=True
+                )
+                return
+
         view = AutoResponderSelect(
             self.db,
+            self.index,
             [channel for guild in self.bot.guilds for channel in guild.text_channels],
             self
         )
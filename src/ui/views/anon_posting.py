@@ -21,7 +21,7 @@ class PersistentAnonView(View):
 
     @button(label="Create Post", custom_id="persistent: post")
     async def button_callback(self, interaction: Interaction, button: Button):
-        status = await self.config.get_config("anonymous_posting")
+        status = self.config.get_config("anonymous_posting")
 
         if not status["config_status"]:
             return await interaction.response.send_message(
@@ -85,7 +85,7 @@ class PersistentAnonView(View):
 
     @button(label="Reply to a Post", custom_id="persistent: reply")
     async def reply_button_callback(self, interaction: Interaction, button: Button):
-        status = await self.config.get_config("anonymous_posting")
+        status = self.config.get_config("anonymous_posting")
 
         if not status["config_status"]:
             return await interaction.response.send_message(
@@ -1,6 +1,7 @@
 from typing import List, Any
 
 from ...data.auto_responder import AutoRespondDB
+from ...utils.trigger_index import TriggerIndex
 from discord import Embed, Interaction, TextChannel, ChannelType
 from discord.ui import View, Button, button, ChannelSelect
 
@@ -95,9 +96,16 @@ class ResponderChannelSelect(ChannelSelect):
 
 
 class AutoResponderSelect(View):
-    def __init__(self, db: AutoRespondDB, channels: List[TextChannel], modal: "AutoResponder"):
+    def __init__(
+            self,
+            db: AutoRespondDB,
+            index: TriggerIndex,
+            channels: List[TextChannel],
+            modal: "AutoResponder"
+    ):
         super().__init__(timeout=180)
         self.db = db
+        self.index = index
         self.channels = channels
         self.modal = modal
         self.select = ResponderChannelSelect(max_values=len(self.channels) if len(self.channels) < 25 else 25)
@@ -121,5 +129,9 @@ class AutoResponderSelect(View):
         for channel in self.select.values:
             await self.db.insert_channel_response(channel.id, int(response_id))
 
+        # Only patch the index once the channels are stored,
+        # so the response never fires outside of them.
+        self.index.add(await self.db.get_response(int(response_id)))
+
         await interaction.response.send_message("Response added!", ephemeral=True)
         self.stop()
@@ -1,4 +1,4 @@
-from typing import Tuple, List
+from typing import List
 
 from discord import Embed, Interaction, ButtonStyle, User
 from discord.ui import View, Button, button
@@ -9,22 +9,25 @@ class CurrencyConverterPagination(View):
     """The view for checking currency converter items.
 
     :param user: The user who owns the view.
-    :param data: The data to display.
+    :param pages: The pre-rendered pages to display.
     """
 
     def __init__(
         self,
         user: User,
-        data: List[Tuple[str, str]],
+        pages: List[str],
         logger: Logger,
     ):
-        self.offset = 0
+        self.page = 0
         self.title = "**Here are the available currencies**\n"
         self.user = user
-        self.data = data
+        self.pages = pages
         self.logger = logger
         super().__init__(timeout=180)
 
+        if len(self.pages) <= 1:
+            self.next_button.disabled = True
+
     async def interaction_check(self, interaction):
         if interaction.user != self.user:
             self.logger.info(f"{interaction.user} tried to use {self.user}'s view.")
@@ -34,30 +37,29 @@ class CurrencyConverterPagination(View):
             )
         return interaction.user == self.user
 
+    def _embed(self) -> Embed:
+        """Builds the embed of the current page."""
+
+        embed = Embed()
+        embed.title = self.title
+        embed.description = self.pages[self.page]
+
+        return embed
+
     @button(label="Previous", disabled=True)
     async def previous_button(self, interaction: Interaction, button: Button):
         """This button will be disabled at first, but will be
         re-enabled when the user clicks "Next".
         """
 
-        embed = Embed()
         self.next_button.disabled = False
-        self.offset -= 10
+        self.page -= 1
 
-        if self.offset < 10:
+        if self.page == 0:
             # Disable the button if the page is back to 1
             button.disabled = True
 
-        embed.title = self.title
-        embed.description = ""
-
-        for i in range(self.offset, self.offset + 10):
-            if i >= len(self.data):
-                break
-
-            embed.description += f"{self.data[i][0]} - {self.data[i][1]}\n"
-
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=self._embed(), view=self)
 
     @button(label="Next")
     async def next_button(self, interaction: Interaction, button: Button):
@@ -65,24 +67,14 @@ class CurrencyConverterPagination(View):
         re-enabled when the user clicks "Previous".
         """
 
-        embed = Embed()
         self.previous_button.disabled = False
-        self.offset += 10
+        self.page += 1
 
-        if self.offset > len(self.data) - 10:
+        if self.page >= len(self.pages) - 1:
             # Disable the button if the page is the last page
             button.disabled = True
 
-        embed.title = self.title
-        embed.description = ""
-
-        for i in range(self.offset, self.offset + 10):
-            if i >= len(self.data):
-                break
-
-            embed.description += f"{self.data[i][0]} - {self.data[i][1]}\n"
-
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=self._embed(), view=self)
 
     @button(label="Close", style=ButtonStyle.red)
     async def close_button(self, interaction: Interaction, button: Button):
@@ -1,12 +1,32 @@
+import re
+from datetime import datetime
+
 from discord import ButtonStyle, Embed, ForumChannel, Interaction, Thread
-from discord.ui import Button, Select, View, button
-from discord.ui.item import Item
+from discord.ui import Button, DynamicItem, Select, View
 
 from ...data.forum.post_assist import PostAssistDB
 from ...utils.logging.logger import Logger
 
+# The most tags a forum thread can have.
+MAX_APPLIED_TAGS = 5
+SOLVED_PREFIX = "[SOLVED]"
+
+
+class SolvedButton(
+    DynamicItem[Button],
+    template=r"solved(?::(?P<thread_id>[0-9]+):(?P<author_id>[0-9]+))?",
+):
+    """The Solved! button of a post assist thread.
+
+    The thread and author ids are kept in the custom id, so one handler
+    registered with :meth:`discord.Client.add_dynamic_items` serves the
+    button of every thread. Buttons sent before that only have "solved"
+    as their custom id, those fall back to the thread they are in.
+    """
+
+    # The threads being marked as solved right now.
+    _solving: set[int] = set()
 
-class PersistentSolverView(View):
     def __init__(
         self,
         thread_id: int,
@@ -20,7 +40,36 @@ class PersistentSolverView(View):
         self.db = db
         self.staff_roles = staff_roles
         self.logger = logger
-        super().__init__(timeout=None)
+        super().__init__(
+            Button(
+                label="Solved!",
+                style=ButtonStyle.green,
+                custom_id=f"solved:{thread_id}:{author_id}",
+            )
+        )
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: Interaction, item: Button, match: re.Match[str]
+    ) -> "SolvedButton":
+        if match["thread_id"] is not None:
+            thread_id = int(match["thread_id"])
+            author_id = int(match["author_id"])
+        elif isinstance(interaction.channel, Thread):
+            thread_id = interaction.channel.id
+            author_id = interaction.channel.owner_id or 0
+        else:
+            thread_id = author_id = 0
+
+        client = interaction.client
+
+        return cls(
+            thread_id,
+            author_id,
+            PostAssistDB(client.pool),  # type: ignore
+            client.config.guild.staff_roles,  # type: ignore
+            client.logger,  # type: ignore
+        )
 
     async def interaction_check(self, interaction: Interaction) -> bool:
         conditions = (
@@ -42,16 +91,23 @@ class PersistentSolverView(View):
             return False
         return True
 
-    @button(label="Solved!", style=ButtonStyle.green, custom_id="solved")
-    async def solved(self, interaction: Interaction, button: Button):
-        self.stop()
+    async def callback(self, interaction: Interaction) -> None:
+        try:
+            await self.solved(interaction)
+        except Exception as error:
+            info = f"Thread ID: {self.thread_id}"
+            self.logger.error(
+                f"An error occurred while using the solve button:\n```{error}\n{info}```"
+            )
+
+    async def solved(self, interaction: Interaction):
         await interaction.response.defer()
 
         thread = (
             interaction.guild.get_thread(self.thread_id) if interaction.guild else None
         )
 
-        if not thread:
+        if not thread and self.thread_id:
             fetched = await interaction.client.fetch_channel(self.thread_id)
             thread = fetched if isinstance(fetched, Thread) else None
 
@@ -62,13 +118,35 @@ class PersistentSolverView(View):
             )
             return
 
-        bot_user_id = interaction.client.user.id if interaction.client.user else 0
+        # The button stays live once the post is solved, and can be clicked twice at once.
+        if thread.id in self._solving or thread.locked:
+            await interaction.followup.send(
+                "This post has already been marked as solved.", ephemeral=True
+            )
+            return
+
+        # Taken before anything is awaited, so a concurrent click sees it.
+        self._solving.add(thread.id)
+
+        try:
+            if await self.db.is_mark_as_solved_view_closed(thread.id):
+                await interaction.followup.send(
+                    "This post has already been marked as solved.", ephemeral=True
+                )
+                return
+
+            await self._solve(interaction, thread)
+        finally:
+            self._solving.discard(thread.id)
+
+    async def _solve(self, interaction: Interaction, thread: Thread):
+        """Asks who helped, then marks the thread as solved.
 
-        users = {
-            (message.author.display_name, message.author.id)
-            async for message in thread.history(limit=None)
-            if message.author.id != bot_user_id and message.author.id != self.author_id
-        }
+        :param interaction: The interaction of the button
+        :param thread: The thread to mark as solved
+        """
+
+        users = await self._participants(thread)
 
         message = "This post has been marked as solved."
         view = None
@@ -92,8 +170,10 @@ class PersistentSolverView(View):
             cancel.callback = cancel_callback
             selection.callback = selection_callback
 
-            for name, id in users:
-                selection.add_option(label=name, value=str(id))
+            for user_id in users:
+                member = thread.guild.get_member(user_id)
+                name = member.display_name if member else f"Unknown user ({user_id})"
+                selection.add_option(label=name, value=str(user_id))
 
             view.add_item(selection)
             view.add_item(cancel)
@@ -115,25 +195,61 @@ class PersistentSolverView(View):
         tag_id = await self.db.get_mark_as_solved_tag(thread.parent_id)
         tag = thread.parent.get_tag(tag_id) if tag_id else None
 
-        name = f"[SOLVED] {thread.name}"
+        name = thread.name
+
+        if not name.startswith(SOLVED_PREFIX):
+            name = f"{SOLVED_PREFIX} {name}"
+
         self.logger.info(name)
 
         if len(name) > 100:
             name = name[:97] + "..."
 
-        await thread.edit(locked=True, name=name)
-        if tag:
-            await thread.add_tags(tag, reason="Solved")
-        await thread.send(embed=embed)
-        await self.db.close_persistent_mark_as_solved_view(thread.id)
+        changes = {"locked": True, "name": name}
 
-    async def on_error(
-        self,
-        interaction: Interaction,
-        error: Exception,
-        item: Item,
-    ) -> None:
-        info = f"Thread ID: {self.thread_id}"
-        self.logger.error(
-            f"An error occurred while using the solve button:\n```{error}\n{info}```"
-        )
+        if tag and tag not in thread.applied_tags:
+            # A thread can't have more than five tags, the solved tag replaces the last one.
+            changes["applied_tags"] = thread.applied_tags[: MAX_APPLIED_TAGS - 1] + [tag]
+
+        # One edit for the name, lock and tag, and the view is only closed if it all went through.
+        async with self.db.closing_mark_as_solved_view(thread.id):
+            await thread.edit(**changes, reason="Solved")
+            await thread.send(embed=embed)
+
+    async def _participants(self, thread: Thread) -> list[int]:
+        """Gets who helped in the thread, the most active first.
+
+        Every thread is indexed from its history once, so the helpers from
+        before the participants were tracked live are counted too.
+
+        :param thread: The thread
+        """
+
+        if not await self.db.participants_backfilled(thread.id):
+            participants: dict[int, tuple[int, datetime]] = {}
+
+            async for message in thread.history(limit=None):
+                if message.author.bot:
+                    continue
+
+                count, last_seen = participants.get(message.author.id, (0, message.created_at))
+                participants[message.author.id] = (count + 1, max(last_seen, message.created_at))
+
+            await self.db.add_participants(thread.id, participants)
+
+        return await self.db.get_participants(thread.id, self.author_id)
+
+
+def solver_view(
+    thread_id: int,
+    author_id: int,
+    db: PostAssistDB,
+    staff_roles: list[int],
+    logger: Logger,
+) -> View:
+    """Gets a view with the Solved! button of a thread, to send with a message."""
+
+    view = View(timeout=None)
+    view.add_item(SolvedButton(thread_id, author_id, db, staff_roles, logger))
+
+    return view
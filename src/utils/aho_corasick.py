@@ -0,0 +1,110 @@
+from collections import deque
+from typing import Iterable, Iterator
+
+
+class AhoCorasick:
+    """A multi-pattern string matcher.
+
+    The automaton is built once from all the patterns, and then finds
+    every occurrence of every pattern in a single pass over the text.
+
+    Usage:
+    ```
+        automaton = AhoCorasick(["he", "she", "hers"])
+
+        for end, pattern in automaton.iter("ushers"):
+            print(end, pattern)  # 3 she, 3 he, 5 hers
+    ```
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[str]] = [[]]
+
+        for pattern in set(patterns):
+            if pattern:
+                self._insert(pattern)
+
+        self._link()
+
+    def _insert(self, pattern: str) -> None:
+        """Adds a pattern to the trie.
+
+        :param pattern: The pattern to add.
+        """
+
+        state = 0
+
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+
+            state = next_state
+
+        self._output[state].append(pattern)
+
+    def _link(self) -> None:
+        """Builds the failure links breadth-first, and merges the outputs of
+        each state with the outputs of its failure state.
+        """
+
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def step(self, state: int, char: str) -> int:
+        """Advances the automaton by one character.
+
+        :param state: The current state, start with 0.
+        :param char: The next character of the text.
+        :return: The next state.
+        """
+
+        while state and char not in self._goto[state]:
+            state = self._fail[state]
+
+        return self._goto[state].get(char, 0)
+
+    def outputs(self, state: int) -> list[str]:
+        """Gets the patterns that end at the given state.
+
+        :param state: The state returned by :meth:`step`.
+        """
+
+        return self._output[state]
+
+    def iter(self, text: str) -> Iterator[tuple[int, str]]:
+        """Finds every pattern occurrence in the text.
+
+        :param text: The text to search.
+        :return: Pairs of (index of the last character, pattern).
+        """
+
+        state = 0
+
+        for index, char in enumerate(text):
+            state = self.step(state, char)
+
+            for pattern in self._output[state]:
+                yield index, pattern
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
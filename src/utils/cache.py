@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """A size-bounded LRU cache whose entries also expire.
+
+    When the cache is full, the least recently used entry is evicted.
+    Every entry expires ``ttl`` seconds after it was set, unless it was
+    set with its own ttl.
+
+    Usage:
+    ```
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("array", ["a list"])
+        cache.set("void", None, ttl=5)  # negative results can expire sooner
+
+        cache.get("array")  # ["a list"]
+    ```
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Gets a value, and marks it as recently used.
+
+        :param key: The key to look for.
+        :param default: What to return if the key is missing or expired.
+        """
+
+        entry = self._entries.get(key, _MISSING)
+
+        if entry is _MISSING:
+            return default
+
+        expires_at, value = entry
+
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Sets a value, evicting the least recently used entry if full.
+
+        :param key: The key to set.
+        :param value: The value to store.
+        :param ttl: Seconds until the entry expires, defaults to the cache's ttl.
+        """
+
+        if ttl is None:
+            ttl = self.ttl
+
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Removes an entry, if it exists."""
+
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes every entry."""
+
+        self._entries.clear()
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,103 @@
+from bisect import bisect_left
+from difflib import get_close_matches
+from typing import Iterable, Mapping
+
+
+def _prefixed(index: list[tuple[str, str]], prefix: str) -> Iterable[str]:
+    """Yields the codes of a sorted (key, code) index whose key starts with the prefix."""
+
+    position = bisect_left(index, (prefix, ""))
+
+    while position < len(index) and index[position][0].startswith(prefix):
+        yield index[position][1]
+        position += 1
+
+
+class CurrencySymbols:
+    """The supported currencies, indexed for lookups.
+
+    Codes are kept in a dict for constant-time validation, and in sorted
+    indexes (by code and by name) so prefix searches for autocomplete are
+    a binary search instead of a scan.
+
+    Usage:
+    ```
+        symbols = CurrencySymbols({"USD": "United States Dollar", "EUR": "Euro"})
+
+        "usd" in symbols  # True
+        symbols.complete("eu")  # [("EUR", "Euro")]
+        symbols.suggest("UDS")  # ["USD"]
+    ```
+    """
+
+    def __init__(self, symbols: Mapping[str, str] | Iterable[tuple[str, str]] = ()) -> None:
+        self._names: dict[str, str] = {
+            code.upper(): name for code, name in dict(symbols).items()
+        }
+        self._codes = sorted(self._names)
+        self._by_code = [(code, code) for code in self._codes]
+        self._by_name = sorted((name.lower(), code) for code, name in self._names.items())
+        self._pages: dict[int, list[str]] = {}
+
+    def name(self, code: str) -> str | None:
+        """Gets the name of a currency.
+
+        :param code: The currency code.
+        """
+
+        return self._names.get(code.upper())
+
+    def complete(self, text: str, limit: int = 25) -> list[tuple[str, str]]:
+        """Gets the currencies whose code or name starts with the text.
+
+        :param text: What was typed so far.
+        :param limit: The maximum number of currencies to return,
+            25 is the most Discord shows.
+        :return: (code, name) pairs, code matches first.
+        """
+
+        if not text:
+            return [(code, self._names[code]) for code in self._codes[:limit]]
+
+        matches: dict[str, None] = {}
+
+        for code in _prefixed(self._by_code, text.upper()):
+            matches[code] = None
+
+        for code in _prefixed(self._by_name, text.lower()):
+            matches[code] = None
+
+        return [(code, self._names[code]) for code in list(matches)[:limit]]
+
+    def suggest(self, code: str, limit: int = 3) -> list[str]:
+        """Gets the supported codes closest to an unsupported one.
+
+        :param code: The code that was not found.
+        :param limit: The maximum number of suggestions.
+        """
+
+        return get_close_matches(code.upper(), self._codes, n=limit, cutoff=0.6)
+
+    def pages(self, per_page: int = 10) -> list[str]:
+        """Gets the currency list split into pages, rendered once and reused.
+
+        :param per_page: The number of currencies per page.
+        """
+
+        if per_page not in self._pages:
+            lines = [f"{code} - {self._names[code]}" for code in self._codes]
+            self._pages[per_page] = [
+                "\n".join(lines[start:start + per_page])
+                for start in range(0, len(lines), per_page)
+            ] or [""]
+
+        return self._pages[per_page]
+
+    def __contains__(self, code: str) -> bool:
+        return code.upper() in self._names
+
+    def __iter__(self):
+        return iter(self._codes)
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+
+class ExchangeRates:
+    """An in-memory quote table for one base currency.
+
+    The table holds how much of each currency one unit of the base buys,
+    so any pair can be converted locally by going through the base:
+    ``amount / rate[from] * rate[to]``.
+
+    Usage:
+    ```
+        rates = ExchangeRates("USD")
+        rates.update({"USDEUR": 0.9, "USDPHP": 56.0})
+
+        rates.convert(10, "EUR", "PHP")  # 622.22...
+    ```
+    """
+
+    def __init__(self, base: str) -> None:
+        self.base = base.upper()
+        self.updated_at: datetime | None = None
+        self._rates: dict[str, float] = {}
+
+    def update(self, quotes: dict[str, float], updated_at: datetime | None = None) -> None:
+        """Replaces the table with a new set of quotes.
+
+        :param quotes: The quotes, keyed by base + currency (e.g. "USDEUR")
+            like the currency_data API returns them.
+        :param updated_at: When the quotes were fetched, defaults to now.
+        """
+
+        rates = {self.base: 1.0}
+
+        for pair, rate in quotes.items():
+            if pair.startswith(self.base) and rate:
+                rates[pair[len(self.base):].upper()] = float(rate)
+
+        self._rates = rates
+        self.updated_at = updated_at or datetime.now(timezone.utc)
+
+    def is_stale(self, max_age: timedelta) -> bool:
+        """Checks if the table is missing or older than the given age.
+
+        :param max_age: How old the table may be.
+        """
+
+        if self.updated_at is None:
+            return True
+
+        return datetime.now(timezone.utc) - self.updated_at >= max_age
+
+    def rate(self, from_currency: str, to_currency: str) -> float | None:
+        """Gets how much of one currency one unit of another buys.
+
+        :param from_currency: The currency to convert from.
+        :param to_currency: The currency to convert to.
+        :return: The rate, or None if either currency is not in the table.
+        """
+
+        from_rate = self._rates.get(from_currency.upper())
+        to_rate = self._rates.get(to_currency.upper())
+
+        if from_rate is None or to_rate is None:
+            return None
+
+        return to_rate / from_rate
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> float | None:
+        """Converts an amount from one currency to another.
+
+        :param amount: The amount to convert.
+        :param from_currency: The currency to convert from.
+        :param to_currency: The currency to convert to.
+        :return: The converted amount, or None if a currency is not in the table.
+        """
+
+        rate = self.rate(from_currency, to_currency)
+
+        return amount * rate if rate is not None else None
+
+    def __contains__(self, currency: str) -> bool:
+        return currency.upper() in self._rates
+
+    def __len__(self) -> int:
+        return len(self._rates)
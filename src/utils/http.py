@@ -0,0 +1,170 @@
+import asyncio
+import json
+import random
+from logging import Logger
+from typing import Any, Mapping
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+
+# Statuses worth another try, the rest are returned as they are.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpError(Exception):
+    """Raised when a request still fails after every retry."""
+
+
+class HttpResponse:
+    """A fully read response.
+
+    The body is read before the connection goes back to the pool, so the
+    response can be used after the request returns.
+    """
+
+    def __init__(self, status: int, data: Any, headers: Mapping[str, str]) -> None:
+        self.status = status
+        self.data = data
+        self.headers = headers
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self) -> Any:
+        return self.data
+
+
+class HttpClient:
+    """The bot's shared, non-blocking HTTP client.
+
+    One keep-alive session is shared by every cog, with a cap on the
+    connections per host, a timeout per request, and retries with
+    exponential backoff for connection errors, timeouts and the
+    statuses in :data:`RETRY_STATUSES`.
+
+    Usage:
+    ```
+        client = HttpClient()
+        await client.start()
+
+        response = await client.get("https://example.com/api", params={"q": "hello"})
+
+        if response.ok:
+            print(response.data)
+
+        await client.close()
+    ```
+    """
+
+    def __init__(
+        self,
+        logger: Logger | None = None,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self._logger = logger
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._session: ClientSession | None = None
+
+    async def start(self) -> None:
+        """Opens the session, must be called from within the event loop."""
+
+        if self._session is not None and not self._session.closed:
+            return
+
+        connector = TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            ttl_dns_cache=300,
+        )
+        self._session = ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(total=self._timeout),
+        )
+
+    async def close(self) -> None:
+        """Closes the session and every pooled connection."""
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """Gets how long to wait before the next attempt.
+
+        :param attempt: The attempt that just failed, starting at 0.
+        :param retry_after: The Retry-After header of the response, if any.
+        """
+
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self._max_backoff)
+            except ValueError:
+                pass
+
+        delay = self._backoff * 2 ** attempt
+        # Jitter, so clients that failed together don't retry together.
+        return min(delay + random.uniform(0, self._backoff), self._max_backoff)
+
+    @staticmethod
+    def _parse(body: str) -> Any:
+        """Parses a JSON body, leaving anything else as text."""
+
+        try:
+            return json.loads(body)
+        except ValueError:
+            return body
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> HttpResponse:
+        """Sends a request, retrying it if it fails.
+
+        :param method: The HTTP method.
+        :param url: The URL to send it to.
+        :param kwargs: Passed to :meth:`aiohttp.ClientSession.request`,
+            e.g. params or headers.
+        :raises HttpError: If the request never got a response.
+        """
+
+        if self._session is None:
+            await self.start()
+
+        for attempt in range(self._retries + 1):
+            last_attempt = attempt == self._retries
+
+            try:
+                async with self._session.request(method, url, **kwargs) as response:
+                    if response.status in RETRY_STATUSES and not last_attempt:
+                        delay = self._delay(attempt, response.headers.get("Retry-After"))
+                    else:
+                        body = await response.text()
+                        return HttpResponse(response.status, self._parse(body), response.headers)
+            except (ClientError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise HttpError(f"{method} {url} failed: {e!r}") from e
+
+                delay = self._delay(attempt)
+
+            if self._logger is not None:
+                self._logger.warning(
+                    f"[HTTP] {method} {url} failed (attempt {attempt + 1}), retrying in {delay:.1f}s"
+                )
+
+            await asyncio.sleep(delay)
+
+        # Unreachable, the last attempt either returns or raises.
+        raise HttpError(f"{method} {url} failed")
+
+    async def get(self, url: str, **kwargs: Any) -> HttpResponse:
+        """Sends a GET request, see :meth:`request`."""
+
+        return await self.request("GET", url, **kwargs)
@@ -1,164 +1,387 @@
-from datetime import datetime, timezone
-from typing import Literal, Optional
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import socket
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from logging import Logger
+from typing import Awaitable, Callable, Literal
 
-from dateutil.relativedelta import relativedelta
-from discord.ext.tasks import loop
+from src.data.jobs import JobsDB
 
-days = [
-    "monday",
-    "tuesday",
-    "wednesday",
-    "thursday",
-    "friday",
-    "saturday",
-    "sunday",
-]
+# Gets the first run strictly after the given time, or None to pause the job.
+Trigger = Callable[[datetime], datetime | None]
+# What to do with a run that was missed while the bot was down:
+# "once" runs it right away, "skip" waits for the next one.
+CatchUp = Literal["once", "skip"]
+# How long to wait before checking a job another process holds again.
+CLAIM_RETRY = timedelta(minutes=1)
 
 
-class Task:
-    __slots__ = ("func", "schedule")
+def every(interval: timedelta) -> Trigger:
+    """Gets a trigger that fires at a fixed interval.
+
+    :param interval: The time between runs.
+    """
+
+    def trigger(after: datetime) -> datetime:
+        return after + interval
+
+    return trigger
+
+
+def daily(at: time, tz: tzinfo = timezone.utc) -> Trigger:
+    """Gets a trigger that fires every day at the same time.
+
+    :param at: The time of the day.
+    :param tz: The timezone the time is in.
+    """
+
+    def trigger(after: datetime) -> datetime:
+        due = datetime.combine(after.astimezone(tz).date(), at, tzinfo=tz)
+
+        if due <= after:
+            due += timedelta(days=1)
+
+        return due.astimezone(timezone.utc)
+
+    return trigger
 
-    def __init__(self, func):
-        self.func = func
 
-    async def run(self):
-        await self.func()
+class Clock:
+    """The real time, see the tests for a virtual one."""
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class MemoryJobStore:
+    """Keeps the next runs in memory, they are lost on restart.
+
+    Schedulers sharing a store claim runs like with :class:`JobsDB`,
+    but a lease is only given back when the run finishes.
+    """
+
+    def __init__(self) -> None:
+        self._next_runs: dict[str, datetime | None] = {}
+        self._leases: dict[str, str] = {}
+
+    async def load(self, name: str) -> datetime | None:
+        return self._next_runs.get(name)
+
+    async def save(self, name: str, next_run: datetime | None) -> None:
+        self._next_runs[name] = next_run
+
+    async def claim(
+        self,
+        name: str,
+        owner: str,
+        due: datetime,
+        next_run: datetime | None,
+        lease: timedelta,
+    ) -> bool:
+        saved = self._next_runs.get(name)
 
+        if (saved is not None and saved > due) or name in self._leases:
+            return False
 
-class Schedule:
-    _date: datetime
-    _frequency: Literal["daily", "weekly", "monthly"]
-    _day: Optional[
-        Literal[
-            "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"
-        ]
-        | str
-    ]
-    _task: Task
+        self._next_runs[name] = next_run
+        self._leases[name] = owner
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        if self._leases.get(name) == owner:
+            del self._leases[name]
+
+
+class Job:
+    """A coroutine function to run on a trigger.
+
+    :param name: The unique name of the job, also its key in the store.
+    :param func: The coroutine function to run.
+    :param trigger: Gets the next run, see :data:`Trigger`.
+    :param catch_up: What to do with a run missed while the bot was down.
+    :param jitter: Up to how many seconds to randomly delay each run by.
+    :param local: Whether every process runs it, e.g. to save what it saw
+        itself. A local job is neither saved nor claimed in the store.
+    """
+
+    __slots__ = ("name", "func", "trigger", "catch_up", "jitter", "local")
 
     def __init__(
         self,
-        date: datetime,
-        frequency: Literal["daily", "weekly", "monthly"],
-        day: Optional[
-            Literal[
-                "monday",
-                "tuesday",
-                "wednesday",
-                "thursday",
-                "friday",
-                "saturday",
-                "sunday",
-            ]
-            | str
-        ],
-        task: Task,
-    ):
-        self._date = date
-        self._frequency = frequency
-        self._day = day
-        self._task = task
-
-    async def run(self) -> None:
-        self._spawn_loop.start()
-
-    @loop()
-    async def _spawn_loop(self):
-        if self.is_due():
-            await self._task.run()
-
-        self.reschedule()
-
-    def is_due(self) -> bool:
-        now = datetime.now(tz=timezone.utc)
-        diff = (self._date - now).total_seconds()
-
-        return diff == 0.00 or diff == -1.00
-
-    def is_running(self) -> bool:
-        return self._spawn_loop.is_running()
-
-    def reschedule(self) -> None:
-        # TODO: Reschedule the task based on the frequency,
-        # if the frequency is daily, reschedule the task to the next day
-        # and ignore the day parameter
-        # if the frequency is weekly/monthly, reschedule the task
-        # to the next week
-        # and ignore the day parameter if it's not provided
-
-        next_run = self._next_run()
-        self._date = next_run
-
-        diff = (self._date - datetime.now(tz=timezone.utc)).total_seconds()
-
-        self._spawn_loop.change_interval(seconds=max(1, diff))
-
-    def get_day(self):
-        if self._day is None:
-            return None
-        return self._day
-
-    def _next_run(self) -> datetime:
-        next_run = datetime.now(tz=timezone.utc)
-
-        if self._frequency == "daily":
-            next_run += relativedelta(days=1)
-            return next_run
-        elif self._frequency == "weekly" and self._day is None:
-            next_run += relativedelta(weeks=1)
-            return next_run
-        elif self._frequency == "monthly" and self._day is None:
-            next_run = next_run.replace(day=1)
-            next_run += relativedelta(months=1)
-            return next_run
-
-        if self._day is not None and self._frequency == "weekly":
-            next_run += relativedelta(weekday=days.index(self._day))
-
-        # set the day to the first day of the month
-        # and set the weekday to the day of the week
-        if self._day is not None and self._frequency == "monthly":
-            next_run += relativedelta(weekday=days.index(self._day))
-            next_run += relativedelta(months=1)
-            # next_run = next_run.replace(day=1)
-
-        return next_run
-
-    def cancel(self) -> None:
-        if self._spawn_loop.is_running():
-            self._spawn_loop.cancel()
+        name: str,
+        func: Callable[[], Awaitable[None]],
+        trigger: Trigger,
+        catch_up: CatchUp = "once",
+        jitter: float = 0.0,
+        local: bool = False,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.catch_up = catch_up
+        self.jitter = jitter
+        self.local = local
 
 
 class Scheduler:
-    schedules: dict[str, Schedule]
+    """Runs every periodic job of the bot from a single task.
 
-    def __init__(self) -> None:
-        self.schedules = {}
+    The upcoming runs are kept in a heap, and the task sleeps until the
+    earliest one is due, waking up early if a job is added or
+    rescheduled. Each job runs in its own task, so a slow job doesn't
+    delay the others, but a job never runs twice at the same time.
+
+    The next run of every job is saved to the store, so a run that was
+    missed while the bot was down can be caught up on the next start.
+    Each run is claimed from the store before it starts, so when several
+    processes share a store, e.g. a hot standby, only one of them runs it.
+
+    Usage:
+    ```
+        scheduler = Scheduler()
+        scheduler.start()
+
+        await scheduler.add(Job("hello", say_hello, daily(time(9, 0))))
+        await scheduler.reschedule("hello")  # after the trigger changed
+    ```
+    """
+
+    def __init__(
+        self,
+        store: MemoryJobStore | JobsDB | None = None,
+        logger: Logger | None = None,
+        clock: Clock | None = None,
+        owner: str | None = None,
+        lease: timedelta = timedelta(minutes=15),
+    ) -> None:
+        self._store = store or MemoryJobStore()
+        self._logger = logger
+        self._clock = clock or Clock()
+        self._owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._lease = lease
+        self._jobs: dict[str, Job] = {}
+        # name -> (nominal run, run with jitter, heap entry id)
+        self._next_runs: dict[str, tuple[datetime, datetime, int]] = {}
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._ids = itertools.count()
+        self._running: dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def next_run(self, name: str) -> datetime | None:
+        """Gets when a job runs next, or None if it is paused or missing.
+
+        :param name: The name of the job.
+        """
+
+        next_run = self._next_runs.get(name)
+
+        return next_run[1] if next_run is not None else None
+
+    async def add(self, job: Job) -> None:
+        """Adds a job, resuming from its saved next run if there is one.
+
+        :param job: The job to add.
+        :raises KeyError: If a job with the same name was already added.
+        """
+
+        if job.name in self._jobs:
+            raise KeyError(f"Job {job.name} already exists")
+
+        self._jobs[job.name] = job
+        now = self._clock.now()
+        saved = None if job.local else await self._store.load(job.name)
+
+        if saved is None:
+            await self._schedule(job, job.trigger(now))
+        elif saved > now:
+            self._push(job, saved)
+        elif job.catch_up == "once":
+            self._push(job, saved, due=now)
+        else:
+            await self._schedule(job, job.trigger(now))
+
+    def remove(self, name: str) -> None:
+        """Removes a job, a run that already started is left to finish.
+
+        :param name: The name of the job.
+        """
+
+        self._jobs.pop(name, None)
+        self._next_runs.pop(name, None)
+
+    async def reschedule(self, name: str, at: datetime | None = None) -> None:
+        """Moves the next run of a job, e.g. after its schedule changed.
+
+        :param name: The name of the job.
+        :param at: When to run it next, defaults to what its trigger says.
+        """
+
+        job = self._jobs[name]
+
+        await self._schedule(job, at if at is not None else job.trigger(self._clock.now()))
+
+    def start(self) -> None:
+        """Starts running the jobs, must be called from within the event loop."""
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stops the scheduler and every job that is still running."""
+
+        tasks = list(self._running.values())
+
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+
+    async def _schedule(self, job: Job, nominal: datetime | None) -> None:
+        """Sets and saves the next run of a job."""
+
+        self._push(job, nominal)
+
+        if not job.local:
+            await self._store.save(job.name, nominal)
+
+    def _push(self, job: Job, nominal: datetime | None, due: datetime | None = None) -> None:
+        """Sets the next run of a job, None pauses it."""
+
+        if nominal is None:
+            self._next_runs.pop(job.name, None)
+            return
+
+        if due is None:
+            due = nominal + timedelta(seconds=random.uniform(0, job.jitter)) if job.jitter else nominal
+
+        entry_id = next(self._ids)
+        self._next_runs[job.name] = (nominal, due, entry_id)
+        heapq.heappush(self._heap, (due, entry_id, job.name))
+        self._wakeup.set()
+
+    def _peek(self) -> tuple[datetime, int, str] | None:
+        """Gets the earliest run, dropping the ones that were moved or removed."""
+
+        while self._heap:
+            due, entry_id, name = self._heap[0]
+            next_run = self._next_runs.get(name)
+
+            if next_run is not None and next_run[2] == entry_id:
+                return self._heap[0]
+
+            heapq.heappop(self._heap)
+
+        return None
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleeps for the given time, or until the heap changes."""
+
+        sleep = asyncio.ensure_future(self._clock.sleep(seconds))
+        wakeup = asyncio.ensure_future(self._wakeup.wait())
+
+        try:
+            await asyncio.wait({sleep, wakeup}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sleep.cancel()
+            wakeup.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            entry = self._peek()
+
+            if entry is None:
+                await self._wakeup.wait()
+                continue
+
+            due, _, name = entry
+            delay = (due - self._clock.now()).total_seconds()
+
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+
+            heapq.heappop(self._heap)
+
+            try:
+                await self._fire(self._jobs[name])
+            except Exception as e:
+                self._log("error", f"[SCHEDULER] Could not schedule {name}: {e!r}")
+
+    async def _fire(self, job: Job) -> None:
+        """Claims the run of a job and starts it."""
+
+        nominal, _, _ = self._next_runs.pop(job.name)
+        now = self._clock.now()
+        next_run = job.trigger(nominal)
+
+        if next_run is not None and next_run <= now:
+            # Running late, the runs missed meanwhile are skipped.
+            next_run = job.trigger(now)
+
+        running = self._running.get(job.name)
+
+        if running is not None and not running.done():
+            self._log("warning", f"[SCHEDULER] {job.name} is still running, skipping this run")
+            await self._schedule(job, next_run)
+            return
+
+        # The next run is saved with the claim, so a crash during the run doesn't repeat it.
+        if not await self._claim(job, nominal, next_run, now):
+            return
 
-    async def spawn_schedule(self, key: str, schedule: Schedule):
-        if key in self.schedules:
-            raise KeyError(f"Schedule with key {key} already exists")
-        self.schedules[key] = schedule
+        self._push(job, next_run)
+        self._running[job.name] = asyncio.create_task(self._call(job))
 
-        await schedule.run()
+    async def _claim(
+        self, job: Job, nominal: datetime, next_run: datetime | None, now: datetime
+    ) -> bool:
+        """Claims a run from the store, or follows the store if it is taken."""
 
-    def cancel_schedule(self, key: str) -> None:
-        if key not in self.schedules:
-            raise KeyError(f"Schedule with key {key} does not exist")
+        if job.local:
+            return True
 
-        if self.schedules[key].is_running():
-            self.schedules[key].cancel()
+        try:
+            if await self._store.claim(job.name, self._owner, nominal, next_run, self._lease):
+                return True
 
-    async def resume_schedule(self, key: str) -> None:
-        if key not in self.schedules:
-            raise KeyError(f"Schedule with key {key} does not exist")
+            # Another process ran it or is running it, follow its schedule.
+            saved = await self._store.load(job.name)
+        except Exception as e:
+            # The store is unreachable, try the same run again in a bit.
+            self._log("error", f"[SCHEDULER] Could not claim {job.name}: {e!r}")
+            self._push(job, nominal, due=now + CLAIM_RETRY)
+            return False
 
-        if not self.schedules[key].is_running():
-            await self.schedules[key].run()
+        if saved is not None:
+            self._push(job, saved, due=max(saved, now + CLAIM_RETRY))
 
-    def remove_schedule(self, key: str) -> None:
-        if key not in self.schedules:
-            raise KeyError(f"Schedule with key {key} does not exist")
+        return False
 
-        self.cancel_schedule(key)
-        self.schedules.pop(key)
+    async def _call(self, job: Job) -> None:
+        try:
+            await job.func()
+        except Exception as e:
+            self._log("error", f"[SCHEDULER] {job.name} failed: {e!r}")
+        finally:
+            if not job.local:
+                try:
+                    await self._store.release(job.name, self._owner)
+                except Exception as e:
+                    self._log("error", f"[SCHEDULER] Could not release {job.name}: {e!r}")
+
+    def _log(self, level: str, message: str) -> None:
+        if self._logger is not None:
+            getattr(self._logger, level)(message)
@@ -0,0 +1,274 @@
+import re
+from typing import Iterable, Iterator
+
+from .aho_corasick import AhoCorasick
+
+# The shard key of the responses that are not restricted to any channel.
+GLOBAL = None
+
+
+def _is_bounded(message: str, start: int, end: int) -> bool:
+    """Checks if ``message[start:end]`` stands on its own, meaning it is
+    surrounded by spaces or by the ends of the message.
+    """
+
+    if start > 0 and message[start - 1] != " ":
+        return False
+
+    if end < len(message) and message[end] != " ":
+        return False
+
+    return True
+
+
+def _shard_keys(response: dict | None) -> set[int | None]:
+    """Gets the keys of the shards a response lives in."""
+
+    if response is None:
+        return set()
+
+    if not response["specified"]:
+        return {GLOBAL}
+
+    return set(response["channels"])
+
+
+class _Shard:
+    """The compiled matchers for one group of responses.
+
+    ``strict`` triggers are looked up in a dict, while ``strict_contains``
+    and ``lenient`` triggers share one Aho-Corasick automaton, so a message
+    is scanned once no matter how many triggers there are.
+
+    ``regex`` triggers are compiled once and merged into one alternation
+    with a named group per response. Patterns that can't be merged
+    (e.g. ones with their own groups) are kept compiled on their own, and
+    patterns that don't compile at all end up in :attr:`invalid`.
+    """
+
+    def __init__(self, responses: Iterable[dict]) -> None:
+        self._strict: dict[str, list[dict]] = {}
+        self._contains: dict[str, list[dict]] = {}
+        self._regex: list[tuple[dict, re.Pattern]] = []
+        self._combined: re.Pattern | None = None
+        self._combined_regex: list[tuple[dict, re.Pattern]] = []
+        self.invalid: list[dict] = []
+
+        for response in responses:
+            trigger = response["message"]
+            matching_type = response["matching_type"]
+
+            if matching_type == "strict":
+                self._strict.setdefault(trigger, []).append(response)
+            elif matching_type in ("strict_contains", "lenient"):
+                # Both are searched on the lowercased message,
+                # strict_contains hits are verified against the original.
+                self._contains.setdefault(trigger.lower(), []).append(response)
+            elif matching_type == "regex":
+                self._add_regex(response)
+
+        self._automaton = AhoCorasick(self._contains)
+
+        if self._combined_regex:
+            self._combined = re.compile("|".join(
+                f"(?P<r{position}>{response['message']})"
+                for position, (response, _) in enumerate(self._combined_regex)
+            ))
+
+    def _add_regex(self, response: dict) -> None:
+        """Compiles a regex trigger and files it as combinable or standalone.
+
+        :param response: The regex response.
+        """
+
+        trigger = response["message"]
+
+        try:
+            pattern = re.compile(trigger)
+        except re.error:
+            self.invalid.append(response)
+            return
+
+        try:
+            # Groups would shift the numbering of back references, and
+            # inline flags are only allowed at the start of a pattern.
+            combinable = pattern.groups == 0 and re.compile(f"(?:{trigger})")
+        except re.error:
+            combinable = False
+
+        if combinable:
+            self._combined_regex.append((response, pattern))
+        else:
+            self._regex.append((response, pattern))
+
+    def _match_contains(self, message: str, matched: dict[int, dict]) -> None:
+        """Runs the message through the automaton once.
+
+        :param message: The message to check.
+        :param matched: Where to put the matching responses, keyed by id.
+        """
+
+        state = 0
+
+        for index, char in enumerate(message):
+            # Lowercase per character so the automaton positions
+            # always line up with the original message.
+            for folded in char.lower():
+                state = self._automaton.step(state, folded)
+
+                for key in self._automaton.outputs(state):
+                    for response in self._contains[key]:
+                        if response["matching_type"] == "lenient":
+                            matched[response["id"]] = response
+                            continue
+
+                        trigger = response["message"]
+                        start = index + 1 - len(trigger)
+
+                        if (
+                            message[start:index + 1] == trigger
+                            and _is_bounded(message, start, index + 1)
+                        ):
+                            matched[response["id"]] = response
+
+    def match(self, message: str, matched: dict[int, dict]) -> None:
+        """Collects the responses of this shard that match the message.
+
+        :param message: The message to check.
+        :param matched: Where to put the matching responses, keyed by id.
+        """
+
+        for response in self._strict.get(message, ()):
+            matched[response["id"]] = response
+
+        if self._automaton:
+            self._match_contains(message, matched)
+
+        if self._combined is not None:
+            hit = self._combined.match(message)
+
+            if hit is not None:
+                # The alternation stops at the first pattern that matches,
+                # the ones after it still need their own check.
+                first = int(hit.lastgroup[1:])
+                response, _ = self._combined_regex[first]
+                matched[response["id"]] = response
+
+                for response, pattern in self._combined_regex[first + 1:]:
+                    if pattern.match(message) is not None:
+                        matched[response["id"]] = response
+
+        for response, pattern in self._regex:
+            if pattern.match(message) is not None:
+                matched[response["id"]] = response
+
+
+class TriggerIndex:
+    """An in-memory index of the auto responder triggers.
+
+    The responses are loaded once and kept resident, so matching a
+    message never has to go through the database. The index is patched
+    whenever a response gets added or removed.
+
+    Responses are sharded by channel: one shard holds the responses that
+    apply everywhere, and every channel with restricted responses gets
+    its own. A message is only checked against the global shard and the
+    shard of its channel.
+    """
+
+    def __init__(self) -> None:
+        self._responses: dict[int, dict] = {}
+        self._ordered: list[dict] = []
+        self._shards: dict[int | None, _Shard] = {}
+
+    @property
+    def invalid(self) -> list[dict]:
+        """The regex responses whose pattern does not compile."""
+
+        invalid = {
+            response["id"]: response
+            for shard in self._shards.values()
+            for response in shard.invalid
+        }
+        return [invalid[response_id] for response_id in sorted(invalid)]
+
+    def _rebuild(self, keys: Iterable[int | None]) -> None:
+        """Rebuilds the given shards from the current responses.
+
+        :param keys: The channel ids of the shards to rebuild,
+            or :data:`GLOBAL` for the global shard.
+        """
+
+        # Responses are checked in the order they were created,
+        # so keep a sorted copy around instead of sorting per message.
+        self._ordered = [
+            self._responses[response_id] for response_id in sorted(self._responses)
+        ]
+
+        for key in keys:
+            responses = [
+                response for response in self._ordered if key in _shard_keys(response)
+            ]
+
+            if responses:
+                self._shards[key] = _Shard(responses)
+            else:
+                self._shards.pop(key, None)
+
+    def load(self, responses: list[dict]) -> None:
+        """Replaces the whole index with the given responses.
+
+        :param responses: The response rows from the database.
+        """
+
+        self._responses = {int(response["id"]): response for response in responses}
+        self._shards = {}
+        self._rebuild({
+            key for response in responses for key in _shard_keys(response)
+        })
+
+    def add(self, response: dict) -> None:
+        """Adds (or replaces) a single response in the index.
+
+        :param response: The response row from the database.
+        """
+
+        previous = self._responses.get(int(response["id"]))
+        self._responses[int(response["id"])] = response
+        self._rebuild(_shard_keys(previous) | _shard_keys(response))
+
+    def remove(self, response_id: int) -> None:
+        """Removes a response from the index, if it exists.
+
+        :param response_id: The id of the response to remove.
+        """
+
+        previous = self._responses.pop(response_id, None)
+
+        if previous is not None:
+            self._rebuild(_shard_keys(previous))
+
+    def match(self, message: str, channel_id: int) -> list[dict]:
+        """Gets all responses whose trigger matches the message.
+
+        Only the global responses and the ones restricted to the
+        message's channel are checked.
+
+        :param message: The message to check.
+        :param channel_id: The channel the message was sent in.
+        :return: The matching responses, in the order they were created.
+        """
+
+        matched: dict[int, dict] = {}
+
+        for key in (GLOBAL, channel_id):
+            if key in self._shards:
+                self._shards[key].match(message, matched)
+
+        return [matched[response_id] for response_id in sorted(matched)]
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._ordered)
+
+    def __len__(self) -> int:
+        return len(self._responses)
@@ -0,0 +1,55 @@
+import unittest
+
+from src.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(maxsize=2, ttl=10, clock=self.clock)
+
+    def test_get_and_set(self):
+        self.cache.set("array", 1)
+
+        self.assertEqual(self.cache.get("array"), 1)
+        self.assertIsNone(self.cache.get("pointer"))
+        self.assertEqual(self.cache.get("pointer", 0), 0)
+
+    def test_falsy_values_are_cached(self):
+        self.cache.set("qwrty", None)
+
+        self.assertIn("qwrty", self.cache)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set("array", 1)
+        self.cache.set("function", 2)
+        self.cache.get("array")
+        self.cache.set("pointer", 3)
+
+        self.assertIn("array", self.cache)
+        self.assertNotIn("function", self.cache)
+        self.assertIn("pointer", self.cache)
+
+    def test_expires(self):
+        self.cache.set("array", 1)
+        self.cache.set("qwrty", None, ttl=2)
+
+        self.clock.now = 5
+        self.assertIn("array", self.cache)
+        self.assertNotIn("qwrty", self.cache)
+
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get("array"))
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
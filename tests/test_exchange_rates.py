@@ -0,0 +1,34 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from src.utils.exchange_rates import ExchangeRates
+
+
+class TestExchangeRates(unittest.TestCase):
+    def setUp(self):
+        self.rates = ExchangeRates("usd")
+        self.rates.update({"USDEUR": 0.5, "USDPHP": 50.0, "USDXXX": 0})
+
+    def test_convert_from_base(self):
+        self.assertEqual(self.rates.convert(10, "USD", "PHP"), 500.0)
+
+    def test_convert_cross_rate(self):
+        self.assertEqual(self.rates.convert(10, "eur", "php"), 1000.0)
+        self.assertEqual(self.rates.rate("PHP", "EUR"), 0.01)
+
+    def test_unknown_currency(self):
+        self.assertIsNone(self.rates.convert(10, "USD", "JPY"))
+        # Zero quotes would divide by zero, so they are left out
+        self.assertNotIn("XXX", self.rates)
+
+    def test_is_stale(self):
+        self.assertFalse(self.rates.is_stale(timedelta(hours=1)))
+
+        self.rates.update({}, datetime.now(timezone.utc) - timedelta(hours=2))
+        self.assertTrue(self.rates.is_stale(timedelta(hours=1)))
+
+        self.assertTrue(ExchangeRates("USD").is_stale(timedelta(hours=1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
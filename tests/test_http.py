@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.utils.http import HttpClient, HttpError
+
+
+class TestHttpClient(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hits = {}
+
+        async def flaky(request: web.Request):
+            # Fails twice, then answers
+            self.hits["flaky"] = self.hits.get("flaky", 0) + 1
+
+            if self.hits["flaky"] < 3:
+                return web.Response(status=503)
+
+            return web.json_response({"fact": "Octopuses have three hearts."})
+
+        async def echo(request: web.Request):
+            return web.json_response({
+                "query": dict(request.query),
+                "key": request.headers.get("X-Api-Key"),
+            })
+
+        async def missing(request: web.Request):
+            self.hits["missing"] = self.hits.get("missing", 0) + 1
+            return web.json_response({"title": "No Definitions Found"}, status=404)
+
+        async def slow(request: web.Request):
+            await asyncio.sleep(1)
+            return web.Response(text="late")
+
+        async def plain(request: web.Request):
+            return web.Response(text="hello")
+
+        app = web.Application()
+        app.router.add_get("/flaky", flaky)
+        app.router.add_get("/echo", echo)
+        app.router.add_get("/missing", missing)
+        app.router.add_get("/slow", slow)
+        app.router.add_get("/plain", plain)
+
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.client = HttpClient(timeout=0.2, retries=2, backoff=0.01)
+        await self.client.start()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    def url(self, path: str) -> str:
+        return str(self.server.make_url(path))
+
+    async def test_get_json(self):
+        response = await self.client.get(
+            self.url("/echo"), params={"from": "USD"}, headers={"X-Api-Key": "key"}
+        )
+
+        self.assertTrue(response.ok)
+        self.assertEqual(response.data, {"query": {"from": "USD"}, "key": "key"})
+
+    async def test_get_text(self):
+        response = await self.client.get(self.url("/plain"))
+
+        self.assertEqual(response.data, "hello")
+
+    async def test_retries_server_errors(self):
+        response = await self.client.get(self.url("/flaky"))
+
+        self.assertEqual(self.hits["flaky"], 3)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.data["fact"], "Octopuses have three hearts.")
+
+    async def test_client_errors_are_not_retried(self):
+        response = await self.client.get(self.url("/missing"))
+
+        self.assertEqual(self.hits["missing"], 1)
+        self.assertFalse(response.ok)
+        self.assertEqual(response.data["title"], "No Definitions Found")
+
+    async def test_gives_up_after_retries(self):
+        with self.assertRaises(HttpError):
+            await self.client.get(self.url("/slow"))
+
+    async def test_last_retry_returns_the_error_status(self):
+        client = HttpClient(retries=1, backoff=0.01)
+
+        try:
+            response = await client.get(self.url("/flaky"))
+        finally:
+            await client.close()
+
+        self.assertEqual(self.hits["flaky"], 2)
+        self.assertEqual(response.status, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock
+
+from src.data.invalidation import CHANNEL, InvalidationBus
+
+
+class TestInvalidationBus(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.conn = MagicMock()
+        self.conn.add_listener = AsyncMock()
+        self.conn.remove_listener = AsyncMock()
+        self.conn.is_closed.return_value = False
+        self.pool = MagicMock()
+        self.pool.acquire = AsyncMock(return_value=self.conn)
+        self.pool.release = AsyncMock()
+        self.logger = MagicMock()
+        self.bus = InvalidationBus(self.pool, self.logger)
+
+    async def _notify(self, table, key):
+        self.bus._on_notification(self.conn, 1, CHANNEL, json.dumps({"table": table, "key": key}))
+        await asyncio.sleep(0)
+
+    async def test_start_listens_on_channel(self):
+        await self.bus.start()
+
+        self.conn.add_listener.assert_awaited_once_with(CHANNEL, self.bus._on_notification)
+
+    async def test_notification_reaches_table_subscribers(self):
+        toggles = AsyncMock()
+        settings = AsyncMock()
+        self.bus.subscribe("pph_config_auto", toggles)
+        self.bus.subscribe("pph_settings", settings)
+
+        await self._notify("pph_config_auto", "trivia")
+
+        toggles.assert_awaited_once_with("trivia")
+        settings.assert_not_awaited()
+
+    async def test_failing_subscriber_is_logged(self):
+        failing = AsyncMock(side_effect=RuntimeError("boom"))
+        working = AsyncMock()
+        self.bus.subscribe("pph_settings", failing)
+        self.bus.subscribe("pph_settings", working)
+
+        await self._notify("pph_settings", "welcome_channel")
+
+        working.assert_awaited_once_with("welcome_channel")
+        self.logger.error.assert_called_once()
+
+    async def test_unsubscribe(self):
+        subscriber = AsyncMock()
+        self.bus.subscribe("pph_settings", subscriber)
+        self.bus.unsubscribe("pph_settings", subscriber)
+
+        await self._notify("pph_settings", "welcome_channel")
+
+        subscriber.assert_not_awaited()
+
+    async def test_reconnect_refreshes_everything(self):
+        subscriber = AsyncMock()
+        self.bus.subscribe("pph_auto_responses", subscriber)
+        await self.bus.start()
+
+        self.bus._on_termination(self.conn)
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        self.assertEqual(self.pool.acquire.await_count, 2)
+        subscriber.assert_awaited_once_with(None)
+
+    async def test_close_releases_connection(self):
+        await self.bus.start()
+        await self.bus.close()
+
+        self.conn.remove_listener.assert_awaited_once_with(CHANNEL, self.bus._on_notification)
+        self.pool.release.assert_awaited_once_with(self.conn)
+
+
+if __name__ == "__main__":
+    unittest.main()
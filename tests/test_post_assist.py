@@ -0,0 +1,90 @@
+import asyncio
+import gc
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock
+
+from src.data.forum.post_assist import PostAssistDB
+
+
+class FakeTransaction:
+    """Records whether the transaction was committed or rolled back."""
+
+    def __init__(self, outcomes: list[str]) -> None:
+        self._outcomes = outcomes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._outcomes.append("rolled back" if exc_type else "committed")
+
+
+class FakeAcquire:
+    """Hands out the connection, without keeping the exceptions like a mock would."""
+
+    def __init__(self, conn) -> None:
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+
+class TestClosingMarkAsSolvedView(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.outcomes: list[str] = []
+        self.conn = MagicMock()
+        self.conn.execute = AsyncMock()
+        self.conn.transaction.side_effect = lambda: FakeTransaction(self.outcomes)
+        pool = MagicMock()
+        pool.acquire.side_effect = lambda: FakeAcquire(self.conn)
+        self.db = PostAssistDB(pool)
+        self.errors: list[dict] = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: self.errors.append(context)
+        )
+
+    async def test_commits_when_the_block_succeeds(self):
+        async with self.db.closing_mark_as_solved_view(123):
+            pass
+
+        self.conn.execute.assert_awaited_once()
+        self.assertEqual(self.outcomes, ["committed"])
+
+    async def test_rolls_back_when_the_block_raises(self):
+        with self.assertRaises(RuntimeError):
+            async with self.db.closing_mark_as_solved_view(123):
+                raise RuntimeError("Missing Permissions")
+
+        self.assertEqual(self.outcomes, ["rolled back"])
+
+    async def test_waits_for_a_failing_update_before_rolling_back(self):
+        finished = []
+
+        async def execute(*args):
+            await asyncio.sleep(0)
+            finished.append(True)
+            raise ConnectionError
+
+        self.conn.execute.side_effect = execute
+
+        # The block's error wins over the update's
+        try:
+            async with self.db.closing_mark_as_solved_view(123):
+                raise RuntimeError("Missing Permissions")
+        except RuntimeError:
+            pass
+
+        # An update error that was never retrieved is reported when it is collected
+        gc.collect()
+
+        self.assertEqual(finished, [True])
+        self.assertEqual(self.outcomes, ["rolled back"])
+        self.assertEqual(self.errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+import asyncio
+import unittest
+from datetime import datetime, time, timedelta, timezone
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from src.utils.scheduler import (
+    CLAIM_RETRY,
+    Job,
+    MemoryJobStore,
+    Scheduler,
+    daily,
+    every,
+)
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class VirtualClock:
+    """A clock that only moves when the test says so."""
+
+    def __init__(self, now: datetime) -> None:
+        self._now = now
+        self._sleepers: list[tuple[datetime, asyncio.Future]] = []
+
+    def now(self) -> datetime:
+        return self._now
+
+    async def sleep(self, seconds: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._sleepers.append((self._now + timedelta(seconds=seconds), future))
+        await future
+
+    async def advance(self, **delta) -> None:
+        self._now += timedelta(**delta)
+
+        for deadline, future in self._sleepers:
+            if deadline <= self._now and not future.done():
+                future.set_result(None)
+
+        self._sleepers = [(d, f) for d, f in self._sleepers if not f.done()]
+        await settle()
+
+
+async def settle() -> None:
+    """Lets the scheduler and the jobs it started run."""
+
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestTriggers(unittest.TestCase):
+    def test_every(self):
+        self.assertEqual(every(timedelta(hours=2))(START), START + timedelta(hours=2))
+
+    def test_daily(self):
+        trigger = daily(time(9, 0), timezone(timedelta(hours=8)))
+
+        # 09:00 UTC+8 is 01:00 UTC
+        self.assertEqual(trigger(START), START + timedelta(hours=1))
+        self.assertEqual(trigger(START + timedelta(hours=1)), START + timedelta(days=1, hours=1))
+
+
+class TestScheduler(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.clock = VirtualClock(START)
+        self.store = MemoryJobStore()
+        self.logger = MagicMock()
+        self.scheduler = Scheduler(self.store, self.logger, self.clock)
+        self.runs: list[tuple[str, datetime]] = []
+        self.scheduler.start()
+
+    async def asyncTearDown(self):
+        await self.scheduler.close()
+
+    def job(self, name: str, trigger, **kwargs) -> Job:
+        async def run():
+            self.runs.append((name, self.clock.now()))
+
+        return Job(name, run, trigger, **kwargs)
+
+    async def test_runs_when_due(self):
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+
+        await self.clock.advance(minutes=59)
+        self.assertEqual(self.runs, [])
+
+        await self.clock.advance(minutes=1)
+        self.assertEqual(self.runs, [("hello", START + timedelta(hours=1))])
+        self.assertEqual(self.scheduler.next_run("hello"), START + timedelta(hours=2))
+
+    async def test_runs_jobs_in_order(self):
+        await self.scheduler.add(self.job("slow", every(timedelta(hours=3))))
+        await self.scheduler.add(self.job("fast", every(timedelta(hours=2))))
+
+        for _ in range(6):
+            await self.clock.advance(hours=1)
+
+        hours = [(name, int((at - START).total_seconds() // 3600)) for name, at in self.runs]
+        self.assertEqual(hours, [("fast", 2), ("slow", 3), ("fast", 4), ("slow", 6), ("fast", 6)])
+
+    async def test_saves_next_run(self):
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+        await self.clock.advance(hours=1)
+
+        self.assertEqual(await self.store.load("hello"), START + timedelta(hours=2))
+
+    async def test_resumes_saved_next_run(self):
+        await self.store.save("hello", START + timedelta(minutes=10))
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+
+        await self.clock.advance(minutes=10)
+
+        self.assertEqual(len(self.runs), 1)
+
+    async def test_catches_up_missed_run_once(self):
+        await self.store.save("hello", START - timedelta(hours=5))
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+        await settle()
+
+        self.assertEqual(self.runs, [("hello", START)])
+        self.assertEqual(self.scheduler.next_run("hello"), START + timedelta(hours=1))
+
+    async def test_skips_missed_run(self):
+        await self.store.save("hello", START - timedelta(hours=5))
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1)), catch_up="skip"))
+        await settle()
+
+        self.assertEqual(self.runs, [])
+        self.assertEqual(self.scheduler.next_run("hello"), START + timedelta(hours=1))
+
+    async def test_skips_runs_missed_while_running_late(self):
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+
+        await self.clock.advance(hours=5, minutes=30)
+
+        self.assertEqual(len(self.runs), 1)
+        self.assertEqual(self.scheduler.next_run("hello"), START + timedelta(hours=6, minutes=30))
+
+    async def test_jitter(self):
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1)), jitter=60))
+
+        next_run = self.scheduler.next_run("hello")
+
+        self.assertGreaterEqual(next_run, START + timedelta(hours=1))
+        self.assertLessEqual(next_run, START + timedelta(hours=1, seconds=60))
+        # The nominal time is saved, so the jitter doesn't add up
+        self.assertEqual(await self.store.load("hello"), START + timedelta(hours=1))
+
+    async def test_reschedule_wakes_up_early(self):
+        await self.scheduler.add(self.job("hello", every(timedelta(days=1))))
+        await settle()
+
+        await self.scheduler.reschedule("hello", START + timedelta(hours=1))
+        await self.clock.advance(hours=1)
+
+        self.assertEqual(self.runs, [("hello", START + timedelta(hours=1))])
+
+    async def test_paused_and_removed_jobs_dont_run(self):
+        enabled = False
+
+        def trigger(after):
+            return after + timedelta(hours=1) if enabled else None
+
+        await self.scheduler.add(self.job("paused", trigger))
+        await self.scheduler.add(self.job("removed", every(timedelta(hours=1))))
+        self.scheduler.remove("removed")
+
+        await self.clock.advance(hours=2)
+        self.assertEqual(self.runs, [])
+        self.assertIsNone(self.scheduler.next_run("paused"))
+
+        enabled = True
+        await self.scheduler.reschedule("paused")
+        await self.clock.advance(hours=1)
+
+        self.assertEqual([name for name, _ in self.runs], ["paused"])
+
+    async def test_failing_job_keeps_its_schedule(self):
+        async def fail():
+            raise RuntimeError("boom")
+
+        await self.scheduler.add(Job("fail", fail, every(timedelta(hours=1))))
+        await self.clock.advance(hours=1)
+
+        self.logger.error.assert_called_once()
+        self.assertEqual(self.scheduler.next_run("fail"), START + timedelta(hours=2))
+
+    async def test_runs_once_across_processes(self):
+        standby = Scheduler(self.store, self.logger, self.clock, owner="standby")
+        standby.start()
+
+        try:
+            await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+            await standby.add(self.job("hello", every(timedelta(hours=1))))
+
+            for _ in range(3):
+                await self.clock.advance(hours=1)
+        finally:
+            await standby.close()
+
+        self.assertEqual(len(self.runs), 3)
+        self.assertEqual(await self.store.load("hello"), START + timedelta(hours=4))
+
+    async def test_waits_for_the_lease(self):
+        # Another process is still running the 01:00 run
+        run = START + timedelta(hours=1)
+        await self.store.save("hello", run)
+        await self.store.claim("hello", "other", run, run, timedelta(minutes=15))
+
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+        await self.clock.advance(hours=1)
+
+        self.assertEqual(self.runs, [])
+        self.assertEqual(self.scheduler.next_run("hello"), START + timedelta(hours=1) + CLAIM_RETRY)
+
+        await self.store.release("hello", "other")
+        await self.clock.advance(seconds=CLAIM_RETRY.total_seconds())
+
+        self.assertEqual(len(self.runs), 1)
+        self.assertEqual(await self.store.load("hello"), START + timedelta(hours=2))
+
+    async def test_retries_a_failing_claim(self):
+        claim = self.store.claim
+        failures = [ConnectionError("store is down")]
+
+        async def flaky_claim(*args):
+            if failures:
+                raise failures.pop()
+
+            return await claim(*args)
+
+        self.store.claim = flaky_claim
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+
+        await self.clock.advance(hours=1)
+        self.assertEqual(self.runs, [])
+        self.assertEqual(self.scheduler.next_run("hello"), START + timedelta(hours=1) + CLAIM_RETRY)
+
+        await self.clock.advance(seconds=CLAIM_RETRY.total_seconds())
+        self.assertEqual(self.runs, [("hello", START + timedelta(hours=1) + CLAIM_RETRY)])
+        self.assertEqual(self.scheduler.next_run("hello"), START + timedelta(hours=2))
+
+        for _ in range(3):
+            await self.clock.advance(hours=1)
+
+        self.assertEqual(len(self.runs), 4)
+
+    async def test_local_jobs_run_in_every_process(self):
+        standby = Scheduler(self.store, self.logger, self.clock, owner="standby")
+        standby.start()
+
+        try:
+            await self.scheduler.add(self.job("flush", every(timedelta(hours=1)), local=True))
+            await standby.add(self.job("flush", every(timedelta(hours=1)), local=True))
+
+            await self.clock.advance(hours=1)
+        finally:
+            await standby.close()
+
+        self.assertEqual(len(self.runs), 2)
+        self.assertIsNone(await self.store.load("flush"))
+
+    async def test_duplicate_job(self):
+        await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+
+        with self.assertRaises(KeyError):
+            await self.scheduler.add(self.job("hello", every(timedelta(hours=1))))
+
+if __name__ == "__main__":
+    unittest.main()